@@ -8,23 +8,88 @@ from sys          import path as sys_path
 
 sys_path.append(path.dirname(path.realpath(__file__)))
 
-from shutil       import get_terminal_size
 from TexUI_module.\
 datatype_extend   import *
-from TexUI_module import helper_function
+from TexUI_module import helper_function, framebuffer, terminal_control, async_io, output_target, render_stats, style, char_width, line_source
+from TexUI_module.\
+scheduler         import FrameScheduler
+from TexUI_module.\
+input_events      import InputQueue, KeyEvent
+from TexUI_module.\
+output_target     import VirtualTerminal
+from TexUI_module.\
+char_width        import string_width, WIDE_CONTINUATION
+from TexUI_module.\
+sprite            import Sprite
 from typing       import Iterable, Literal, Tuple
-from collections  import deque
-from textwrap     import wrap as smart_wrap
+from functools    import lru_cache
+from bisect       import bisect_left
+from time         import monotonic, perf_counter
+from weakref      import WeakSet
+import signal
+import asyncio
 
 
 class __Handler:
     def __init__(self):
-        pass
+        # validation policy of every Display that doesn't set its own
+        self.validation = "strict"
+
+        # terminal size is only read again after a SIGWINCH, or on poll_terminal_size
+        self.terminal_size = output_target.target.size()
+        self.resize_pending = False
+        self.resize_time = 0.0
+        self.resize_debounce = 0.05  # seconds without SIGWINCH before a resize is delivered
+        self.resize_watched = False
+        self.resize_listeners = []
+        self.displays = WeakSet()
+
+    def watch_resize(self) -> None:
+        """
+        Installs the SIGWINCH handler, unless something else already handles it.
+        """
+        if self.resize_watched or not hasattr(signal, "SIGWINCH"):
+            return
+
+        try:
+            if signal.getsignal(signal.SIGWINCH) in [signal.SIG_DFL, None]:
+                signal.signal(signal.SIGWINCH, self.__on_sigwinch)
+        except ValueError:
+            return  # not the main thread. poll_terminal_size still works
+
+        self.resize_watched = True
+
+    def __on_sigwinch(self, signum, frame) -> None:
+        # only take note. the size is read once the burst of signals settles, see dispatch_resize
+        self.resize_pending = True
+        self.resize_time = monotonic()
+
+    def dispatch_resize(self) -> None:
+        """
+        Delivers a pending resize, once no SIGWINCH came for `resize_debounce` seconds.
+        Cheap when there is nothing pending, so it can be called every frame.
+        """
+        if self.resize_pending and monotonic() - self.resize_time >= self.resize_debounce:
+            self.resize_pending = False
+            self.poll_terminal_size()
+
+    def poll_terminal_size(self) -> None:
+        """
+        Reads the terminal size now, and delivers it to every display and listener if it changed.
+        """
+        size = output_target.target.size()
+        if size == self.terminal_size:
+            return
+
+        self.terminal_size = size
+        for display in list(self.displays):
+            display.on_resize(size.columns, size.lines)
+        for listener in self.resize_listeners:
+            listener(size.columns, size.lines)
 
     def is_valid_position(self, position: Position, max_size: Tuple[int, int]) -> bool:
-        return (position.x >= 0 and position.y >= 0) and (  # no negative
-            position.x < max_size[0] and position.y < max_size[1]
-        )  # smaller or equal than terminal | fence-post warning: position < terminal_size
+        # kept for callers outside the module. inside, bounds are checked on the plain x, y (see Display.rect)
+        return 0 <= position[0] < max_size[0] and 0 <= position[1] < max_size[1]
 
 
 handler = __Handler()
@@ -35,17 +100,260 @@ def move_cursor(x: int, y: int) -> None:
     Moves the cursor to a specified coordinate in the terminal.
     The top left corner of the terminal is considered as the origin (0, 0).
     """
-    if not handler.is_valid_position(Position(x, y), get_terminal_size()):
+    output_target.write(_cursor_sequence(x, y))
+
+
+def _cursor_sequence(x: int, y: int) -> str:
+    terminal_size = handler.terminal_size
+    if not (0 <= x < terminal_size.columns and 0 <= y < terminal_size.lines):
         raise ValueError(
             f"Invalid position. Position must be within the terminal size ({x}, {y}) vs {
-            get_terminal_size().columns}x{get_terminal_size().lines}."
+            terminal_size.columns}x{terminal_size.lines}."
+        )
+
+    return f"\033[{y + 1};{x + 1}H"
+
+
+def set_validation(policy: Literal["strict", "trusted"]) -> None:
+    """
+    Sets the validation policy used by every Display that doesn't set its own.
+
+    ### Parametres
+    - `policy`: How much the drawing methods check their arguments.
+        - `strict`: Every argument is validated (default).
+        - `trusted`: No type validation. Anything outside the screen is only clipped.
+    """
+    if policy not in ["strict", "trusted"]:
+        raise ValueError(
+            f"Invalid policy value of {policy!r}. Expected 'strict' or 'trusted'."
         )
 
-    print(f"\033[{y + 1};{x + 1}H", end="")
+    handler.validation = policy
+
+
+def add_resize_listener(callback) -> None:
+    """
+    Calls `callback(columns, lines)` every time the terminal gets resized.
+    Resizes are delivered on the next flush (or `poll_terminal_size`), after the burst of SIGWINCH settles.
+    """
+    handler.watch_resize()
+    handler.resize_listeners.append(callback)
+
+
+def set_output(target) -> None:
+    """
+    Sends everything TexUI writes to the target instead of stdout, and takes the terminal size from it.
+    A target has `write(text)`, `async write_async(text)` and `size()` (an `os.terminal_size`),
+    like `output_target.StdoutTarget` (the default) and `output_target.VirtualTerminal`.
+    Displays and listeners get the new size if it differs.
+    """
+    output_target.set_target(target)
+    handler.poll_terminal_size()
+
+
+def get_output():
+    return output_target.get_target()
+
+
+def poll_terminal_size() -> None:
+    """
+    Reads the terminal size now, for when SIGWINCH can't be used. Delivers the resize if it changed.
+    """
+    handler.poll_terminal_size()
 
 
 def clear_terminal() -> None:
-    system("cls" if name == "nt" else "clear")
+    """
+    Clears the terminal with escape sequences (no process is spawned, except for cls on Windows).
+    """
+    if name == "nt" and isinstance(output_target.target, output_target.StdoutTarget):
+        system("cls")
+    else:
+        terminal_control.clear()
+
+
+def run_app(
+    main,
+    alternate_screen: bool = True,
+    hide_cursor: bool = True,
+    clear: bool = True,
+):
+    """
+    Runs the coroutine function `main` in a new event loop, inside a `TerminalSession`, and returns its result.
+    Draw with `Display.flush_async`, read keys with `key_events`, and pace with `FrameScheduler.run_async`.
+    The writes of `flush_async` are all done before the terminal is restored.
+    """
+
+    async def runner():
+        try:
+            return await main()
+        finally:
+            async_io.stdout_writer.close()
+
+    with terminal_control.TerminalSession(alternate_screen, hide_cursor, clear):
+        return asyncio.run(runner())
+
+
+key_events = async_io.key_events
+
+
+LAYOUT_CACHE_SIZE = 1024
+DAMAGE_LIMIT = 64  # damaged areas kept by a Display before they are merged
+
+
+@lru_cache(maxsize=LAYOUT_CACHE_SIZE)
+def _layout_text(
+    text: Tuple[str, ...],
+    max_width: int,
+    preserve_width: bool,
+    edge_of_screen: str,
+    write_space: int,
+    max_line: int,
+    foward: Tuple[Tuple[str, object], ...],
+    ellipsis: Tuple[Tuple[str, object], ...],
+    indent: int,
+    space_below: int,
+) -> Tuple[Tuple[str, ...], Tuple[str, ...]]:
+    """
+    Lays out the text of `Display.draw_str`. Returns the lines to draw, and the lines as viewed.
+
+    Only depends on its (hashable) arguments, so the layout of a label that is drawn the same way
+    every frame is computed once. `write_space` is the space right of x (only used with `edge_of_screen`),
+    and `space_below` the space under y (only used with the screen edge ellipsis).
+
+    Lines are laid out as cells (see `char_width`), so widths are counted in columns.
+    The lines to draw are in drawing order: a wide glyph drawn right to left has its right half first.
+    """
+    text = list(text)
+    foward = dict(foward)
+    ellipsis = dict(ellipsis)
+
+    """
+    helper function ----------------------------------------------------------------------------------------------
+    """
+
+    # max width --------------------------------------------------------------------------------------------------
+    def apply_max_width(text: list, width: int, preserve: bool):
+        text = (
+            [char_width.wrap_cells(line, width) for line in text]  # smart warp
+            if preserve
+            else [  # basic cut
+                char_width.split_cells(line, width) for line in text
+            ]
+        )
+
+        # smart warp turn empty string into empty list. change it back to str
+        text = [word if word != [] else [""] for word in text]
+
+        text = helper_function.flatten_list(text)
+        return text
+
+    def apply_ellipsis(line: str, symbol: str, count: int):
+        if count > len(line):
+            return symbol * len(line)
+        else:
+            return line[:-count] + symbol * count
+
+    def apply_advance_ellipsis():
+        if not text:
+            return
+        if not foward["action"] and foward["preserve"]:
+            text[-1] = (
+                ellipsis["symbol"] * ellipsis["count"]
+                + text[-1][ellipsis["count"] :]
+                if len(text[-1]) >= ellipsis["count"]
+                else ellipsis["symbol"] * len(text[-1])
+            )
+        else:
+            text[-1] = apply_ellipsis(
+                text[-1], ellipsis["symbol"], ellipsis["count"]
+            )
+
+        # print("a", text, len(text[-1]) ,"<=", ellipsis["count"])
+
+    """
+    processing ---------------------------------------------------------------------------------------------------
+    """
+    # cleaning ---------------------------------------------------------------------------------------------------
+
+    text = helper_function.flatten_list([line.split("\n") for line in text])
+    text = [
+        line if line.isprintable() else "".join([char for char in line if char.isprintable()])
+        for line in text
+    ]
+    text = [char_width.to_cells(line) for line in text]
+
+    # indent -----------------------------------------------------------------------------------------------------
+    if indent:
+        text = [
+            (
+                (" " * indent) + line
+                if foward["anchour"] == "left" and line != ""
+                else line
+            )
+            for line in text
+        ]
+
+    # max width --------------------------------------------------------------------------------------------------
+    if max_width:
+        text = apply_max_width(text, max_width, preserve_width)
+
+    # edge of screen ---------------------------------------------------------------------------------------------
+    if edge_of_screen != "default":
+        if edge_of_screen == "newline":
+            text = apply_max_width(text, write_space, False)
+        else:
+            text = apply_max_width(text, write_space, True)
+
+    # max line ---------------------------------------------------------------------------------------------------
+    old_text = text
+    if max_line:
+        text = text[:max_line]
+
+    # foward -----------------------------------------------------------------------------------------------------
+
+    viewed_text = text
+    # print(foward)
+    if foward != {}:
+        if not foward["action"]:
+            # text reversed
+            if foward["preserve"]:
+                text = [line[::-1] for line in text]
+            else:
+                viewed_text = [line[::-1] for line in viewed_text]
+
+    # ellipsis ---------------------------------------------------------------------------------------------------
+    if ellipsis != {}:
+        # print(text)
+        if ellipsis["at"] in ["all", "max line"] and len(text) < len(old_text):
+            apply_advance_ellipsis()
+
+        elif ellipsis["at"] in ["all", "screen edge"] and len(text) > space_below:
+            # write ellipsis on the line where it touches the edge. text starting below the screen has none
+            last_line_index = max(space_below, 0)
+            text = text[:last_line_index]
+
+            apply_advance_ellipsis()
+
+    # cells ------------------------------------------------------------------------------------------------------
+    # wide glyphs cut by wrapping or ellipsis become spaces
+    text = [
+        char_width.fit_cells(line, not foward["action"] and foward["preserve"])
+        for line in text
+    ]
+    if not foward["action"] and not foward["preserve"]:
+        # drawn right to left as is: the right half of a wide glyph goes before it
+        text = [char_width.swap_pairs(line) for line in text]
+    viewed_text = [line.replace(char_width.WIDE_CONTINUATION, "") for line in viewed_text]
+
+    return tuple(text), tuple(viewed_text)
+
+
+def clear_layout_cache() -> None:
+    """
+    Empties the cache of text layouts computed by `Display.draw_str`.
+    """
+    _layout_text.cache_clear()
 
 
 class Display:
@@ -56,6 +364,13 @@ class Display:
         height: int | Literal["full"] = "full",
         default_fill=" ",
         no_terminal_bound: bool = False,
+        double_buffer: bool = False,
+        storage: Literal["list", "array", "numpy"] = "list",
+        validation: Literal["strict", "trusted"] | None = None,
+        track_damage: bool = False,
+        synchronized_output: bool = False,
+        instrument: bool = False,
+        color: bool = False,
     ) -> None:
         """
         A Display that can be drawn on.
@@ -66,14 +381,24 @@ class Display:
         minus one (accounting newline after flushing). Use 'full' to set it to biggest it can go
         - `default_fill`: A character that is used as a background of the screen
         - `no_terminal_bound`: Allow display sizes to be greater than the terminal itself
+        - `double_buffer`: Remember the last flushed frame, and only write the cells that changed since then on the next flush
+        - `storage`: How the cells are stored.
+            - `list`: A list of one character strings per row.
+            - `array`: A compact unicode array per row, cleared in place.
+            - `numpy`: One numpy array of code points. Lines, boxes, rectangles and merges are vectorized. Needs numpy.
+        - `validation`: Validation policy of the drawing methods, `strict` or `trusted`. Default is None (follow `set_validation`)
+        - `track_damage`: Record the area every drawing method changes, so `flush` can repaint only that
+        - `synchronized_output`: Bracket every flush in a synchronized update, so the terminal shows the frame at once without tearing
+        - `instrument`: Count and time the drawing methods and flushes from the start. See `enable_stats`
+        - `color`: Keep a foreground, background and attribute per cell, set with `paint` or the style of `draw_str`
         """
 
         # prepare
-        global handler
         self.default_fill = default_fill
-        self.terminal_width = get_terminal_size().columns
+        terminal_size = handler.terminal_size
+        self.terminal_width = terminal_size.columns
         self.terminal_height = (
-            get_terminal_size().lines - 1
+            terminal_size.lines - 1
         )  # account for newline when done printing
 
         if isinstance(width, str) or width is None:
@@ -90,14 +415,13 @@ class Display:
 
         self.width = width if isinstance(width, int) else self.terminal_width
         self.height = height if isinstance(height, int) else self.terminal_height
+        self.full_width = not isinstance(width, int)
+        self.full_height = not isinstance(height, int)
+        self.rect = Rect.from_size(self.width, self.height)
 
-        # validate
-        if not handler.is_valid_position(
-            Position(self.width, self.height),
-            (
-                get_terminal_size()[0] + 1,
-                get_terminal_size()[1],
-            ),  # bypass for when screen size == terminal size
+        # validate. the width may be equal to the terminal's, the height is already one less
+        if not (
+            0 <= self.width <= terminal_size[0] and 0 <= self.height < terminal_size[1]
         ) and any((not no_terminal_bound, self.width < 0 or self.height < 0)):
             raise ValueError(
                 f"Invalid screen size of {self.width}x{self.height}. \
@@ -107,13 +431,97 @@ Set no_terminal_bound to be True if you want to make display bigger than the ter
 
         Character(default_fill)
 
-        self.content = [[default_fill] * self.width for _ in range(self.height)]
+        if validation not in [None, "strict", "trusted"]:
+            raise ValueError(
+                f"Invalid validation value of {validation!r}. Expected 'strict', 'trusted', or None."
+            )
+        self.validation = validation
+
+        self.storage = framebuffer.get_storage(storage)
+        self.content = self.storage.allocate(self.width, self.height, default_fill)
+
+        # front buffer: the last frame sent to the terminal, as (x, y, rows)
+        self.double_buffer = double_buffer
+        self.front_buffer = None
+
+        # damage: areas changed since the last flush, as (x1, y1, x2, y2)
+        self.track_damage = track_damage
+        self.damage = []
+
+        self.synchronized_output = synchronized_output
+
+        # planes: fg, bg and attr of every cell, parallel to content. None without color
+        self.planes = style.StylePlanes(self.width, self.height) if color else None
+
+        # stats: None unless instrumented, see enable_stats
+        self.stats = None
+        if instrument:
+            self.enable_stats()
+
+        handler.watch_resize()
+        handler.displays.add(self)
+
+    def __trusted(self) -> bool:
+        return (self.validation or handler.validation) == "trusted"
+
+    def on_resize(self, columns: int, lines: int) -> None:
+        """
+        Called when the terminal gets resized. A display with 'full' width or height follows the terminal.
+        """
+        self.terminal_width = columns
+        self.terminal_height = lines - 1
+
+        if self.full_width or self.full_height:
+            self.resize(
+                columns if self.full_width else self.width,
+                lines - 1 if self.full_height else self.height,
+            )
+        else:
+            self.front_buffer = None  # the terminal may have reflowed what was on it
+
+    def resize(self, width: int, height: int) -> None:
+        """
+        Changes the size of the display. Content that still fits is kept, new area is filled with `default_fill`.
+        Views of the display don't follow a resize, make them again.
+        """
+        if not isinstance(width, int) or not isinstance(height, int) or width < 0 or height < 0:
+            raise ValueError(
+                f"Invalid screen size of {width!r}x{height!r}. Expected integer above zero."
+            )
+
+        content = self.storage.allocate(width, height, self.default_fill)
+        kept_width, kept_height = min(width, self.width), min(height, self.height)
+        if kept_width and kept_height:
+            self.storage.blit(
+                content,
+                [
+                    self.storage.row_text(row[:kept_width])
+                    for row in self.content[:kept_height]
+                ],
+                0,
+                0,
+                "",
+                "",
+            )
+
+        self.content = content
+        if self.planes is not None:
+            self.planes = self.planes.resized(width, height)
+        self.width, self.height = width, height
+        self.rect = Rect.from_size(width, height)
+        self.front_buffer = None
+        if self.track_damage:
+            self.reset_damage()
+            self.add_damage(0, 0, width - 1, height - 1)
 
     def __str__(self):
         return f"Display object: {self.width}x{self.height} ({ \
         self.width * self.height}) | default fill: {self.default_fill}"
 
     def __contains__(self, item):
+        if self.storage.vectorized:
+            return self.storage.contains(self.content, item)
+
         for row in self.content:
             if item in row:
                 return True
@@ -125,19 +533,70 @@ Set no_terminal_bound to be True if you want to make display bigger than the ter
         """
 
         if reset in ["screen", "all"]:
-            self.content = [
-                [self.default_fill] * self.width for _ in range(self.height)
-            ]
+            self.content = self.storage.clear(
+                self.content, self.width, self.default_fill
+            )
+            if self.planes is not None:
+                self.planes.clear()
+            if self.track_damage:
+                self.add_damage(0, 0, self.width - 1, self.height - 1)
             if reset == "all":
-                system("cls" if name == "nt" else "clear")
+                clear_terminal()
+                self.front_buffer = None  # terminal is blank, next flush repaints
         else:
             raise ValueError(
                 f"Invalid reset value of {reset!r}. Expected 'screen' or 'all'."
             )
 
-    def flush(self, x: int | None = None, y: int | None = None) -> None:
+    def flush(
+        self,
+        x: int | None = None,
+        y: int | None = None,
+        full_repaint: bool = False,
+        damaged_only: bool = False,
+    ) -> None:
         """
         Flushes the current state of the display into the terminal at position (x, y).
+
+        ### Parametres
+        - `x`: x-coordinate of the terminal where the display will be flushed to.
+        - `y`: y-coordinate of the terminal where the display will be flushed to.
+        - `full_repaint`: Only used with `double_buffer`. Write every cell instead of only the changed ones.
+        - `damaged_only`: Only used with `track_damage`. Only write the area that got drawn on since the last flush.
+
+        ### Behavior
+        With `double_buffer` or `damaged_only` the display is always positioned absolutely (`None` is treated as 0). \n
+        With `double_buffer` only the changed runs of each row are written, each with a single cursor move.
+        With `damaged_only` too, only the damaged rows are compared. \n
+        The recorded damage is reset after every flush.
+        """
+        if not (x is None or isinstance(x, int)) or not (
+            y is None or isinstance(y, int)
+        ):
+            raise ValueError(
+                f"Invalid position. Expected integer or None, got {x!r} and {y!r}."
+            )
+
+        if self.stats is None:
+            output_target.write(self.__prepare_frame(x, y, full_repaint, damaged_only))
+            return
+
+        start = perf_counter()
+        frame = self.__prepare_frame(x, y, full_repaint, damaged_only)
+        built = perf_counter()
+        output_target.write(frame)
+        self.stats.record_flush(frame, built - start, perf_counter() - built)
+
+    async def flush_async(
+        self,
+        x: int | None = None,
+        y: int | None = None,
+        full_repaint: bool = False,
+        damaged_only: bool = False,
+    ) -> None:
+        """
+        Same as `flush`, but the frame is written from a worker thread (see `async_io.StdoutWriter`),
+        so the event loop keeps running while the terminal catches up.
         """
         if not (x is None or isinstance(x, int)) or not (
             y is None or isinstance(y, int)
@@ -146,20 +605,60 @@ Set no_terminal_bound to be True if you want to make display bigger than the ter
                 f"Invalid position. Expected integer or None, got {x!r} and {y!r}."
             )
 
+        start = perf_counter()
+        frame = self.__prepare_frame(x, y, full_repaint, damaged_only)
+        built = perf_counter()
+        await output_target.target.write_async(frame)
+        if self.stats is not None:
+            self.stats.record_flush(frame, built - start, perf_counter() - built)
+
+    def __prepare_frame(
+        self, x: int | None, y: int | None, full_repaint: bool, damaged_only: bool
+    ) -> str:
+        handler.dispatch_resize()
+
+        if damaged_only and not self.track_damage:
+            raise ValueError(
+                "Invalid damaged_only value of True. The display doesn't track damage."
+            )
+
+        damage = self.merge_damage() if damaged_only else None
+        self.reset_damage()
+
+        frame = self.__build_frame(x, y, full_repaint, damage)
+        if self.synchronized_output:
+            frame = (
+                terminal_control.SYNCHRONIZED_UPDATE_BEGIN
+                + frame
+                + terminal_control.SYNCHRONIZED_UPDATE_END
+            )
+        return frame
+
+    def __build_frame(
+        self, x: int | None, y: int | None, full_repaint: bool, damage: list | None
+    ) -> str:
+        if self.double_buffer:
+            return self.__diff_frame(x or 0, y or 0, full_repaint, damage)
+
+        if damage is not None:
+            return self.__damage_frame(x or 0, y or 0, damage)
+
         out = self.content[:]
+        cursor = ""
 
         # Adjust y-position by moving cursor or trimming content
         if y is not None:
             if y >= 0:
-                move_cursor(0, y)
+                cursor = _cursor_sequence(0, y)
             else:
-                move_cursor(0, 0)
+                cursor = _cursor_sequence(0, 0)
                 out = out[abs(y) :]  # Trim top rows if y is negative
 
         # Process and format all rows before printing
         formatted_rows = []
-        for row in out:
-            row_str = "".join(row)
+        first_row = abs(y) if y is not None and y < 0 else 0
+        for row_index, row in enumerate(out, first_row):
+            row_str = self.storage.row_text(row)
 
             if x is not None:
                 if x < 0:
@@ -168,13 +667,302 @@ Set no_terminal_bound to be True if you want to make display bigger than the ter
                     row_str = row_str[
                         : self.terminal_width - x
                     ]  # Trim right side if exceeding terminal width
-                formatted_rows.append(
-                    f"\033[{max(0, min(x, self.terminal_width - 1)) - 1}C" + row_str
-                )
+                shift = max(0, min(x, self.terminal_width - 1))
+                prefix = f"\033[{shift}C" if shift else ""
             else:
-                formatted_rows.append(row_str[: self.terminal_width])
+                row_str = row_str[: self.terminal_width]
+                prefix = ""
+
+            # wide glyphs cut by the trim become spaces
+            wide = not row_str.isascii()
+            if wide:
+                row_str = char_width.fit_cells(row_str)
+
+            if self.planes is not None:
+                # every row ends in the default style, a line feed can scroll with the background
+                row_str, state = self.__styled_row(
+                    row_str, row_index, max(0, -x) if x is not None else 0, style.DEFAULT_STYLE
+                )
+                row_str += style.transition(state, style.DEFAULT_STYLE)
+
+            if wide:
+                row_str = row_str.replace(char_width.WIDE_CONTINUATION, "")
+            formatted_rows.append(prefix + row_str)
+
+        return cursor + "\n".join(formatted_rows) + "\n"
+
+    def __visible_area(self, x: int, y: int) -> Tuple[int, int, int, int]:
+        """
+        Returns the part of the display that lands inside the terminal when flushed at x, y,
+        as left, top, right, bottom (right and bottom exclusive), in display coordinate.
+        """
+        return (
+            max(0, -x),
+            max(0, -y),
+            min(self.width, self.terminal_width - x),
+            min(self.height, self.terminal_height + 1 - y),
+        )
+
+    def __diff_frame(
+        self, x: int, y: int, full_repaint: bool, damage: list | None = None
+    ) -> str:
+        """
+        Builds the escape sequence that turns the last flushed frame into the current one.
+        With damage, rows outside of it are known to be unchanged and aren't compared.
+        """
+        front = self.front_buffer
+        if full_repaint or front is None or front[:2] != (x, y) or len(front[2]) != self.height:
+            front_rows = [None] * self.height
+            damage = None
+        else:
+            front_rows = front[2]
+
+        if damage is None:
+            rows = [self.__row_cells(row_index) for row_index in range(self.height)]
+        else:
+            rows = front_rows[:]
+            for _, y1, _, y2 in damage:
+                for row_index in range(y1, y2 + 1):
+                    rows[row_index] = self.__row_cells(row_index)
+
+        self.front_buffer = (x, y, rows)
+        state = style.DEFAULT_STYLE
+
+        left, top, right, bottom = self.__visible_area(x, y)
+
+        out = []
+        for row_index in range(top, bottom):
+            row = rows[row_index] = self.__clip_wide(rows[row_index], left, right)
+            old_row = front_rows[row_index]
+            if row == old_row:
+                continue
+
+            cursor_row = f"\033[{y + row_index + 1};"
+            if old_row is None or len(old_row) != len(row):
+                run, state = self.__styled_cells(row[left:right], state)
+                out.append(f"{cursor_row}{x + left + 1}H{self.__terminal_text(run)}")
+                continue
+
+            # collect the changed runs. gaps shorter than a cursor move are rewritten instead
+            column = left
+            while column < right:
+                if row[column] == old_row[column]:
+                    column += 1
+                    continue
+
+                start = end = column
+                while column < right:
+                    if row[column] != old_row[column]:
+                        end = column = column + 1
+                    elif column - end < 8:
+                        column += 1
+                    else:
+                        break
+
+                # repaint whole wide glyphs, not one of their halves
+                if start > left and row[start][0] == char_width.WIDE_CONTINUATION:
+                    start -= 1
+                if end < right and row[end][0] == char_width.WIDE_CONTINUATION:
+                    end += 1
+
+                run, state = self.__styled_cells(row[start:end], state)
+                out.append(f"{cursor_row}{x + start + 1}H{self.__terminal_text(run)}")
+
+        if out:
+            out.append(style.transition(state, style.DEFAULT_STYLE))
+            # park the cursor under the display, like a normal flush would
+            out.append(f"\033[{min(y + bottom, self.terminal_height) + 1};1H")
+
+        return "".join(out)
+
+    def __damage_frame(self, x: int, y: int, damage: list) -> str:
+        """
+        Builds the escape sequence that repaints the damaged area, one cursor move per row of every area.
+        """
+        left, top, right, bottom = self.__visible_area(x, y)
+
+        out = []
+        state = style.DEFAULT_STYLE
+        for x1, y1, x2, y2 in damage:
+            x1, x2 = max(x1, left), min(x2, right - 1)
+            if x1 > x2:
+                continue
+
+            for row_index in range(max(y1, top), min(y2, bottom - 1) + 1):
+                row = self.storage.row_text(self.content[row_index])
+                start, end = x1, x2 + 1
+                wide = not row.isascii()
+                if wide:
+                    # repaint whole wide glyphs, not one of their halves. a right half left without its glyph
+                    # is a space once the whole row is fitted, and is repainted too: the terminal erased it with its glyph
+                    if end < right and row[end] == char_width.WIDE_CONTINUATION:
+                        end += 1
+                    row = self.__clip_wide(char_width.fit_cells(row), left, right)
+                    if start > left and row[start] == char_width.WIDE_CONTINUATION:
+                        start -= 1
+                row = row[start:end]
+                if self.planes is not None:
+                    row, state = self.__styled_row(row, row_index, start, state)
+                if wide:
+                    row = row.replace(char_width.WIDE_CONTINUATION, "")
+                out.append(f"\033[{y + row_index + 1};{x + start + 1}H{row}")
+
+        if out:
+            out.append(style.transition(state, style.DEFAULT_STYLE))
+            out.append(f"\033[{min(y + bottom, self.terminal_height) + 1};1H")
+
+        return "".join(out)
+
+    def __row_cells(self, row_index: int) -> str | list:
+        """
+        Returns a row as the double buffer compares it: its text, or with color its cells as (character, fg, bg, attr).
+        Wide glyphs missing a half are already turned into spaces.
+        """
+        text = char_width.fit_cells(self.storage.row_text(self.content[row_index]))
+        if self.planes is None:
+            return text
+
+        planes = self.planes
+        return list(
+            zip(text, planes.fg[row_index], planes.bg[row_index], planes.attr[row_index])
+        )
+
+    @staticmethod
+    def __clip_wide(row: str | list, left: int, right: int) -> str | list:
+        """
+        Returns the row with the wide glyphs cut by the visible area's left or right edge turned into spaces.
+        """
+        continuation = char_width.WIDE_CONTINUATION
+        if left > 0 and left < len(row) and row[left][0] == continuation:
+            row = row[:left] + (" " if isinstance(row, str) else [(" ",) + row[left][1:]]) + row[left + 1 :]
+        if right < len(row) and row[right][0] == continuation:
+            row = row[: right - 1] + (" " if isinstance(row, str) else [(" ",) + row[right - 1][1:]]) + row[right:]
+        return row
+
+    @staticmethod
+    def __terminal_text(text: str) -> str:
+        if text.isascii():
+            return text
+        return text.replace(char_width.WIDE_CONTINUATION, "")
+
+    def __styled_cells(self, cells: str | list, state: tuple) -> Tuple[str, tuple]:
+        if self.planes is None:
+            return cells, state
+        return style.styled_cells(cells, state)
+
+    def __styled_row(
+        self, text: str, row_index: int, start: int, state: tuple
+    ) -> Tuple[str, tuple]:
+        """
+        Returns the text of the row's cells from start, with the SGR sequences of their styles, and the style it ends in.
+        """
+        planes = self.planes
+        return style.styled_text(
+            text,
+            planes.fg[row_index],
+            planes.bg[row_index],
+            planes.attr[row_index],
+            start,
+            state,
+        )
+
+    # methods timed by enable_stats, as {attribute: name in the stats}
+    INSTRUMENTED_METHODS = {
+        "clear": "clear",
+        "draw_char": "draw_char",
+        "draw_line": "draw_line",
+        "draw_str": "draw_str",
+        "_Display__validate_str": "draw_str.validation",
+        "_Display__layout_text": "draw_str.layout",
+        "draw_box": "draw_box",
+        "draw_rect": "draw_rect",
+        "export_display": "export_display",
+        "merge_display": "merge_display",
+        "draw_sprite": "draw_sprite",
+        "fill": "fill",
+    }
+
+    __layout_text = staticmethod(_layout_text)
+
+    def enable_stats(
+        self, hook=None, history: int = 240
+    ) -> render_stats.DisplayStats:
+        """
+        Starts counting and timing the drawing methods, and recording what every flush writes.
+        `draw_str` is also split into its validation and layout. Costs nothing until enabled.
+
+        ### Parametres
+        - `hook`: Called after every flush with the stats of that frame (cells, bytes, writes, build, write and interval).
+        - `history`: How many frame intervals are kept for the percentiles.
+
+        ### Return
+        The `DisplayStats`, also kept as `stats`. Use `stats.snapshot()` and `stats.reset()`.
+        """
+        self.disable_stats()
+        self.stats = render_stats.DisplayStats(hook, history)
+        for attribute, stat_name in self.INSTRUMENTED_METHODS.items():
+            setattr(self, attribute, self.stats.wrap(stat_name, getattr(self, attribute)))
+        return self.stats
+
+    def disable_stats(self) -> None:
+        if self.stats is None:
+            return
+        for attribute in self.INSTRUMENTED_METHODS:
+            self.__dict__.pop(attribute, None)
+        self.stats = None
+
+    def add_damage(self, x1: int, y1: int, x2: int, y2: int) -> None:
+        """
+        Marks the area from x1, y1 to x2, y2 as changed. The area is clipped to the screen.
+        """
+        area = self.rect.clip(x1, y1, x2, y2)
+        if area is None:
+            return
+
+        self.damage.append(area)
+        if len(self.damage) > DAMAGE_LIMIT:
+            self.merge_damage()
+
+    def get_damage(self) -> list[Tuple[int, int, int, int]]:
+        """
+        Returns the areas changed since the last flush (or reset), as a list of Rect (x1, y1, x2, y2).
+        """
+        return self.damage[:]
+
+    def merge_damage(self) -> list[Tuple[int, int, int, int]]:
+        """
+        Merges the overlapping and touching damaged areas together, and returns the result.
+        If there are still more than `DAMAGE_LIMIT` areas, they're merged into a single one.
+        """
+        areas = self.damage
+        merged = True
+        while merged:
+            merged = False
+            result = []
+            for area in areas:
+                for index, other in enumerate(result):
+                    if area.touches(other):
+                        result[index] = area.union(other)
+                        merged = True
+                        break
+                else:
+                    result.append(area)
+            areas = result
+
+        if len(areas) > DAMAGE_LIMIT:
+            bounds = areas[0]
+            for area in areas[1:]:
+                bounds = bounds.union(area)
+            areas = [bounds]
 
-        print("\n".join(formatted_rows))
+        self.damage = areas
+        return areas[:]
+
+    def reset_damage(self) -> None:
+        """
+        Forgets every damaged area.
+        """
+        self.damage = []
 
     def get_char(self, x: int, y: int) -> Character:
         """
@@ -188,7 +976,7 @@ Set no_terminal_bound to be True if you want to make display bigger than the ter
         Return a character (not a Character object. Just a string with lenght of one)
         """
 
-        if not handler.is_valid_position(Position(x, y), (self.width, self.height)):
+        if not self.rect.contains(x, y):
             raise ValueError(
                 f"Invalid position. Position must be within the screen size ({x}, {y}) vs {self.width}x{self.height}."
             )
@@ -213,6 +1001,13 @@ Set no_terminal_bound to be True if you want to make display bigger than the ter
 
         """
 
+        if self.__trusted():
+            if self.rect.contains(x, y) and (
+                mask_limit_character == "" or self.content[y][x] in mask_limit_character
+            ):
+                self.__put_char(x, y, character)
+            return
+
         Character(character)
 
         if mask_limit_character != "":
@@ -226,7 +1021,21 @@ Set no_terminal_bound to be True if you want to make display bigger than the ter
                 )
 
         if self.get_char(x, y) in mask_limit_character or mask_limit_character == "":
-            self.content[y][x] = character
+            self.__put_char(x, y, character)
+
+    def __put_char(self, x: int, y: int, character: str) -> None:
+        # a wide character also takes the cell on its right, if there is one
+        right = x
+        self.content[y][x] = character
+        if (
+            character >= "\x80"
+            and x + 1 < self.width
+            and char_width.char_width(character) == 2
+        ):
+            right = x + 1
+            self.content[y][right] = char_width.WIDE_CONTINUATION
+        if self.track_damage:
+            self.add_damage(x, y, right, y)
 
     def draw_line(
         self,
@@ -248,7 +1057,7 @@ Set no_terminal_bound to be True if you want to make display bigger than the ter
         - `character`: What character the line will be made of. If iterable is given, then it'll be used as pattern.
         - `mask_limit_character`: At what the line only can be drawn on. Default is an empty string.
         """
-        if character != "":
+        if character != "" and not self.__trusted():
             if not isinstance(character, str):
                 raise ValueError(
                     f"Invalid text_mask value of {character!r}. Expected string or character."
@@ -258,7 +1067,7 @@ Set no_terminal_bound to be True if you want to make display bigger than the ter
                     f"Invalid text_mask value of {character!r}. Expected non sequence code string or character."
                 )
 
-        if mask_limit_character != "":
+        if mask_limit_character != "" and not self.__trusted():
             if not isinstance(mask_limit_character, str):
                 raise ValueError(
                     f"Invalid mask_limit_text value of {mask_limit_character!r}. Expected string or character."
@@ -268,37 +1077,124 @@ Set no_terminal_bound to be True if you want to make display bigger than the ter
                     f"Invalid text_mask value of {mask_limit_character!r}. Expected non sequence code string or character."
                 )
 
+        if self.track_damage:
+            self.add_damage(x1, y1, x2, y2)
+
+        # horizontal and vertical lines are written as one clipped span
+        if x1 == x2 or y1 == y2:
+            span = self.__clip_axis_line(x1, y1, x2, y2)
+            if span is not None:
+                start_x, start_y, end_x, end_y, offset = span
+                self.storage.draw_span(
+                    self.content,
+                    start_x,
+                    start_y,
+                    end_x,
+                    end_y,
+                    character,
+                    offset,
+                    mask_limit_character,
+                )
+            return
+
+        steps = self.__clip_diagonal_line(x1, y1, x2, y2)
+        if steps is None:
+            return
+        first, last, x, y = steps
+
         dx = abs(x2 - x1)
         dy = abs(y2 - y1)
         sx = 1 if x1 < x2 else -1
         sy = 1 if y1 < y2 else -1
-        err = dx - dy
+        # the error term Bresenham's algorithm would have after walking to x, y
+        err = dx - dy - abs(x - x1) * dy + abs(y - y1) * dx
 
-        c = 0
-        while True:
-            try:
-                if (
-                    self.get_char(x1, y1) in mask_limit_character
-                ) or mask_limit_character == "":
-                    self.content[y1][x1] = character[c % len(character)]
-            except (IndexError, ValueError):
-                pass
-
-            # fence-post warning: x, y < display size
-            # x, y   : 0, 1, 2 <- +1 then x > width ?
-            # screen : 1, 2, 3
-            if (x1 == x2 and y1 == y2) or (x1 + 1 > self.width or y1 + 1 > self.height):
-                break
+        # every step from first to last is on the screen, nothing is checked in the loop
+        content = self.content
+        for c in range(first, last + 1):
+            if mask_limit_character == "" or content[y][x] in mask_limit_character:
+                content[y][x] = character[c % len(character)]
 
             e2 = 2 * err
             if e2 > -dy:
                 err -= dy
-                x1 += sx
+                x += sx
             if e2 < dx:
                 err += dx
-                y1 += sy
+                y += sy
+
+    def __clip_diagonal_line(
+        self, x1: int, y1: int, x2: int, y2: int
+    ) -> Tuple[int, int, int, int] | None:
+        """
+        Returns the steps of a diagonal line that `draw_line` would draw, as (first step, last step, x, y of the first step),
+        or None if nothing would be drawn. Steps are counted from x1, y1, which is step 0.
+        """
+        dx, dy = abs(x2 - x1), abs(y2 - y1)
+        sx = 1 if x1 < x2 else -1
+        sy = 1 if y1 < y2 else -1
+        major, minor = max(dx, dy), min(dx, dy)
+
+        def cell(step: int) -> Tuple[int, int]:
+            # the major axis moves on every step, the minor one once the error passes half a cell
+            other = max(0, -((major - 2 * minor * step) // (2 * major)))
+            if dx >= dy:
+                return x1 + sx * step, y1 + sy * other
+            return x1 + sx * other, y1 + sy * step
+
+        def past_edge(step: int) -> bool:
+            x, y = cell(step)
+            return x >= self.width or y >= self.height
+
+        def entered(step: int) -> bool:
+            x, y = cell(step)
+            return (x >= 0 or sx < 0) and (y >= 0 or sy < 0)
+
+        def left(step: int) -> bool:
+            x, y = cell(step)
+            return x < 0 or y < 0
+
+        # the line stops as soon as it steps past the right or bottom edge
+        if x1 >= self.width or y1 >= self.height:
+            return None
+        steps = range(major + 1)
+        end = bisect_left(steps, True, key=past_edge)
+
+        # cells above or left of the screen are skipped. x and y only move one way, so what's left is a range
+        first = bisect_left(steps, True, hi=end, key=entered)
+        last = bisect_left(steps, True, lo=first, hi=end, key=left) - 1
+        if first > last:
+            return None
+        return (first, last, *cell(first))
+
+    def __clip_axis_line(
+        self, x1: int, y1: int, x2: int, y2: int
+    ) -> Tuple[int, int, int, int, int] | None:
+        """
+        Returns the part of a horizontal or vertical line that `draw_line` would draw,
+        as (x1, y1, x2, y2, pattern offset), or None if nothing would be drawn.
+        """
+        if y1 == y2:
+            start, end, limit, fixed, fixed_limit = x1, x2, self.width, y1, self.height
+        else:
+            start, end, limit, fixed, fixed_limit = y1, y2, self.height, x1, self.width
+
+        # the line stops as soon as it steps past the right or bottom edge
+        if not 0 <= fixed < fixed_limit or start >= limit:
+            return None
 
-            c += 1
+        if start <= end:
+            first, last = max(start, 0), min(end, limit - 1)
+            if first > last:
+                return None
+        else:
+            first, last = start, max(end, 0)
+            if first < last:
+                return None
+
+        if y1 == y2:
+            return first, fixed, last, fixed, abs(first - start)
+        return fixed, first, fixed, last, abs(first - start)
 
     def draw_str(
         self,
@@ -314,6 +1210,9 @@ Set no_terminal_bound to be True if you want to make display bigger than the ter
         ellipsis: dict = {},
         indent: int = 0,
         calc_only: bool = False,
+        fg=None,
+        bg=None,
+        attr=None,
     ) -> dict:
         """
         Draws a string or a list of string to the screen.
@@ -341,6 +1240,7 @@ Set no_terminal_bound to be True if you want to make display bigger than the ter
             - `screen edge`: Only draw if the text intersect the bottom of the screen.
         - `indent`: Amount of space added before every line. Only work if anchoured on left. See `foward`.
         - `calc_only`: Disable drawing onto screen, and only return result of the method.
+        - `fg`, `bg`, `attr`: Style of the drawn characters. Needs a display made with `color`. See `paint`.
 
         ### Return
         Return a dictonary which consist of 4 integer that corespond to left, top, right, bottom side of bordering text,
@@ -350,56 +1250,179 @@ Set no_terminal_bound to be True if you want to make display bigger than the ter
         Any control characters will be removed from the string. \n
         The text will be splited on `\\n`.\n
         the text will be splitted on new line and then splitted again using warp.
-        Indent is added after the text is cleaned
+        Indent is added after the text is cleaned \n
+        Widths are counted in columns: a wide character (CJK, emoji) takes two cells, the second holding
+        `WIDE_CONTINUATION`, and combining characters are composed or dropped. A wide character cut by an edge becomes a space.
         """
 
         """
-        helper function ----------------------------------------------------------------------------------------------
+        validation ---------------------------------------------------------------------------------------------------
         """
+        # turn str into list for easier processing
+        text = [text] if isinstance(text, str) else text
 
-        # max width --------------------------------------------------------------------------------------------------
-        def apply_max_width(text: list, width: int, preserve: bool):
-            text = (
-                [smart_wrap(line, width) for line in text]  # smart warp
-                if preserve
-                else [  # basic cut
-                    helper_function.chunk_split(line, width) for line in text
-                ]
+        if not self.__trusted():
+            self.__validate_str(
+                x,
+                y,
+                text,
+                max_width,
+                max_line,
+                edge_of_screen,
+                text_mask,
+                mask_limit_text,
+                foward,
+                ellipsis,
+                indent,
             )
 
-            # smart warp turn empty string into empty list. change it back to str
-            text = [word if word != [] else [""] for word in text]
-
-            text = helper_function.flatten_list(text)
-            return text
+        preserve_width = isinstance(max_width, str)
+        if preserve_width:
+            max_width = int(max_width.removeprefix("preserve-"))
 
-        def apply_ellipsis(line: str, symbol: str, count: int):
-            if count > len(line):
-                return symbol * len(line)
-            else:
-                return line[:-count] + symbol * count
-
-        def apply_advance_ellipsis():
-            if not foward["action"] and foward["preserve"]:
-                text[-1] = (
-                    ellipsis["symbol"] * ellipsis["count"]
-                    + text[-1][ellipsis["count"] :]
-                    if len(text[-1]) >= ellipsis["count"]
-                    else ellipsis["symbol"] * len(text[-1])
-                )
-            else:
-                text[-1] = apply_ellipsis(
-                    text[-1], ellipsis["symbol"], ellipsis["count"]
-                )
+        foward.setdefault("action", True)
+        foward.setdefault("preserve", False)
+        foward.setdefault("anchour", "left")
 
-            # print("a", text, len(text[-1]) ,"<=", ellipsis["count"])
+        if ellipsis != {}:
+            ellipsis.setdefault("at", "all")
 
         """
-        validation ---------------------------------------------------------------------------------------------------
+        processing ---------------------------------------------------------------------------------------------------
         """
-        # coordinate -------------------------------------------------------------------------------------------------
+        # layout only depends on the arguments and the space around x, y. see _layout_text
+        text, viewed_text = self.__layout_text(
+            tuple(text),
+            max_width,
+            preserve_width,
+            edge_of_screen,
+            # text right of the screen (trusted) wraps at one column, and gets clipped
+            max(self.width - x, 1) if edge_of_screen != "default" else 0,
+            max_line,
+            tuple(sorted(foward.items())),
+            tuple(sorted(ellipsis.items())),
+            indent,
+            self.height - y if ellipsis.get("at") in ["all", "screen edge"] else 0,
+        )
+
+        """
+        printing -----------------------------------------------------------------------------------------------------
+        """
+
+        row_offset = 0
+        max_line_length = max(map(len, text), default=0)
+        result = {
+            "edge": [
+                (
+                    x - 1
+                    if foward["action"] or foward["anchour"] == "right"
+                    else x - max_line_length
+                ),  # Left edge
+                y - 1,  # Top edge
+                (
+                    x + max_line_length
+                    if foward["action"] or foward["anchour"] == "right"
+                    else x + 1
+                ),  # Right edge
+                y + len(text),  # Bottom edge
+            ],
+            "text": list(viewed_text),
+        }
+
+        if calc_only:
+            return result
+
+        # nothing lands on the screen (trusted mode lets y be anywhere)
+        if y >= self.height or y + len(text) <= 0:
+            return result
+
+        cell_style = None
+        if fg is not None or bg is not None or attr is not None:
+            cell_style = self.__parse_style(fg, bg, attr)
+
+        if self.track_damage:
+            edge = result["edge"]
+            self.add_damage(edge[0] + 1, edge[1] + 1, edge[2] - 1, edge[3] - 1)
+
+        content, width, height = self.content, self.width, self.height
+        put_span, sequence = self.storage.put_span, self.storage.sequence
+        action = foward["action"]
+        for line in text:
+            target_y = y + row_offset
+            row_offset += 1
+
+            # clip anything above or below the screen
+            if not 0 <= target_y < height:
+                continue
+
+            # right anchoured text is pushed by the space left on its right side
+            if foward["anchour"] == "left":
+                right_space = 0
+            elif action:
+                right_space = max_line_length - len(line)
+            else:
+                right_space = max_line_length - 1
+
+            # clip left and right once: the characters of the line that land on the screen are first to last.
+            # a line never goes further than the screen's width from x, whatever way it's drawn
+            start = x + right_space
+            if action:
+                first = -start if start < 0 else 0
+                last = width - start - 1  # right_space isn't negative, so not past width - x either
+            else:
+                first = start - width + 1 if start >= width else 0
+                last = start if start < width - x else width - x - 1
+            if last >= len(line):
+                last = len(line) - 1
+            if first > last:
+                continue
+
+            # without masks the characters go in as one span, unless there's only one
+            if text_mask == "" and mask_limit_text == "" and first < last:
+                if action:
+                    left, cells = start + first, line[first : last + 1]
+                else:
+                    left, cells = start - last, line[first : last + 1][::-1]
+                put_span(content, left, target_y, sequence(cells))
+                if cell_style is not None:
+                    self.planes.paint(left, target_y, left + len(cells) - 1, target_y, cell_style)
+                continue
+
+            step = 1 if action else -1
+            row = content[target_y]
+            for column_offset in range(first, last + 1):
+                char = line[column_offset]
+                if char in text_mask and text_mask != "":
+                    continue
+
+                target_x = start + step * column_offset
+                if mask_limit_text == "" or row[target_x] in mask_limit_text:
+                    row[target_x] = char
+                    if cell_style is not None:
+                        self.planes.set(target_x, target_y, cell_style)
+
+        return result
+
+    def __validate_str(
+        self,
+        x: int,
+        y: int,
+        text: list[str],
+        max_width: int | str,
+        max_line: int,
+        edge_of_screen: str,
+        text_mask: Character | str,
+        mask_limit_text: Character | str,
+        foward: dict,
+        ellipsis: dict,
+        indent: int,
+    ) -> None:
+        """
+        Validates the parametres of `draw_str`. Raises ValueError on the first invalid one.
+        """
+        # coordinate -------------------------------------------------------------------------------------------------
         if (
-            not handler.is_valid_position(Position(x, y), (self.width, self.height))
+            not self.rect.contains(x, y)
             and x >= 0  # allow x and y to be above and left of screen
             and y >= 0
         ):
@@ -409,9 +1432,6 @@ Set no_terminal_bound to be True if you want to make display bigger than the ter
 
         # text -------------------------------------------------------------------------------------------------------
 
-        # turn str into list for easier processing
-        text = [text] if isinstance(text, str) else text
-
         # if isinstance(text, list):
         if text != helper_function.flatten_list(text):
             raise ValueError(
@@ -427,7 +1447,6 @@ If your text somehow is a nested list, then maybe it's the time to rethink your
                     )
 
         # max width --------------------------------------------------------------------------------------------------
-        preserve_width = False
 
         # Check if max_width is an integer
         if isinstance(max_width, int):
@@ -435,8 +1454,7 @@ If your text somehow is a nested list, then maybe it's the time to rethink your
         # Check if max_width is a valid string with "preserve-<width>"
         elif isinstance(max_width, str) and max_width.startswith("preserve-"):
             try:
-                max_width = int(max_width.removeprefix("preserve-"))
-                preserve_width = True
+                int(max_width.removeprefix("preserve-"))
             except ValueError:
                 raise ValueError(
                     f"Invalid max_width value of {max_width!r}. Expected integer or a string of 'preserve-<width>'."
@@ -511,10 +1529,6 @@ If your text somehow is a nested list, then maybe it's the time to rethink your
                         f"Parameter foward expected 1 key, with key of 'action' and type value of bool"
                     )
 
-        foward.setdefault("action", True)
-        foward.setdefault("preserve", False)
-        foward.setdefault("anchour", "left")
-
         # ellipsis ---------------------------------------------------------------------------------------------------
 
         if ellipsis != {}:
@@ -537,9 +1551,9 @@ If your text somehow is a nested list, then maybe it's the time to rethink your
                     if key == "symbol":
                         Character(value)
 
-                        if not value.isprintable():
+                        if not value.isprintable() or char_width.char_width(value) != 1:
                             raise ValueError(
-                                f"Invalid 'symbol' value in ellipsis. Expected printable character, got {value!r}."
+                                f"Invalid 'symbol' value in ellipsis. Expected printable character one column wide, got {value!r}."
                             )
 
                     elif key == "count":
@@ -562,8 +1576,6 @@ If your text somehow is a nested list, then maybe it's the time to rethink your
                                 f"Invalid 'at' value in ellipsis. Expected 'all', 'max line', or 'screen edge', got {value!r}."
                             )
 
-            ellipsis.setdefault("at", "all")
-
         # masking ----------------------------------------------------------------------------------------------------
 
         if text_mask != "":
@@ -597,146 +1609,6 @@ If your text somehow is a nested list, then maybe it's the time to rethink your
                     f"Invalid indent value of {indent!r}. Expected non-negative int, got {indent!r}."
                 )
 
-        """
-        processing ---------------------------------------------------------------------------------------------------
-        """
-        # cleaning ---------------------------------------------------------------------------------------------------
-
-        text = helper_function.flatten_list([line.split("\n") for line in text])
-        text = ["".join([char for char in line if char.isprintable()]) for line in text]
-
-        # indent -----------------------------------------------------------------------------------------------------
-        if indent:
-            text = [
-                (
-                    (" " * indent) + line
-                    if foward["anchour"] == "left" and line != ""
-                    else line
-                )
-                for line in text
-            ]
-
-        # max width --------------------------------------------------------------------------------------------------
-        if max_width:
-            text = apply_max_width(text, max_width, preserve_width)
-
-        # edge of screen ---------------------------------------------------------------------------------------------
-        if edge_of_screen != "default":
-            write_space = self.width - x
-            if edge_of_screen == "newline":
-                text = apply_max_width(text, write_space, False)
-            else:
-                text = apply_max_width(text, write_space, True)
-
-        # max line ---------------------------------------------------------------------------------------------------
-        old_text = text
-        if max_line:
-            text = text[:max_line]
-
-        # foward -----------------------------------------------------------------------------------------------------
-
-        viewed_text = text
-        # print(foward)
-        if foward != {}:
-            if not foward["action"]:
-                # text reversed
-                if foward["preserve"]:
-                    text = [line[::-1] for line in text]
-                else:
-                    viewed_text = [line[::-1] for line in viewed_text]
-
-        # ellipsis ---------------------------------------------------------------------------------------------------
-        if ellipsis != {}:
-            # print(text)
-            if ellipsis["at"] in ["all", "max line"] and len(text) < len(old_text):
-                apply_advance_ellipsis()
-
-            elif (
-                ellipsis["at"] in ["all", "screen edge"] and y + len(text) > self.height
-            ):
-                # write ellipsis on the line where it touches the edge
-                last_line_index = len(text) - (y + len(text) - self.height)
-                text = text[:last_line_index]
-
-                apply_advance_ellipsis()
-
-        """
-        printing -----------------------------------------------------------------------------------------------------
-        """
-
-        row_offset = 0
-        max_line_length = len(max(text, key=len))
-        result = {
-            "edge": [
-                (
-                    x - 1
-                    if foward["action"] or foward["anchour"] == "right"
-                    else x - max_line_length
-                ),  # Left edge
-                y - 1,  # Top edge
-                (
-                    x + max_line_length
-                    if foward["action"] or foward["anchour"] == "right"
-                    else x + 1
-                ),  # Right edge
-                y + len(text),  # Bottom edge
-            ],
-            "text": viewed_text,
-        }
-
-        if calc_only:
-            return result
-
-        for line in text:
-
-            column_offset = 0
-            for char in line:
-                if char in text_mask and text_mask != "":
-                    column_offset += 1
-                    continue
-
-                if not self.get_char(x, y) in mask_limit_text and mask_limit_text != "":
-                    column_offset += 1
-                    continue
-
-                if x + column_offset >= self.width:
-                    break
-
-                if y + row_offset >= self.height:
-                    break
-
-                if foward["action"]:
-                    if foward["anchour"] == "left":
-                        self.content[y + row_offset][x + column_offset] = char
-
-                    else:
-                        right_space = max_line_length - len(line)
-                        self.content[y + row_offset][
-                            x + column_offset + right_space
-                        ] = char
-
-                else:
-                    if foward["anchour"] == "left":
-                        if x - column_offset < 0:
-                            column_offset += 1
-                            continue
-                        self.content[y + row_offset][x - column_offset] = char
-
-                    else:
-                        right_space = max_line_length - 1
-                        if x - column_offset + right_space < 0:
-                            column_offset += 1
-                            continue
-                        self.content[y + row_offset][
-                            x - column_offset + right_space
-                        ] = char
-
-                column_offset += 1
-
-            row_offset += 1
-
-        return result
-
     def draw_box(
         self,
         x1: int,
@@ -764,27 +1636,28 @@ If your text somehow is a nested list, then maybe it's the time to rethink your
         - `mask_limit_line`: At what the box only can be drawn on. Default is an empty string.
         """
 
-        if not isinstance(x1, int):
-            raise ValueError(f"Invalid x1 value of {x1!r}. Must be an Integer.")
+        if not self.__trusted():
+            if not isinstance(x1, int):
+                raise ValueError(f"Invalid x1 value of {x1!r}. Must be an Integer.")
 
-        if not isinstance(x2, int):
-            raise ValueError(f"Invalid x1 value of {x2!r}. Must be an Integer.")
+            if not isinstance(x2, int):
+                raise ValueError(f"Invalid x1 value of {x2!r}. Must be an Integer.")
 
-        if not isinstance(y1, int):
-            raise ValueError(f"Invalid x1 value of {y1!r}. Must be an Integer.")
+            if not isinstance(y1, int):
+                raise ValueError(f"Invalid x1 value of {y1!r}. Must be an Integer.")
 
-        if not isinstance(y2, int):
-            raise ValueError(f"Invalid x1 value of {y2!r}. Must be an Integer.")
+            if not isinstance(y2, int):
+                raise ValueError(f"Invalid x1 value of {y2!r}. Must be an Integer.")
 
-        try:
-            if isinstance(style, str) and len(style) == 1:
-                Character(style)
-            if not len(style) in [1, 2, 3, 4, 5, 8]:
-                raise ValueError
-        except ValueError:
-            raise ValueError(
-                f"Invalid style value of {style!r}. Expected 1, 2, 3, 4, 5, or 8 characters."
-            )
+            try:
+                if isinstance(style, str) and len(style) == 1:
+                    Character(style)
+                if not len(style) in [1, 2, 3, 4, 5, 8]:
+                    raise ValueError
+            except ValueError:
+                raise ValueError(
+                    f"Invalid style value of {style!r}. Expected 1, 2, 3, 4, 5, or 8 characters."
+                )
 
         # Mapping of positions to characters
         style_map = {
@@ -886,17 +1759,131 @@ If your text somehow is a nested list, then maybe it's the time to rethink your
         )  # Right
 
         corners = {"TL": (x1, y1), "BL": (x1, y2), "TR": (x2, y1), "BR": (x2, y2)}
+        corner_mask = mask_limit_line + style
 
         for corner, pos in corners.items():
-            try:
-                self.draw_char(
-                    pos[0],
-                    pos[1],
-                    style_map[corner],
-                    mask_limit_character=mask_limit_line + style,
+            if self.rect.contains(*pos) and self.content[pos[1]][pos[0]] in corner_mask:
+                self.content[pos[1]][pos[0]] = style_map[corner]
+
+    def draw_rect(
+        self,
+        x1: int,
+        y1: int,
+        x2: int,
+        y2: int,
+        character: Character | str | Iterable[str],
+        mask_limit_character: Character | str | Iterable[str] = "",
+    ) -> None:
+        """
+        Draws a filled rectangle from x1, y1 to x2, y2. Anything outside the screen is clipped.
+
+        ### Parametres
+        - `x1`: x-coordinate of first corner.
+        - `y1`: y-coordinate of first corner.
+        - `x2`: x-coordinate of second corner.
+        - `y2`: y-coordinate of second corner.
+        - `character`: What character the rectangle will be filled with. If iterable is given, then it'll be used as pattern on every row.
+        - `mask_limit_character`: At what the rectangle only can be drawn on. Default is an empty string.
+        """
+        if not self.__trusted():
+            if not isinstance(character, str) or character == "":
+                raise ValueError(
+                    f"Invalid character value of {character!r}. Expected string or character."
                 )
-            except ValueError:
-                pass
+            elif not character.isprintable():
+                raise ValueError(
+                    f"Invalid character value of {character!r}. Expected non sequence code string or character."
+                )
+
+            if mask_limit_character != "":
+                if not isinstance(mask_limit_character, str):
+                    raise ValueError(
+                        f"Invalid mask_limit_character value of {mask_limit_character!r}. Expected string or character."
+                    )
+                elif not mask_limit_character.isprintable():
+                    raise ValueError(
+                        f"Invalid mask_limit_character value of {mask_limit_character!r}. Expected non sequence code string or character."
+                    )
+
+        area = self.rect.clip(x1, y1, x2, y2)
+        if area is None:
+            return
+        left, top, right, bottom = area
+
+        if self.track_damage:
+            self.add_damage(left, top, right, bottom)
+
+        self.storage.fill_rect(
+            self.content,
+            left,
+            top,
+            right,
+            bottom,
+            character,
+            left - min(x1, x2),
+            mask_limit_character,
+        )
+
+    def paint(
+        self,
+        x1: int,
+        y1: int,
+        x2: int,
+        y2: int,
+        fg=None,
+        bg=None,
+        attr=None,
+    ) -> None:
+        """
+        Sets the style of the cells from x1, y1 to x2, y2, leaving the characters. Anything outside the screen is clipped.
+        Needs a display made with `color`.
+
+        ### Parametres
+        - `x1`, `y1`, `x2`, `y2`: Corners of the area.
+        - `fg`: Foreground color. Default is None (unchanged). A color is one of:
+            - `'default'`: The terminal's own color.
+            - `integer`: A palette index, 0 to 255.
+            - `name`: 'red', 'bright_blue'... see `style.COLORS`.
+            - `'#rrggbb'` or `(r, g, b)`: A true color.
+        - `bg`: Background color, same as `fg`.
+        - `attr`: Attributes, as a name ('bold', 'underline'...), a list of names, or a mask. 0 removes them all. Default is None (unchanged).
+        """
+        cell_style = self.__parse_style(fg, bg, attr)
+
+        area = self.rect.clip(x1, y1, x2, y2)
+        if area is None:
+            return
+
+        if self.track_damage:
+            self.add_damage(*area)
+
+        self.planes.paint(*area, cell_style)
+
+    def get_style(self, x: int, y: int) -> Tuple[int, int, int]:
+        """
+        Returns the style on x, y as fg, bg and attr, the way they are stored (see `style`).
+        """
+        if self.planes is None:
+            raise ValueError("Invalid display. The display has no color planes.")
+
+        if not self.rect.contains(x, y):
+            raise ValueError(
+                f"Invalid position. Position must be within the screen size ({x}, {y}) vs {self.width}x{self.height}."
+            )
+
+        return self.planes.get(x, y)
+
+    def __parse_style(self, fg, bg, attr) -> tuple:
+        if self.planes is None:
+            raise ValueError(
+                "Invalid style. The display has no color planes, make it with color=True."
+            )
+
+        return (
+            None if fg is None else style.parse_color(fg),
+            None if bg is None else style.parse_color(bg),
+            None if attr is None else style.parse_attributes(attr),
+        )
 
     def export_display(self, x1: int, y1: int, x2: int, y2: int) -> Display:
         """
@@ -918,32 +1905,32 @@ If your text somehow is a nested list, then maybe it's the time to rethink your
             y1, y2 = y2, y1
 
         # Check that both positions are within the screen boundaries
-        if not handler.is_valid_position(Position(x1, y1), (self.width, self.height)):
+        if not self.rect.contains(x1, y1):
             raise ValueError(
                 f"Invalid position. Position must be within the screen size ({x1}, {y1}) vs {self.width}x{self.height}."
             )
-        if not handler.is_valid_position(Position(x2, y2), (self.width, self.height)):
+        if not self.rect.contains(x2, y2):
             raise ValueError(
                 f"Invalid position. Position must be within the screen size ({x2}, {y2}) vs {self.width}x{self.height}."
             )
 
-        # Initialize a new Display for the cloned area
-        out = []
-        display = Display()
-        for yy in range(y1, y2 + 1):
-            row = []
-            for xx in range(x1, x2 + 1):
-                row.append(
-                    self.get_char(xx, yy)
-                )  # Use get_char to fetch the character at each position
-            out.append(row)
-
-        # Set the content, width, and height of the cloned display
-        display.content = out
-        display.width = len(out[0]) if out else 0
-        display.height = len(out)
+        # corners are already validated, so the view is the exact area. copy it row by row
+        return self.view(x1, y1, x2, y2).copy()
 
-        return display
+    def view(self, x1: int, y1: int, x2: int, y2: int) -> DisplayView:
+        """
+        Returns a window into the display from the specified position, that shares this display's cells.
+
+        ### Parametres
+        - `x1`: x-coordinate of first corner.
+        - `y1`: y-coordinate of first corner.
+        - `x2`: x-coordinate of second corner.
+        - `y2`: y-coordinate of second corner.
+
+        ### Return
+        Return a DisplayView object. The area is clipped to the screen.
+        """
+        return DisplayView(self, x1, y1, x2, y2)
 
     def merge_display(
         self,
@@ -955,6 +1942,7 @@ If your text somehow is a nested list, then maybe it's the time to rethink your
     ):
         """
         Merges content of a Display to this content at specified x, y coordinate.
+        The merged display is clipped on every side, so x and y may be negative.
 
         ### Parametres
         - `x`: x position on where the content of the Display will be drawn into.
@@ -963,51 +1951,188 @@ If your text somehow is a nested list, then maybe it's the time to rethink your
         - `display_mask`: What character should be skipped on drawing. Default is an empty string.
         - `mask_limit_display`: At what the content can be drawn on. Default is an empty string.
         """
-        if (
-            not handler.is_valid_position(Position(x, y), (self.width, self.height))
-            and x >= 0  # bypass minimun x and y requerment
-            and y >= 0
-        ):
-            raise ValueError(
-                f"Invalid position. Position must be within the screen size ({x}, {y}) vs {self.width}x{self.height}."
+        if not self.__trusted():
+            if (
+                not self.rect.contains(x, y)
+                and x >= 0  # bypass minimun x and y requerment
+                and y >= 0
+            ):
+                raise ValueError(
+                    f"Invalid position. Position must be within the screen size ({x}, {y}) vs {self.width}x{self.height}."
+                )
+
+            if not isinstance(display, Display):
+                raise ValueError(
+                    f"Invalid display. Expected Display, got {type(display)!r}."
+                )
+
+            if display_mask != "":
+                if not isinstance(display_mask, str):
+                    raise ValueError(
+                        f"Invalid display_mask value of {display_mask!r}. Expected string or character."
+                    )
+                elif not display_mask.isprintable():
+                    raise ValueError(
+                        f"Invalid display_mask value of {display_mask!r}. Expected non sequence code string or character."
+                    )
+
+            if mask_limit_display != "":
+                if not isinstance(mask_limit_display, str):
+                    raise ValueError(
+                        f"Invalid mask_limit_display value of {mask_limit_display!r}. Expected string or character."
+                    )
+                elif not mask_limit_display.isprintable():
+                    raise ValueError(
+                        f"Invalid mask_limit_display value of {mask_limit_display!r}. Expected non sequence code string or character."
+                    )
+
+        # clip the source on all four edges
+        source_x, source_y = max(0, -x), max(0, -y)
+        width = min(display.width - source_x, self.width - max(x, 0))
+        height = min(display.height - source_y, self.height - max(y, 0))
+        if width <= 0 or height <= 0:
+            return
+
+        source = display.storage.window(
+            display.content,
+            source_x,
+            source_y,
+            source_x + width - 1,
+            source_y + height - 1,
+        )
+
+        # styles first, masks compare against the characters before the blit
+        if self.planes is not None:
+            self.__merge_planes(
+                display,
+                source_x,
+                source_y,
+                width,
+                height,
+                max(x, 0),
+                max(y, 0),
+                display_mask,
+                mask_limit_display,
             )
 
-        if not isinstance(display, Display):
-            raise ValueError(
-                f"Invalid display. Expected Display, got {type(display)!r}."
+        # a numpy display blits another one array to array, everything else goes line by line
+        if not (self.storage.vectorized and display.storage is self.storage):
+            source = [display.storage.row_text(row) for row in source]
+
+        self.storage.blit(
+            self.content,
+            source,
+            max(x, 0),
+            max(y, 0),
+            display_mask,
+            mask_limit_display,
+        )
+
+        if self.track_damage:
+            self.add_damage(
+                max(x, 0), max(y, 0), max(x, 0) + width - 1, max(y, 0) + height - 1
             )
 
-        if display_mask != "":
-            if not isinstance(display_mask, str):
-                raise ValueError(
-                    f"Invalid display_mask value of {display_mask!r}. Expected string or character."
+    def __merge_planes(
+        self,
+        display: Display,
+        source_x: int,
+        source_y: int,
+        width: int,
+        height: int,
+        x: int,
+        y: int,
+        skip: str,
+        limit: str,
+    ) -> None:
+        """
+        Copies the styles of the cells merge_display copies. A display without color brings the default style.
+        """
+        copied = None
+        if skip != "" or limit != "":
+            copied = []
+            for row_index in range(height):
+                line = display.storage.row_text(
+                    display.content[source_y + row_index][source_x : source_x + width]
                 )
-            elif not display_mask.isprintable():
-                raise ValueError(
-                    f"Invalid display_mask value of {display_mask!r}. Expected non sequence code string or character."
+                row = self.storage.row_text(self.content[y + row_index][x : x + width])
+                copied.append(
+                    [
+                        column
+                        for column, (new, old) in enumerate(zip(line, row))
+                        if new not in skip and (limit == "" or old in limit)
+                    ]
                 )
 
-        if mask_limit_display != "":
-            if not isinstance(mask_limit_display, str):
+        if display.planes is None:
+            source = style.StylePlanes(width, height)
+        else:
+            source = display.planes.window(
+                source_x, source_y, source_x + width - 1, source_y + height - 1
+            )
+        self.planes.blit(source, x, y, copied)
+
+    def draw_sprite(self, x: int, y: int, sprite: Sprite) -> None:
+        """
+        Draws a sprite with its top left at x, y. Only its opaque cells are written, clipped on every side.
+
+        ### Parametres
+        - `x`: x position on where the sprite will be drawn into. May be negative.
+        - `y`: y position on where the sprite will be drawn into. May be negative.
+        - `sprite`: Sprite to be drawn.
+
+        ### Behavior
+        The cost is the number of opaque spans and cells, not the area of the sprite.
+        On a display with color, the cells take the sprite's styles, or the default style if it has none.
+        """
+        if not self.__trusted():
+            if not (isinstance(x, int) and isinstance(y, int)):
                 raise ValueError(
-                    f"Invalid mask_limit_display value of {mask_limit_display!r}. Expected string or character."
+                    f"Invalid position. Expected integer, got {x!r} and {y!r}."
                 )
-            elif not mask_limit_display.isprintable():
+
+            if not isinstance(sprite, Sprite):
                 raise ValueError(
-                    f"Invalid mask_limit_display value of {mask_limit_display!r}. Expected non sequence code string or character."
+                    f"Invalid sprite. Expected Sprite, got {type(sprite)!r}."
                 )
 
-        for y_index, row in enumerate(display.content):
-            try:
-                self.draw_str(
-                    x,
-                    y + y_index,
-                    "".join(row),
-                    text_mask=display_mask,
-                    mask_limit_text=mask_limit_display,
-                )
-            except ValueError:
-                break
+        top, bottom = max(0, -y), min(sprite.height, self.height - y)
+        if top >= bottom or x >= self.width or x + sprite.width <= 0:
+            return
+
+        content, width, planes = self.content, self.width, self.planes
+        put_span = self.storage.put_span
+        spans = sprite.prepared(self.storage)
+
+        for row_index in range(top, bottom):
+            target_y = y + row_index
+            for span_index, (start, values) in enumerate(spans[row_index]):
+                left = x + start
+                right = left + len(values)
+                if right <= 0 or left >= width:
+                    continue
+
+                # clip the span
+                cut_left = -left if left < 0 else 0
+                if cut_left or right > width:
+                    values = values[cut_left : width - left]
+                    left += cut_left
+                    right = left + len(values)
+
+                put_span(content, left, target_y, values)
+
+                if planes is not None:
+                    if sprite.styles is None:
+                        planes.paint(left, target_y, right - 1, target_y, style.DEFAULT_STYLE)
+                    else:
+                        for plane, plane_values in zip(
+                            (planes.fg, planes.bg, planes.attr),
+                            sprite.styles[row_index][span_index],
+                        ):
+                            plane[target_y][left:right] = plane_values[cut_left : cut_left + right - left]
+
+        if self.track_damage:
+            self.add_damage(x, y + top, x + sprite.width - 1, y + bottom - 1)
 
     def fill(
         self,
@@ -1016,9 +2141,11 @@ If your text somehow is a nested list, then maybe it's the time to rethink your
         character: Character,
         ignore: Character | str | Iterable[str] = "",
         neighbour: Literal[Literal[4] | Literal[8]] = 4,
-    ):
+        bounding_box: bool = False,
+    ) -> Tuple[int, int, int, int] | None:
         """
-        floods fill using Breadth-First Search algorithm
+        floods fill using scanline algorithm. Whole runs of a row are filled at once,
+        and only the spans left to scan are remembered.
 
         ### Parametres
         - `x`: x position on where the content of the Display will be drawn into.
@@ -1028,55 +2155,685 @@ If your text somehow is a nested list, then maybe it's the time to rethink your
         - `neighbour`: How many neighbours need to be checked.
             - 4: Only the side.
             - 8: All the side including the corner.
+        - `bounding_box`: Return the area that got filled.
+
+        ### Return
+        Return None, or the filled area as (x1, y1, x2, y2) if `bounding_box` is True (None if nothing got filled).
         """
 
-        Character(character)
+        if not self.__trusted():
+            Character(character)
 
-        if ignore != "":
-            if not isinstance(ignore, str):
-                raise ValueError(
-                    f"Invalid ignore value of {ignore!r}. Expected string or character."
-                )
-            elif not ignore.isprintable():
+            if ignore != "":
+                if not isinstance(ignore, str):
+                    raise ValueError(
+                        f"Invalid ignore value of {ignore!r}. Expected string or character."
+                    )
+                elif not ignore.isprintable():
+                    raise ValueError(
+                        f"Invalid ignore value of {ignore!r}. Expected non sequence code string or character."
+                    )
+
+            if not neighbour in [4, 8]:
                 raise ValueError(
-                    f"Invalid ignore value of {ignore!r}. Expected non sequence code string or character."
+                    f"Invalid neighbour value of {neighbour!r}. Expected 4 or 8."
                 )
 
-        if not neighbour in [4, 8]:
-            raise ValueError(
-                f"Invalid neighbour value of {neighbour!r}. Expected 4 or 8."
-            )
+        elif not self.rect.contains(x, y):
+            return  # clipped
 
         target = "".join([self.content[y][x], ignore])
         if character in target:
             return  # No action if the cell is already the target character
 
-        queue = deque([(y, x)])
+        target = set(target)
+        content = self.content
+        width, height = self.width, self.height
+        reach = 1 if neighbour == 8 else 0  # 8-neighbour also checks the diagonal of a span
+        left, top, right, bottom = x, y, x, y
+
+        # spans of (x1, x2, y) to look for fillable runs in
+        stack = [(x, x, y)]
+
+        while stack:
+            x1, x2, cy = stack.pop()
+            if not 0 <= cy < height:
+                continue
+
+            row = content[cy]
+            cx = max(x1 - reach, 0)
+            scan_end = min(x2 + reach, width - 1)
+
+            while cx <= scan_end:
+                if row[cx] not in target:
+                    cx += 1
+                    continue
+
+                # grow the run both ways, past the scanned span if need be
+                run_start = cx
+                while run_start > 0 and row[run_start - 1] in target:
+                    run_start -= 1
+                run_end = cx
+                while run_end < width - 1 and row[run_end + 1] in target:
+                    run_end += 1
+
+                # filled cells are no longer in target, so they are never scanned again
+                self.storage.draw_span(
+                    content, run_start, cy, run_end, cy, character, 0, ""
+                )
+                stack.append((run_start, run_end, cy - 1))
+                stack.append((run_start, run_end, cy + 1))
+
+                left, right = min(left, run_start), max(right, run_end)
+                top, bottom = min(top, cy), max(bottom, cy)
+                cx = run_end + 2
+
+        if self.track_damage:
+            self.add_damage(left, top, right, bottom)
 
-        # 4-directional neighbors (up, down, left, right)
-        directions = (
-            [(-1, 0), (1, 0), (0, -1), (0, 1)]
-            if neighbour == 4
-            else [(-1, 0), (1, 0), (0, -1), (0, 1), (-1, 1), (1, 1), (-1, -1), (1, -1)]
+        if bounding_box:
+            return left, top, right, bottom
+
+
+class DisplayView(Display):
+
+    def __init__(self, parent: Display, x1: int, y1: int, x2: int, y2: int) -> None:
+        """
+        A window into a Display. It has the same drawing methods as a Display, with the coordinate
+        translated to the window's top left corner and everything clipped to the window.
+        Drawing onto the view draws onto the parent, nothing is copied. Use `copy` to get a detached Display.
+
+        ### Parametres
+        - `parent`: The display the view looks into.
+        - `x1`: x-coordinate of first corner, in the parent's coordinate.
+        - `y1`: y-coordinate of first corner, in the parent's coordinate.
+        - `x2`: x-coordinate of second corner, in the parent's coordinate.
+        - `y2`: y-coordinate of second corner, in the parent's coordinate.
+        """
+        if not isinstance(parent, Display):
+            raise ValueError(f"Invalid parent. Expected Display, got {type(parent)!r}.")
+
+        # clip to the parent
+        area = parent.rect.clip(x1, y1, x2, y2)
+        if area is None:
+            raise ValueError(
+                f"Invalid view. The area must overlap the screen size ({x1}, {y1}, {x2}, {y2}) vs {parent.width}x{parent.height}."
+            )
+        x1, y1, x2, y2 = area
+
+        self.parent = parent
+        self.x = x1
+        self.y = y1
+
+        self.default_fill = parent.default_fill
+        self.terminal_width = parent.terminal_width
+        self.terminal_height = parent.terminal_height
+        self.width = x2 - x1 + 1
+        self.height = y2 - y1 + 1
+        self.rect = Rect.from_size(self.width, self.height)
+
+        self.validation = parent.validation
+        self.double_buffer = False
+        self.front_buffer = None
+        self.damage = []
+        self.synchronized_output = parent.synchronized_output
+        self.stats = None
+        self.planes = (
+            None if parent.planes is None else parent.planes.window(x1, y1, x2, y2)
         )
 
-        while queue:
-            cy, cx = queue.popleft()
+        self.storage = parent.storage
+        self.content = self.storage.window(parent.content, x1, y1, x2, y2)
+
+    @property
+    def track_damage(self) -> bool:
+        return self.parent.track_damage
+
+    def add_damage(self, x1: int, y1: int, x2: int, y2: int) -> None:
+        """
+        Marks the area from x1, y1 to x2, y2 of the view as changed, on the parent display.
+        The area is clipped to the view.
+        """
+        area = self.rect.clip(x1, y1, x2, y2)
+        if area is not None:
+            x1, y1, x2, y2 = area
+            self.parent.add_damage(x1 + self.x, y1 + self.y, x2 + self.x, y2 + self.y)
+
+    def __str__(self):
+        return f"DisplayView object: {self.width}x{self.height} at ({self.x}, {self.y}) of {self.parent}"
+
+    def copy(self) -> Display:
+        """
+        Returns a detached Display with the content of the view.
+        """
+        display = Display(
+            self.width,
+            self.height,
+            self.default_fill,
+            no_terminal_bound=True,
+            storage=self.storage.name,
+            validation=self.validation,
+        )
+        display.content = self.storage.copy(self.content)
+        if self.planes is not None:
+            display.planes = self.planes.copy()
+
+        return display
+
+
+class TextView:
+
+    def __init__(
+        self,
+        text: str = "",
+        path: str | None = None,
+        edge_of_screen: Literal["default", "newline", "preserve"] = "preserve",
+        indent: int = 0,
+        ellipsis: dict = {},
+        follow: bool = False,
+        margin: int = 8,
+        max_lines: int = 0,
+        encoding: str = "utf-8",
+    ) -> None:
+        """
+        A scrollable view of a text too big to lay out at once, like a log. Only the lines around
+        the viewport are read and wrapped, so a frame costs the same whatever the size of the text.
+
+        ### Parametres
+        - `text`: Starting text of a view kept in memory. More is added with `append`.
+        - `path`: Show a file instead. It is read on demand, and may grow while shown (see `follow`).
+        - `edge_of_screen`: What lines longer than the view do, like `draw_str`.
+            - `default`: Get cut at the edge, with `ellipsis` if given.
+            - `newline`: Countinue on the next row.
+            - `preserve`: Countinue on the next row while also preserving the word.
+        - `indent`: Amount of space added before every line, like `draw_str`.
+        - `ellipsis`: With `default`, a dict of `{'symbol': Character, 'count': int > 0}` ending the lines that got cut.
+        - `follow`: Keep the end of the text at the bottom of the view, like `tail -f`.
+        - `margin`: Lines kept wrapped above and under the viewport, so scrolling a little doesn't wrap again.
+        - `max_lines`: Lines kept at most by a view in memory, the oldest are dropped. 0 keeps everything.
+        - `encoding`: Encoding of the file.
 
-            # Fill the cell with the new character
-            self.content[cy][cx] = character
+        ### Behavior
+        Scrolling up stops following, scrolling back to the end follows again. \n
+        Tabs are expanded, other control characters are removed like in `draw_str`.
+        """
+        if edge_of_screen not in ["default", "newline", "preserve"]:
+            raise ValueError(
+                f"Invalid edge_of_screen value of {edge_of_screen!r}. Expected 'default', 'newline', or 'preserve'."
+            )
+        if not isinstance(indent, int) or indent < 0:
+            raise ValueError(
+                f"Invalid indent value of {indent!r}. Expected non-negative int."
+            )
+        if ellipsis != {} and (
+            set(ellipsis) != {"symbol", "count"}
+            or not isinstance(ellipsis["symbol"], str)
+            or len(ellipsis["symbol"]) != 1
+            or char_width.string_width(ellipsis["symbol"]) != 1
+            or not isinstance(ellipsis["count"], int)
+            or ellipsis["count"] <= 0
+        ):
+            raise ValueError(
+                f"Invalid ellipsis value of {ellipsis!r}. Expected {{'symbol': Character, 'count': int > 0}}."
+            )
+        if not isinstance(margin, int) or margin < 0:
+            raise ValueError(
+                f"Invalid margin value of {margin!r}. Expected non-negative int."
+            )
+
+        if path is not None:
+            if text:
+                raise ValueError("Invalid text. A view of a file can't have a starting text.")
+            self.source = line_source.FileLines(path, encoding)
+        else:
+            self.source = line_source.MemoryLines(max_lines)
+            self.source.append(text)
+
+        self.edge_of_screen = edge_of_screen
+        self.indent = indent
+        self.ellipsis = dict(ellipsis)
+        self.follow = follow
+        self.margin = margin
+
+        # scroll position: the first line shown, and the first of its rows shown
+        self.top_line = 0
+        self.top_row = 0
+
+        # wrapped rows of the lines around the viewport, for the width they were wrapped to
+        self.width = 0
+        self.height = 1
+        self.__rows = {}
+
+    def __str__(self):
+        return f"TextView object: line {self.top_line} of {self.source.line_count()} | follow: {self.follow}"
+
+    def append(self, text: str) -> None:
+        """
+        Adds text at the end of a view kept in memory.
+        """
+        if not isinstance(self.source, line_source.MemoryLines):
+            raise ValueError("Invalid append. The view shows a file, write to the file instead.")
 
-            # Check all 4 neighbors
-            for dy, dx in directions:
-                ny, nx = cy + dy, cx + dx
+        self.source.append(text)
 
-                # Check if the neighboring cell is within bounds and has the original character
-                if (
-                    0 <= ny < len(self.content)
-                    and 0 <= nx < len(self.content[0])
-                    and self.content[ny][nx] in target
-                ):
+    def close(self) -> None:
+        if isinstance(self.source, line_source.FileLines):
+            self.source.close()
 
-                    # Mark the cell with the new character immediately to prevent re-adding it
-                    self.content[ny][nx] = character
-                    queue.append((ny, nx))
+    # layout ------------------------------------------------------------------------------------------------------
+
+    FOWARD = (("action", True), ("anchour", "left"), ("preserve", False))  # as draw_str fills it in
+
+    def __wrap(self, line: str) -> tuple:
+        """
+        Returns the rows of one line, laid out like `draw_str` would at the view's width.
+        """
+        line = line.expandtabs()
+        width = self.width
+        if self.edge_of_screen == "default":
+            (cells,), _ = _layout_text(
+                (line,), 0, False, "default", 0, 0, self.FOWARD, (), self.indent, 0
+            )
+            if len(cells) > width:
+                cells = cells[:width]
+                if self.ellipsis:
+                    count = min(self.ellipsis["count"], width)
+                    cells = cells[: width - count] + self.ellipsis["symbol"] * count
+                cells = char_width.fit_cells(cells)
+            return (cells.replace(char_width.WIDE_CONTINUATION, ""),)
+
+        _, rows = _layout_text(
+            (line,),
+            width,
+            self.edge_of_screen == "preserve",
+            "default",
+            0,
+            0,
+            self.FOWARD,
+            (),
+            self.indent,
+            0,
+        )
+        return rows or ("",)
+
+    def __line_rows(self, line: int) -> tuple | None:
+        """
+        Returns the rows of a line, or None if the text ends before it.
+        """
+        rows = self.__rows.get(line)
+        if rows is None:
+            # read the lines around too, scrolling either way wants them next
+            start = max(self.source.first_line(), line - self.margin)
+            texts = self.source.get_lines(start, line - start + self.height + self.margin + 1)
+            for number, text in enumerate(texts, start):
+                if number not in self.__rows:
+                    self.__rows[number] = self.__wrap(text)
+            rows = self.__rows.get(line)
+        return rows
+
+    def __bottom(self) -> Tuple[int, int]:
+        """
+        Returns the scroll position that puts the end of the text at the bottom of the view.
+        """
+        first = self.source.first_line()
+        line = self.source.line_count() - 1
+        space = self.height
+        while line >= first:
+            count = len(self.__line_rows(line))
+            if count >= space:
+                return line, count - space
+            space -= count
+            line -= 1
+        return first, 0
+
+    def __refresh(self) -> None:
+        # the unterminated last line may have gotten longer. only the last line read can be it:
+        # a line followed by another one is complete
+        if self.source.refresh() and self.__rows:
+            del self.__rows[max(self.__rows)]
+
+    def __set_size(self, width: int, height: int) -> None:
+        if width != self.width:
+            self.__rows.clear()
+            self.top_row = 0  # the rows of the top line changed, keep the line
+        self.width, self.height = width, height
+
+    # scrolling ---------------------------------------------------------------------------------------------------
+
+    def scroll(self, rows: int) -> None:
+        """
+        Scrolls down by rows (up if negative), rows being the wrapped rows as shown. Stops at both ends.
+        """
+        if not isinstance(rows, int):
+            raise ValueError(f"Invalid rows value of {rows!r}. Expected integer.")
+
+        self.__refresh()
+        line, row = max(self.top_line, self.source.first_line()), self.top_row
+        if rows < 0:
+            self.follow = False
+            row += rows
+            while row < 0 and line > self.source.first_line():
+                line -= 1
+                row += len(self.__line_rows(line) or ("",))
+            self.top_line, self.top_row = line, max(row, 0)
+            return
+
+        row += rows
+        while True:
+            line_rows = self.__line_rows(line)
+            if line_rows is None or row < len(line_rows):
+                break
+            row -= len(line_rows)
+            line += 1
+
+        # past the end, or too close to it to fill the view: the end goes at the bottom
+        below, after = -row, line
+        while below <= self.height:
+            line_rows = self.__line_rows(after)
+            if line_rows is None:
+                break
+            below += len(line_rows)
+            after += 1
+        if below <= self.height:
+            line, row = self.__bottom()
+            self.follow = True
+        self.top_line, self.top_row = line, row
+
+    def scroll_to(self, line: int) -> None:
+        """
+        Shows the line at the top of the view, and stops following.
+        """
+        if not isinstance(line, int):
+            raise ValueError(f"Invalid line value of {line!r}. Expected integer.")
+
+        self.follow = False
+        self.top_line, self.top_row = max(line, self.source.first_line()), 0
+
+    def scroll_to_end(self) -> None:
+        """
+        Shows the end of the text, and follows it from now on.
+        """
+        self.follow = True
+
+    # drawing -----------------------------------------------------------------------------------------------------
+
+    def visible_rows(self, width: int, height: int) -> list[str]:
+        """
+        Returns the rows shown by a view of that size, from the current scroll position.
+        Only the lines on them (and the margin) are read and wrapped.
+        """
+        if not isinstance(width, int) or not isinstance(height, int) or width < 1 or height < 1:
+            raise ValueError(
+                f"Invalid view size of {width!r}x{height!r}. Expected integer above zero."
+            )
+
+        self.__set_size(width, height)
+        self.__refresh()
+        first = self.source.first_line()
+        if self.follow:
+            self.top_line, self.top_row = self.__bottom()
+        elif self.top_line < first:
+            self.top_line, self.top_row = first, 0
+
+        rows = []
+        line, skip = self.top_line, self.top_row
+        while len(rows) < height:
+            line_rows = self.__line_rows(line)
+            if line_rows is None:
+                break
+            rows.extend(line_rows[skip:])
+            skip = 0
+            line += 1
+
+        # forget the rows that scrolled out of the margin
+        low, high = self.top_line - self.margin, line + self.margin
+        for cached in [cached for cached in self.__rows if not low <= cached <= high]:
+            del self.__rows[cached]
+
+        return rows[:height]
+
+    def draw(
+        self, display: Display, x1: int, y1: int, x2: int, y2: int, fg=None, bg=None, attr=None
+    ) -> dict:
+        """
+        Draws the view on the display, in the rectangle from x1, y1 to x2, y2. Rows under the text are blank.
+
+        ### Parametres
+        - `display`: Display the view is drawn on.
+        - `x1`, `y1`, `x2`, `y2`: Corners of the view on the display.
+        - `fg`, `bg`, `attr`: Style of the text, see `draw_str`.
+
+        ### Return
+        What `draw_str` returns for the rows drawn.
+        """
+        if x1 > x2:
+            x1, x2 = x2, x1
+        if y1 > y2:
+            y1, y2 = y2, y1
+
+        width, height = x2 - x1 + 1, y2 - y1 + 1
+        rows = self.visible_rows(width, height)
+        # pad every row to the width, so the whole rectangle is overwritten
+        rows = [row + " " * (width - char_width.string_width(row)) for row in rows]
+        rows.extend([" " * width] * (height - len(rows)))
+
+        return display.draw_str(x1, y1, rows, fg=fg, bg=bg, attr=attr)
+
+
+class Layer:
+    def __init__(
+        self, name: str, display: Display, z: int, x: int, y: int, transparent: str
+    ) -> None:
+        """
+        A layer of a Compositor. Use `Compositor.add_layer` to create one.
+
+        ### Parametres
+        - `name`: Name of the layer.
+        - `display`: The display the layer is drawn on.
+        - `z`: Stacking order. Higher z is drawn over lower z.
+        - `x`: x-coordinate of the layer on the composed frame.
+        - `y`: y-coordinate of the layer on the composed frame.
+        - `transparent`: Character of the layer that shows the layers under it. Empty string for an opaque layer.
+        """
+        self.name = name
+        self.display = display
+        self.z = z
+        self.x = x
+        self.y = y
+        self.transparent = transparent
+        self.visible = True
+
+    def __str__(self):
+        return f"Layer object: {self.name!r} z={self.z} at ({self.x}, {self.y}) | {self.display}"
+
+    def area(self) -> Tuple[int, int, int, int]:
+        """
+        Returns the area the layer covers on the composed frame, as (x1, y1, x2, y2).
+        """
+        return (
+            self.x,
+            self.y,
+            self.x + self.display.width - 1,
+            self.y + self.display.height - 1,
+        )
+
+
+class Compositor:
+
+    def __init__(
+        self,
+        width: int | Literal["full"] = "full",
+        height: int | Literal["full"] = "full",
+        default_fill=" ",
+        no_terminal_bound: bool = False,
+        storage: Literal["list", "array", "numpy"] = "list",
+        double_buffer: bool = False,
+        color: bool = False,
+    ) -> None:
+        """
+        A stack of layers composed into a single Display.
+
+        Every layer is a Display that keeps its content between frames, so static layers (borders, backgrounds)
+        are drawn once. Composing only redraws the area a layer changed since the last compose, from every layer
+        in that area, so moving a sprite doesn't cost a clear and a redraw of everything.
+
+        ### Parametres
+        - `width`, `height`, `default_fill`, `no_terminal_bound`, `storage`, `double_buffer`: Used for the composed display. See `Display`.
+        - `color`: Give the composed display and every layer color planes. See `Display`.
+        """
+        self.display = Display(
+            width,
+            height,
+            default_fill,
+            no_terminal_bound=no_terminal_bound,
+            double_buffer=double_buffer,
+            storage=storage,
+            track_damage=True,
+            color=color,
+        )
+        self.layers = []
+
+        # areas of the frame to redraw that no layer display knows about (moved, hidden, removed layers)
+        self.pending = [(0, 0, self.display.width - 1, self.display.height - 1)]
+
+    def __str__(self):
+        return f"Compositor object: {len(self.layers)} layers | {self.display}"
+
+    def add_layer(
+        self,
+        name: str,
+        z: int = 0,
+        x: int = 0,
+        y: int = 0,
+        width: int | None = None,
+        height: int | None = None,
+        transparent: Character | str = " ",
+    ) -> Display:
+        """
+        Adds a layer, and returns the display to draw the layer on.
+
+        ### Parametres
+        - `name`: Name of the layer. Must be unique.
+        - `z`: Stacking order. Higher z is drawn over lower z. Layers with the same z stack in the order they were added.
+        - `x`: x-coordinate of the layer on the composed frame.
+        - `y`: y-coordinate of the layer on the composed frame.
+        - `width`: Width of the layer. Default is None (the width of the frame).
+        - `height`: Height of the layer. Default is None (the height of the frame).
+        - `transparent`: Character of the layer that shows the layers under it. Empty string for an opaque layer.
+        A transparent layer starts filled with it.
+        """
+        if any(layer.name == name for layer in self.layers):
+            raise ValueError(f"Invalid name value of {name!r}. Layer already exists.")
+
+        if transparent != "":
+            Character(transparent)
+
+        display = Display(
+            self.display.width if width is None else width,
+            self.display.height if height is None else height,
+            transparent or self.display.default_fill,
+            no_terminal_bound=True,
+            storage=self.display.storage.name,
+            track_damage=True,
+            color=self.display.planes is not None,
+        )
+
+        layer = Layer(name, display, z, x, y, transparent)
+        self.layers.append(layer)
+        self.layers.sort(key=lambda layer: layer.z)  # stable, so same z keeps adding order
+        self.pending.append(layer.area())
+
+        return display
+
+    def get_layer(self, name: str) -> Layer:
+        """
+        Returns the layer with the specified name.
+        """
+        for layer in self.layers:
+            if layer.name == name:
+                return layer
+
+        raise ValueError(f"Invalid name value of {name!r}. No such layer.")
+
+    def remove_layer(self, name: str) -> None:
+        """
+        Removes the layer with the specified name.
+        """
+        layer = self.get_layer(name)
+        self.layers.remove(layer)
+        self.pending.append(layer.area())
+
+    def move_layer(self, name: str, x: int, y: int) -> None:
+        """
+        Moves the layer with the specified name to x, y of the composed frame.
+        """
+        layer = self.get_layer(name)
+        self.pending.append(layer.area())
+        layer.x, layer.y = x, y
+        self.pending.append(layer.area())
+
+    def set_visible(self, name: str, visible: bool) -> None:
+        """
+        Shows or hides the layer with the specified name.
+        """
+        layer = self.get_layer(name)
+        if layer.visible != visible:
+            layer.visible = visible
+            self.pending.append(layer.area())
+
+    def compose(self) -> Display:
+        """
+        Redraws the area of the frame that changed since the last compose, and returns the composed display.
+        """
+        output = self.display
+
+        # collect what changed, in frame coordinate (the output itself is damaged by a resize)
+        for x1, y1, x2, y2 in self.pending:
+            output.add_damage(x1, y1, x2, y2)
+        for layer in self.layers:
+            for x1, y1, x2, y2 in layer.display.merge_damage():
+                output.add_damage(
+                    x1 + layer.x, y1 + layer.y, x2 + layer.x, y2 + layer.y
+                )
+            layer.display.reset_damage()
+        self.pending = []
+
+        # redraw every changed area from the bottom layer up. drawing records the damage again for flush
+        areas = output.merge_damage()
+        output.reset_damage()
+        for x1, y1, x2, y2 in areas:
+            output.draw_rect(x1, y1, x2, y2, output.default_fill)
+            if output.planes is not None:
+                output.paint(x1, y1, x2, y2, "default", "default", 0)
+
+            for layer in self.layers:
+                if not layer.visible:
+                    continue
+
+                # part of the layer inside the area, in layer coordinate
+                left, top = max(x1 - layer.x, 0), max(y1 - layer.y, 0)
+                right = min(x2 - layer.x, layer.display.width - 1)
+                bottom = min(y2 - layer.y, layer.display.height - 1)
+                if left > right or top > bottom:
+                    continue
+
+                output.merge_display(
+                    layer.x + left,
+                    layer.y + top,
+                    layer.display.view(left, top, right, bottom),
+                    display_mask=layer.transparent,
+                )
+
+        return output
+
+    def flush(self, x: int | None = None, y: int | None = None) -> None:
+        """
+        Composes the frame, and flushes only the part that changed into the terminal at position (x, y).
+        """
+        self.compose().flush(x, y, damaged_only=True)
+
+    async def flush_async(self, x: int | None = None, y: int | None = None) -> None:
+        """
+        Same as `flush`, but written without blocking the event loop, see `Display.flush_async`.
+        """
+        await self.compose().flush_async(x, y, damaged_only=True)
@@ -0,0 +1,127 @@
+"""
+asyncio integration: a stdout writer that doesn't block the event loop, and an async key stream.
+"""
+
+import asyncio
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from TexUI_module.key_decoder import ESCAPE_TIMEOUT, MSVCRT_SPECIAL_KEYS, SEQUENCE_CODES, KeyDecoder
+
+try:
+    import termios
+    import tty
+except ImportError:  # not on POSIX, keys are read through msvcrt
+    termios = tty = None
+
+
+class StdoutWriter:
+    """
+    Writes to stdout from a worker thread, so a write never blocks the event loop.
+    stdout stays in blocking mode, so `print` and the synchronous writes (`Display.flush`, `terminal_control`)
+    keep working while it's used. Writes go out one at a time, in the order they were made.
+    """
+
+    def __init__(self) -> None:
+        self.executor = None
+
+    async def write(self, text: str) -> None:
+        """
+        Writes the text, and waits until it is written.
+        """
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="stdout")
+
+        sys.stdout.flush()  # anything printed before goes first
+        await asyncio.get_running_loop().run_in_executor(self.executor, self.__write, text)
+
+    @staticmethod
+    def __write(text: str) -> None:
+        try:
+            fd = sys.stdout.fileno()
+        except (OSError, ValueError, AttributeError):  # not a file (a StringIO for example)
+            sys.stdout.write(text)
+            sys.stdout.flush()
+            return
+
+        data = memoryview(text.encode(sys.stdout.encoding or "utf-8", "replace"))
+        while data:
+            data = data[os.write(fd, data) :]
+
+    def close(self) -> None:
+        """
+        Waits for the writes left, and stops the worker thread. The next write starts a new one.
+        """
+        if self.executor is not None:
+            self.executor.shutdown(wait=True)
+        self.executor = None
+
+
+stdout_writer = StdoutWriter()
+
+
+async def key_events():
+    """
+    Yields the keys pressed as `(name, (shift, control, alt))` from `KeyDecoder`, without busy polling.
+    On POSIX the terminal is put into cbreak mode while iterating, and stdin is watched by the event loop.
+    Elsewhere the characters are read by msvcrt in a worker thread.
+    """
+    loop = asyncio.get_running_loop()
+
+    if termios is None:
+        import msvcrt
+
+        decoder = KeyDecoder()
+        while True:
+            character = await loop.run_in_executor(None, msvcrt.getwch)
+            if character.encode("latin-1", "replace") in SEQUENCE_CODES:  # a special key, its code comes next
+                code = await loop.run_in_executor(None, msvcrt.getwch)
+                name = MSVCRT_SPECIAL_KEYS.get(code.encode("latin-1", "replace"))
+                if name is not None:
+                    yield name, (False, False, False)
+                continue
+
+            # the console sends no escape sequences, so an ESC is always the escape key
+            for key in decoder.feed(character.encode()) + decoder.flush():
+                yield key
+
+    fd = sys.stdin.fileno()
+    queue = asyncio.Queue()
+    decoder = KeyDecoder()
+    escape_timer = None
+
+    def flush_escape():
+        for key in decoder.flush():
+            queue.put_nowait(key)
+
+    def on_readable():
+        nonlocal escape_timer
+        if escape_timer is not None:
+            escape_timer.cancel()
+            escape_timer = None
+
+        data = os.read(fd, 1024)
+        if not data:  # end of input
+            loop.remove_reader(fd)
+            flush_escape()
+            queue.put_nowait(None)
+            return
+
+        for key in decoder.feed(data):
+            queue.put_nowait(key)
+        if decoder.pending:  # a lone ESC, unless the rest of the sequence follows shortly
+            escape_timer = loop.call_later(ESCAPE_TIMEOUT, flush_escape)
+
+    old_attributes = termios.tcgetattr(fd) if os.isatty(fd) else None
+    if old_attributes is not None:
+        tty.setcbreak(fd, termios.TCSANOW)
+    loop.add_reader(fd, on_readable)
+    try:
+        while (key := await queue.get()) is not None:
+            yield key
+    finally:
+        loop.remove_reader(fd)
+        if escape_timer is not None:
+            escape_timer.cancel()
+        if old_attributes is not None:
+            termios.tcsetattr(fd, termios.TCSADRAIN, old_attributes)
@@ -0,0 +1,411 @@
+"""
+Benchmarks of the drawing and flushing primitives.
+
+    python -m TexUI_module.benchmark --output results.json
+    python -m TexUI_module.benchmark --compare results.json
+
+Everything flushed goes to a null sink output, so the terminal isn't part of the measure.
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+from itertools import cycle
+from statistics import median
+from time import perf_counter
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+
+import TexUI
+
+SIZES = ((80, 24), (200, 60), (500, 500), (1000, 1000))
+
+TEXT = (
+    "Lorem ipsum dolor sit amet, consectetur adipiscing elit, sed do eiusmod tempor "
+    "incididunt ut labore et dolore magna aliqua.\n"
+) * 8
+
+WIDE_TEXT = "日本語のテキストと wide な文字、😀 emoji も混ざる。\n" * 8
+
+
+class NullSink:
+    """
+    Output target that throws the output away, and counts the characters written.
+    """
+
+    def __init__(self, columns: int = 80, lines: int = 24) -> None:
+        self.columns = columns
+        self.lines = lines
+        self.characters = 0
+        self.writes = 0
+
+    def write(self, text: str) -> None:
+        self.characters += len(text)
+        self.writes += 1
+
+    async def write_async(self, text: str) -> None:
+        self.write(text)
+
+    def size(self) -> os.terminal_size:
+        return os.terminal_size((self.columns, self.lines))
+
+
+# cases ---------------------------------------------------------------------------------------------------------------
+# every case takes a display of the size measured, and returns the operation to time
+
+
+def bench_get_char(display):
+    positions = cycle(
+        [(x * 7 % display.width, x * 3 % display.height) for x in range(997)]
+    )
+    return lambda: display.get_char(*next(positions))
+
+
+def bench_draw_char(display):
+    positions = cycle(
+        [(x * 7 % display.width, x * 3 % display.height) for x in range(997)]
+    )
+
+    def run():
+        x, y = next(positions)
+        display.draw_char(x, y, "#")
+
+    return run
+
+
+def bench_draw_line_diagonal(display):
+    w, h = display.width - 1, display.height - 1
+    return lambda: display.draw_line(0, 0, w, h, "\\")
+
+
+def bench_draw_line_clipped(display):
+    # mostly outside the screen: the cost should be the cells drawn, not the length of the line
+    w, h = display.width, display.height
+    return lambda: display.draw_line(-20 * w, -20 * h, w // 2, h // 2, "\\")
+
+
+def bench_draw_line_horizontal(display):
+    w, h = display.width - 1, display.height // 2
+    return lambda: display.draw_line(0, h, w, h, "-")
+
+
+def bench_draw_line_vertical(display):
+    w, h = display.width // 2, display.height - 1
+    return lambda: display.draw_line(w, 0, w, h, "|")
+
+
+def bench_draw_box(display):
+    w, h = display.width - 1, display.height - 1
+    return lambda: display.draw_box(0, 0, w, h, "#")
+
+
+def bench_draw_str(display):
+    return lambda: display.draw_str(0, 0, TEXT)
+
+
+def bench_draw_str_wrap(display):
+    width = max(10, display.width // 2)
+    return lambda: display.draw_str(0, 0, TEXT, max_width=f"preserve-{width}")
+
+
+def bench_draw_str_wide(display):
+    width = max(10, display.width // 2)
+    return lambda: display.draw_str(0, 0, WIDE_TEXT, max_width=f"preserve-{width}")
+
+
+def bench_flush_wide(display):
+    display.draw_str(0, 0, WIDE_TEXT)
+    return lambda: display.flush(0, 0)
+
+
+def bench_draw_str_ellipsis(display):
+    width = max(10, display.width // 3)
+    ellipsis = {"symbol": ".", "count": 3, "at": "all"}
+    return lambda: display.draw_str(
+        0, 0, TEXT, max_width=width, max_line=4, ellipsis=ellipsis
+    )
+
+
+def bench_draw_str_clipped(display):
+    return lambda: display.draw_str(-display.width // 2, -2, TEXT)
+
+
+def bench_draw_str_reverse(display):
+    x = display.width - 1
+    return lambda: display.draw_str(x, 0, TEXT, foward={"action": False})
+
+
+def bench_merge_display(display):
+    source = TexUI.Display(
+        display.width // 2, display.height // 2, "m", no_terminal_bound=True
+    )
+    x, y = display.width // 4, display.height // 4
+    return lambda: display.merge_display(x, y, source)
+
+
+def bench_merge_display_masked(display):
+    source = TexUI.Display(
+        display.width // 2, display.height // 2, " ", no_terminal_bound=True
+    )
+    source.draw_box(0, 0, source.width - 1, source.height - 1, "#")
+    x, y = display.width // 4, display.height // 4
+    return lambda: display.merge_display(x, y, source, display_mask=" ")
+
+
+def bench_draw_sprite(display):
+    source = TexUI.Display(
+        display.width // 2, display.height // 2, " ", no_terminal_bound=True
+    )
+    source.draw_box(0, 0, source.width - 1, source.height - 1, "#")
+    sprite = TexUI.Sprite(source)
+    x, y = display.width // 4, display.height // 4
+    return lambda: display.draw_sprite(x, y, sprite)
+
+
+def bench_text_view_scroll(display):
+    view = TexUI.TextView(TEXT * 10000)
+    view.scroll_to(40000)
+    w, h = display.width - 1, display.height - 1
+
+    def run():
+        view.scroll(1)
+        view.draw(display, 0, 0, w, h)
+
+    return run
+
+
+def bench_export_display(display):
+    w, h = display.width // 2, display.height // 2
+    return lambda: display.export_display(0, 0, w, h)
+
+
+def bench_fill(display):
+    characters = cycle("ab")
+    return lambda: display.fill(0, 0, next(characters))
+
+
+def bench_flush(display):
+    display.draw_box(0, 0, display.width - 1, display.height - 1, "#")
+    return lambda: display.flush(0, 0)
+
+
+def bench_flush_double_buffer(display):
+    display.double_buffer = True
+    positions = cycle(range(display.width))
+    characters = cycle("ab")
+
+    def run():
+        display.draw_char(next(positions), display.height // 2, next(characters))
+        display.flush(0, 0)
+
+    return run
+
+
+def bench_flush_damaged(display):
+    display.track_damage = True
+    positions = cycle(range(display.width))
+    characters = cycle("ab")
+
+    def run():
+        display.draw_char(next(positions), display.height // 2, next(characters))
+        display.flush(0, 0, damaged_only=True)
+
+    return run
+
+
+CASES = {
+    name[len("bench_") :]: case
+    for name, case in list(globals().items())
+    if name.startswith("bench_")
+}
+
+
+# running -------------------------------------------------------------------------------------------------------------
+
+
+def measure(run, min_time: float, repeat: int) -> dict:
+    """
+    Times the operation `repeat` times, each over enough calls to last min_time.
+    Returns the seconds per call of the best and the median round.
+    """
+    number = 1
+    calls = 0
+    while True:
+        start = perf_counter()
+        for _ in range(number):
+            run()
+        elapsed = perf_counter() - start
+        calls += number
+        if elapsed >= min_time or number >= 1 << 20:
+            break
+        number *= 2 if elapsed == 0 else max(2, min(10, int(min_time / elapsed) + 1))
+
+    rounds = [elapsed / number]
+    for _ in range(repeat - 1):
+        start = perf_counter()
+        for _ in range(number):
+            run()
+        rounds.append((perf_counter() - start) / number)
+        calls += number
+
+    return {"best": min(rounds), "median": median(rounds), "number": number, "calls": calls}
+
+
+def run_benchmarks(
+    sizes=SIZES,
+    cases=None,
+    storage: str = "list",
+    validation: str = "strict",
+    min_time: float = 0.05,
+    repeat: int = 5,
+    report=None,
+) -> dict:
+    """
+    Runs the cases on a fresh display of every size. Returns the results, keyed by `case[widthxheight]`.
+    """
+    cases = cases or list(CASES)
+    sink = NullSink()
+    old_output = TexUI.get_output()
+    results = {}
+
+    try:
+        for width, height in sizes:
+            # big enough that flushing doesn't clip the display
+            sink.columns, sink.lines = width, height + 1
+            TexUI.set_output(sink)
+
+            for name in cases:
+                display = TexUI.Display(
+                    width,
+                    height,
+                    no_terminal_bound=True,
+                    storage=storage,
+                    validation=validation,
+                )
+                characters = sink.characters
+                run = CASES[name](display)
+                result = measure(run, min_time, repeat)
+                # characters written per call, by the flushing cases
+                result["output_characters"] = (
+                    sink.characters - characters
+                ) // result.pop("calls")
+
+                key = f"{name}[{width}x{height}]"
+                results[key] = result
+                if report is not None:
+                    report(key, result)
+    finally:
+        TexUI.set_output(old_output)
+
+    return results
+
+
+def compare(results: dict, baseline: dict) -> list:
+    """
+    Returns `(key, baseline seconds, seconds, ratio)` of every case in both, slowest ratio first.
+    """
+    rows = []
+    for key, result in results.items():
+        if key in baseline:
+            before, after = baseline[key]["best"], result["best"]
+            rows.append((key, before, after, after / before if before else float("inf")))
+    return sorted(rows, key=lambda row: -row[3])
+
+
+def format_time(seconds: float) -> str:
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.2f} {unit}"
+    return f"{seconds / 1e-9:.0f} ns"
+
+
+def parse_size(text: str) -> tuple:
+    try:
+        width, height = map(int, text.lower().split("x"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(
+            f"Invalid size value of {text!r}. Expected WIDTHxHEIGHT."
+        )
+    return width, height
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m TexUI_module.benchmark", description=__doc__.strip().split("\n")[0]
+    )
+    parser.add_argument("--sizes", type=parse_size, nargs="+", default=list(SIZES), metavar="WxH")
+    parser.add_argument("--cases", nargs="+", choices=list(CASES), metavar="CASE")
+    parser.add_argument("--storage", default="list", choices=list(TexUI.framebuffer.storages))
+    parser.add_argument("--validation", default="strict", choices=["strict", "trusted"])
+    parser.add_argument("--min-time", type=float, default=0.05, help="seconds per round")
+    parser.add_argument("--repeat", type=int, default=5, help="rounds per case")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--compare", help="compare against the results of a saved JSON file")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="slowdown ratio over which a case is a regression (default 0.1, so 10%%)",
+    )
+    parser.add_argument("--list", action="store_true", help="list the cases and exit")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        print("\n".join(CASES))
+        return 0
+
+    def report(key, result):
+        print(f"{key:<40} {format_time(result['best']):>12} {format_time(result['median']):>12}", file=sys.stderr)
+
+    print(f"{'case':<40} {'best':>12} {'median':>12}", file=sys.stderr)
+    results = run_benchmarks(
+        args.sizes,
+        args.cases,
+        args.storage,
+        args.validation,
+        args.min_time,
+        args.repeat,
+        report,
+    )
+
+    document = {
+        "meta": {
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "storage": args.storage,
+            "validation": args.validation,
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(document, file, indent=2)
+
+    if not args.compare:
+        return 0
+
+    with open(args.compare) as file:
+        baseline = json.load(file)["results"]
+
+    regressions = 0
+    print(f"\n{'case':<40} {'baseline':>12} {'now':>12} {'ratio':>8}", file=sys.stderr)
+    for key, before, after, ratio in compare(results, baseline):
+        flag = ""
+        if ratio > 1 + args.threshold:
+            flag = "  REGRESSION"
+            regressions += 1
+        elif ratio < 1 - args.threshold:
+            flag = "  faster"
+        print(
+            f"{key:<40} {format_time(before):>12} {format_time(after):>12} {ratio:>7.2f}x{flag}",
+            file=sys.stderr,
+        )
+
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,171 @@
+"""
+How many terminal columns characters take: 0 for combining and format characters,
+2 for wide (East Asian wide and fullwidth, which covers CJK and most emoji), 1 for the rest.
+
+In the cell grid of a Display, a wide glyph takes its cell and the next one, which holds WIDE_CONTINUATION.
+Cell strings ("cells") are strings with one character per cell, so their length is their width.
+"""
+
+import re
+import unicodedata
+from functools import lru_cache
+from textwrap import wrap as smart_wrap
+
+# the right half of a wide glyph. a noncharacter: never printable, so never in drawn text
+WIDE_CONTINUATION = "\uffff"
+WIDE_PAIR = re.compile(f"(.){WIDE_CONTINUATION}")
+
+# two level table: the width of code point cp is TABLE[cp >> 8][cp & 255].
+# blocks are computed from unicodedata the first time they're used, and identical blocks are shared
+BLOCK_SIZE = 256
+TABLE = [None] * (0x110000 // BLOCK_SIZE)
+BLOCKS = {}
+
+ZERO_WIDTH_CATEGORIES = frozenset(("Mn", "Me", "Cf", "Cc", "Zl", "Zp"))
+
+
+def compute_width(code_point: int) -> int:
+    """
+    Returns the width of a code point from unicodedata. Use `char_width`, which looks it up in the table.
+    """
+    character = chr(code_point)
+    if code_point == 0x00AD:  # soft hyphen is shown as a hyphen
+        return 1
+    if (
+        unicodedata.category(character) in ZERO_WIDTH_CATEGORIES
+        or 0x1160 <= code_point <= 0x11FF  # hangul jamo vowels and finals join the leading consonant
+    ):
+        return 0
+    if unicodedata.east_asian_width(character) in ("W", "F"):
+        return 2
+    return 1
+
+
+def build_block(index: int) -> bytes:
+    start = index * BLOCK_SIZE
+    block = bytes(compute_width(code_point) for code_point in range(start, start + BLOCK_SIZE))
+    block = BLOCKS.setdefault(block, block)
+    TABLE[index] = block
+    return block
+
+
+def char_width(character: str) -> int:
+    """
+    Returns how many columns a single character takes.
+    """
+    code_point = ord(character)
+    block = TABLE[code_point >> 8] or build_block(code_point >> 8)
+    return block[code_point & 255]
+
+
+@lru_cache(maxsize=4096)
+def __string_width(text: str) -> int:
+    return sum(map(char_width, text))
+
+
+def string_width(text: str) -> int:
+    """
+    Returns how many columns a string takes. Printable ASCII is its length, the rest is cached.
+    """
+    if text.isascii() and text.isprintable():
+        return len(text)
+    return __string_width(text)
+
+
+@lru_cache(maxsize=1024)
+def to_cells(text: str) -> str:
+    """
+    Returns the cells of printable text: composed (NFC), without the zero width characters,
+    and with WIDE_CONTINUATION after every wide glyph.
+    """
+    if text.isascii():
+        return text
+
+    out = []
+    for character in unicodedata.normalize("NFC", text):
+        width = char_width(character)
+        if width == 1:
+            out.append(character)
+        elif width == 2:
+            out.append(character + WIDE_CONTINUATION)
+    return "".join(out)
+
+
+@lru_cache(maxsize=1024)
+def __fit_cells(cells: str) -> str:
+    out = []
+    wide = False  # the last cell is a wide glyph, waiting for its right half
+    for character in cells:
+        if character == WIDE_CONTINUATION:
+            out.append(character if wide else " ")
+            wide = False
+            continue
+
+        if wide:
+            out[-1] = " "
+            wide = False
+        if character >= "\x80":
+            width = char_width(character)
+            if width == 2:
+                wide = True
+            elif width == 0:
+                character = " "
+        out.append(character)
+
+    if wide:
+        out[-1] = " "
+    return "".join(out)
+
+
+def fit_cells(cells: str, reverse: bool = False) -> str:
+    """
+    Returns the cells with everything that wouldn't take exactly its cells replaced by a space:
+    a wide glyph without its right half (cut by an edge, or half overwritten), a right half without its glyph,
+    and zero width characters. `reverse` is for cells drawn right to left, where the right half comes first.
+    """
+    if cells.isascii():
+        return cells
+    if reverse:
+        return __fit_cells(cells[::-1])[::-1]
+    return __fit_cells(cells)
+
+
+def split_cells(cells: str, width: int) -> list[str]:
+    """
+    Splits cells into chunks of at most width columns, without splitting a wide glyph from its right half.
+    """
+    if cells.isascii() or width <= 0:  # no room left: split like plain text would
+        return [cells[i : i + width] for i in range(0, len(cells), width)]
+
+    chunks = []
+    start = 0
+    while start < len(cells):
+        end = start + width
+        if end < len(cells) and cells[end] == WIDE_CONTINUATION and end - 1 > start:
+            end -= 1
+        chunks.append(cells[start:end])
+        start = end
+    return chunks
+
+
+def wrap_cells(cells: str, width: int) -> list[str]:
+    """
+    Wraps cells on whitespace to lines of at most width columns, like `textwrap.wrap`.
+    With wide glyphs, words longer than a line start on their own line before being split.
+    """
+    if cells.isascii():
+        return smart_wrap(cells, width)
+
+    lines = []
+    for line in smart_wrap(cells, width, break_long_words=False):
+        lines.extend(split_cells(line, width) if len(line) > width else [line])
+    return lines
+
+
+def swap_pairs(cells: str) -> str:
+    """
+    Returns the cells with the right half of every wide glyph before it, for drawing them right to left.
+    """
+    if cells.isascii():
+        return cells
+    return WIDE_PAIR.sub(f"{WIDE_CONTINUATION}\\1", cells)
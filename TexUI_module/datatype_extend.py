@@ -1,82 +1,213 @@
-from dataclasses import dataclass
+from operator import itemgetter
 
+from TexUI_module import char_width
 
-@dataclass
-class Position:
+
+class Position(tuple):
     """
-    Logic operation done by ...
+    An x, y coordinate. Immutable and slotted: a tuple of two integers with names.
     """
 
-    x: int
-    y: int
+    __slots__ = ()
+
+    x = property(itemgetter(0))
+    y = property(itemgetter(1))
 
-    def __post_init__(self):
+    def __new__(cls, x: int, y: int):
         # Ensure x and y are integers
-        if not isinstance(self.x, int) or not isinstance(self.y, int):
+        if not isinstance(x, int) or not isinstance(y, int):
             raise TypeError("x and y must be whole numbers (integers).")
+        return tuple.__new__(cls, (x, y))
+
+    def __getnewargs__(self):
+        return tuple(self)
 
     def __add__(self, other):
         if isinstance(other, Position):
-            return Position(self.x + other.x, self.y + other.y)
+            return Position(self[0] + other[0], self[1] + other[1])
         raise TypeError("Operand must be of type Position.")
 
     def __sub__(self, other):
         if isinstance(other, Position):
-            return Position(self.x - other.x, self.y - other.y)
+            return Position(self[0] - other[0], self[1] - other[1])
         raise TypeError("Operand must be of type Position.")
 
     def __mul__(self, scalar):
         if isinstance(scalar, int):
-            return Position(self.x * scalar, self.y * scalar)
+            return Position(self[0] * scalar, self[1] * scalar)
         raise TypeError("Operand must be an integer.")
 
+    __rmul__ = __mul__
+
     def __truediv__(self, scalar):
         if isinstance(scalar, int) and scalar != 0:
-            return Position(self.x // scalar, self.y // scalar)
+            return Position(self[0] // scalar, self[1] // scalar)
         elif scalar == 0:
             raise ValueError("Cannot divide by zero.")
         raise TypeError("Operand must be a non-zero integer.")
 
     def __eq__(self, other):
-        return isinstance(other, Position) and all(
-            (self.x == other.x, self.y == other.y)
-        )
+        return isinstance(other, Position) and tuple.__eq__(self, other)
+
+    def __ne__(self, other):
+        return not self == other
+
+    __hash__ = tuple.__hash__
 
     # compare the area size
     def __lt__(self, other):
         if isinstance(other, Position):
-            # return (self.x, self.y) < (other.x, other.y)
-            return all((self.x < other.x, self.y < other.y))
+            return self[0] < other[0] and self[1] < other[1]
         return NotImplemented
 
     def __le__(self, other):
         if isinstance(other, Position):
-            # return (self.x, self.y) <= (other.x, other.y)
-            return all((self.x <= other.x, self.y <= other.y))
+            return self[0] <= other[0] and self[1] <= other[1]
         return NotImplemented
 
     def __gt__(self, other):
         if isinstance(other, Position):
-            # return (self.x, self.y) > (other.x, other.y)
-            return all((self.x > other.x, self.y > other.y))
+            return self[0] > other[0] and self[1] > other[1]
         return NotImplemented
 
     def __ge__(self, other):
         if isinstance(other, Position):
-            # return (self.x, self.y) >= (other.x, other.y)
-            return all((self.x >= other.x, self.y >= other.y))
+            return self[0] >= other[0] and self[1] >= other[1]
         return NotImplemented
 
     def __abs__(self):
         # Returns the Euclidean distance from the origin (0, 0)
-        return (self.x**2 + self.y**2) ** 0.5
+        return (self[0] ** 2 + self[1] ** 2) ** 0.5
 
     def __repr__(self):
         # Detailed output for debugging
-        return f"Position(x={self.x}, y={self.y})"
+        return f"Position(x={self[0]}, y={self[1]})"
+
+    def __str__(self):
+        return f"Position({self[0]}, {self[1]})"
+
+
+class Rect(tuple):
+    """
+    An area from x1, y1 to x2, y2, both corners included, with x1 <= x2 and y1 <= y2.
+    Immutable and slotted: a tuple of four integers, so it compares equal to a plain (x1, y1, x2, y2).
+    Operations that could give an empty area return None instead.
+    """
+
+    __slots__ = ()
+
+    x1 = property(itemgetter(0))
+    y1 = property(itemgetter(1))
+    x2 = property(itemgetter(2))
+    y2 = property(itemgetter(3))
+
+    def __new__(cls, x1: int, y1: int, x2: int, y2: int):
+        if x1 > x2 or y1 > y2:
+            raise ValueError(
+                f"Invalid rect of ({x1}, {y1}, {x2}, {y2}). Expected x1 <= x2 and y1 <= y2, see `Rect.clip`."
+            )
+        return tuple.__new__(cls, (x1, y1, x2, y2))
+
+    def __getnewargs__(self):
+        return tuple(self)
+
+    @classmethod
+    def from_size(cls, width: int, height: int) -> "Rect":
+        """
+        Returns the rect of a width x height screen, from 0, 0.
+        A screen without cells gets an empty rect (x2 < x1 or y2 < y1), that contains and clips to nothing.
+        """
+        return tuple.__new__(cls, (0, 0, width - 1, height - 1))
+
+    @property
+    def width(self) -> int:
+        return self[2] - self[0] + 1
+
+    @property
+    def height(self) -> int:
+        return self[3] - self[1] + 1
+
+    def contains(self, x: int, y: int) -> bool:
+        """
+        Returns whether x, y is inside. Doesn't allocate anything, use it for the bounds checks of a hot loop.
+        """
+        return self[0] <= x <= self[2] and self[1] <= y <= self[3]
+
+    def __contains__(self, item) -> bool:
+        if isinstance(item, Rect):
+            return (
+                self[0] <= item[0]
+                and self[1] <= item[1]
+                and item[2] <= self[2]
+                and item[3] <= self[3]
+            )
+        if isinstance(item, Position):
+            return self.contains(item[0], item[1])
+        return False
+
+    def intersect(self, other: "Rect") -> "Rect | None":
+        """
+        Returns the area in both rects, or None if they don't overlap.
+        """
+        x1, y1 = max(self[0], other[0]), max(self[1], other[1])
+        x2, y2 = min(self[2], other[2]), min(self[3], other[3])
+        if x1 > x2 or y1 > y2:
+            return None
+        return tuple.__new__(Rect, (x1, y1, x2, y2))
+
+    def union(self, other: "Rect") -> "Rect":
+        """
+        Returns the smallest rect around both rects.
+        """
+        return tuple.__new__(
+            Rect,
+            (
+                min(self[0], other[0]),
+                min(self[1], other[1]),
+                max(self[2], other[2]),
+                max(self[3], other[3]),
+            ),
+        )
+
+    def touches(self, other: "Rect") -> bool:
+        """
+        Returns whether the rects overlap or are next to each other, so their union adds no cell outside of them
+        when they're aligned.
+        """
+        return (
+            self[0] <= other[2] + 1
+            and other[0] <= self[2] + 1
+            and self[1] <= other[3] + 1
+            and other[1] <= self[3] + 1
+        )
+
+    def clip(self, x1: int, y1: int, x2: int, y2: int) -> "Rect | None":
+        """
+        Returns the part of the area from x1, y1 to x2, y2 (any two opposite corners) inside this rect,
+        or None if it's all outside.
+        """
+        if x1 > x2:
+            x1, x2 = x2, x1
+        if y1 > y2:
+            y1, y2 = y2, y1
+
+        if x1 < self[0]:
+            x1 = self[0]
+        if y1 < self[1]:
+            y1 = self[1]
+        if x2 > self[2]:
+            x2 = self[2]
+        if y2 > self[3]:
+            y2 = self[3]
+        if x1 > x2 or y1 > y2:
+            return None
+        return tuple.__new__(Rect, (x1, y1, x2, y2))
+
+    def __repr__(self):
+        return f"Rect(x1={self[0]}, y1={self[1]}, x2={self[2]}, y2={self[3]})"
 
     def __str__(self):
-        return f"Position({self.x}, {self.y})"
+        return f"Rect({self[0]}, {self[1]}, {self[2]}, {self[3]})"
 
 
 class Character:
@@ -115,3 +246,6 @@ class Character:
 
     def get_ascii(self):
         return ord(self.char)
+
+    def width(self):
+        return char_width.char_width(self.char)
@@ -0,0 +1,366 @@
+"""
+Storage engines for the cell grid of a Display.
+
+Every engine hands out `content` as a sequence of rows where `content[y][x]` is a
+one character string, so drawing code can stay the same whatever the engine is.
+"""
+
+from array import array
+from sys import version_info
+
+try:
+    import numpy
+except ImportError:  # optional, only needed by the numpy engine
+    numpy = None
+
+# 'u' is deprecated since 3.13 in favour of 'w' (same UCS-4 layout)
+ARRAY_TYPECODE = "w" if version_info >= (3, 13) else "u"
+
+
+def repeat_pattern(pattern: str, offset: int, count: int) -> str:
+    """
+    Returns `count` characters of the pattern repeated, starting at its `offset`-th character.
+    """
+    if len(pattern) == 1:
+        return pattern * count
+
+    offset %= len(pattern)
+    pattern = pattern[offset:] + pattern[:offset]
+    return (pattern * (count // len(pattern) + 1))[:count]
+
+
+class RowWindow:
+    """
+    A window of `length` cells into a row, starting at `offset`. Reads and writes go straight
+    to the row, so a window never copies anything.
+    """
+
+    __slots__ = ("row", "offset", "length")
+
+    def __init__(self, row, offset: int, length: int):
+        # a window of a window is a window of the original row
+        if isinstance(row, RowWindow):
+            row, offset = row.row, row.offset + offset
+
+        self.row = row
+        self.offset = offset
+        self.length = length
+
+    def __len__(self) -> int:
+        return self.length
+
+    def __iter__(self):
+        row, offset = self.row, self.offset
+        for index in range(offset, offset + self.length):
+            yield row[index]
+
+    def __contains__(self, item) -> bool:
+        return item in self.row[self.offset : self.offset + self.length]
+
+    def __index(self, index: int) -> int:
+        if index < 0:
+            index += self.length
+        if not 0 <= index < self.length:
+            raise IndexError("RowWindow index out of range")
+        return self.offset + index
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self.length)
+            if step == 1:
+                return self.row[self.offset + start : self.offset + max(start, stop)]
+            return [self.row[self.offset + i] for i in range(start, stop, step)]
+
+        return self.row[self.__index(index)]
+
+    def __setitem__(self, index, value) -> None:
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self.length)
+            if step == 1:
+                self.row[self.offset + start : self.offset + max(start, stop)] = value
+            else:
+                for i, cell in zip(range(start, stop, step), value):
+                    self.row[self.offset + i] = cell
+            return
+
+        self.row[self.__index(index)] = value
+
+
+class RowStorage:
+    """
+    Shared span operations of the engines that keep one mutable sequence per row.
+    Spans are written with row slice assignment, or by stepping down a column, without per-cell validation.
+    Subclasses give `sequence`, what a row slice is assigned from a string.
+    """
+
+    vectorized = False
+
+    def window(self, content, x1, y1, x2, y2) -> list:
+        """
+        Returns the rows of an already clipped rectangle, sharing the cells of the content.
+        """
+        return [RowWindow(row, x1, x2 - x1 + 1) for row in content[y1 : y2 + 1]]
+
+    def copy(self, content) -> list:
+        return [row[:] for row in content]
+
+    def write_row(self, row, start: int, end: int, values: str, mask: str) -> None:
+        if mask == "":
+            row[start:end] = self.sequence(values)
+        else:
+            row[start:end] = self.sequence(
+                "".join(
+                    value if cell in mask else cell
+                    for cell, value in zip(row[start:end], values)
+                )
+            )
+
+    def draw_span(self, content, x1, y1, x2, y2, pattern: str, offset: int, mask: str):
+        """
+        Writes an axis aligned, already clipped span from (x1, y1) to (x2, y2) inclusive.
+        The pattern is laid out starting from (x1, y1), shifted by offset.
+        """
+        count = abs(x2 - x1) + abs(y2 - y1) + 1
+        values = repeat_pattern(pattern, offset, count)
+
+        if y1 == y2:
+            if x1 <= x2:
+                self.write_row(content[y1], x1, x2 + 1, values, mask)
+            else:
+                self.write_row(content[y1], x2, x1 + 1, values[::-1], mask)
+            return
+
+        rows = content[y1 : y2 + 1] if y1 <= y2 else content[y2 : y1 + 1][::-1]
+        for row, value in zip(rows, values):
+            if mask == "" or row[x1] in mask:
+                row[x1] = value
+
+    def put_span(self, content, x: int, y: int, values) -> None:
+        """
+        Writes values made by `sequence` into row y from x. Already clipped, nothing is checked.
+        """
+        content[y][x : x + len(values)] = values
+
+    def fill_rect(self, content, x1, y1, x2, y2, pattern: str, offset: int, mask: str):
+        """
+        Fills an already clipped rectangle, repeating the pattern along every row.
+        """
+        values = repeat_pattern(pattern, offset, x2 - x1 + 1)
+        if mask == "":
+            values = self.sequence(values)
+            for row in content[y1 : y2 + 1]:
+                row[x1 : x2 + 1] = values
+        else:
+            for row in content[y1 : y2 + 1]:
+                self.write_row(row, x1, x2 + 1, values, mask)
+
+    def blit(self, content, source: list, x: int, y: int, skip: str, limit: str):
+        """
+        Copies already clipped source lines onto the content with their top left at (x, y).
+        Source cells in skip are not copied, and only content cells in limit are overwritten.
+        """
+        rows = content[y : y + len(source)]
+
+        if skip == "" and limit == "":
+            for row, line in zip(rows, source):
+                row[x : x + len(line)] = self.sequence(line)
+            return
+
+        skip, limit = set(skip), set(limit)
+        for row, line in zip(rows, source):
+            end = x + len(line)
+            row[x:end] = self.sequence(
+                "".join(
+                    cell if new in skip or (limit and cell not in limit) else new
+                    for cell, new in zip(row[x:end], line)
+                )
+            )
+
+
+class ListStorage(RowStorage):
+    """
+    Rows are lists of one character strings. Simple, and the fastest for per-cell access.
+    """
+
+    name = "list"
+
+    def sequence(self, text: str) -> list:
+        return list(text)
+
+    def allocate(self, width: int, height: int, fill: str) -> list:
+        return [[fill] * width for _ in range(height)]
+
+    def clear(self, content: list, width: int, fill: str) -> list:
+        blank = [fill] * width
+        for row in content:
+            row[:] = blank
+        return content
+
+    def row_text(self, row) -> str:
+        if isinstance(row, RowWindow):
+            row = row[:]
+        return "".join(row)
+
+
+class ArrayStorage(RowStorage):
+    """
+    Rows are unicode arrays: one machine word per cell instead of one pointer to a str object,
+    cleared in place with slice assignment and exported with a single copy.
+    """
+
+    name = "array"
+
+    def sequence(self, text: str) -> array:
+        return array(ARRAY_TYPECODE, text)
+
+    def __init__(self):
+        self.__blank_rows = {}
+
+    def blank_row(self, width: int, fill: str) -> array:
+        key = (width, fill)
+        if key not in self.__blank_rows:
+            if len(self.__blank_rows) > 16:
+                self.__blank_rows.clear()
+            self.__blank_rows[key] = array(ARRAY_TYPECODE, fill * width)
+        return self.__blank_rows[key]
+
+    def allocate(self, width: int, height: int, fill: str) -> list:
+        blank = self.blank_row(width, fill)
+        return [array(ARRAY_TYPECODE, blank) for _ in range(height)]
+
+    def clear(self, content: list, width: int, fill: str) -> list:
+        blank = self.blank_row(width, fill)
+        for row in content:
+            row[:] = blank
+        return content
+
+    def row_text(self, row) -> str:
+        if isinstance(row, RowWindow):
+            row = row[:]
+        if isinstance(row, array):
+            return row.tounicode()
+        return "".join(row)
+
+
+class NumpyStorage:
+    """
+    The whole grid is one 2D numpy array of code points, viewed as one character strings.
+    Spans, rectangles, masks and blits are done as array operations instead of per-cell loops.
+    """
+
+    name = "numpy"
+    vectorized = True
+
+    def allocate(self, width: int, height: int, fill: str):
+        return numpy.full((height, width), ord(fill), dtype="<u4").view("<U1")
+
+    def clear(self, content, width: int, fill: str):
+        content[...] = fill
+        return content
+
+    def row_text(self, row) -> str:
+        if isinstance(row, numpy.ndarray):
+            return row.tobytes().decode("utf-32-le")
+        return "".join(row)
+
+    def window(self, content, x1, y1, x2, y2):
+        """
+        Returns the rows of an already clipped rectangle, sharing the cells of the content.
+        """
+        return content[y1 : y2 + 1, x1 : x2 + 1]
+
+    def copy(self, content):
+        return content.copy()
+
+    def codes(self, content):
+        return content.view("<u4")
+
+    def text_codes(self, text: str):
+        return numpy.frombuffer(text.encode("utf-32-le"), dtype="<u4")
+
+    sequence = text_codes
+
+    def put_span(self, content, x: int, y: int, values) -> None:
+        """
+        Writes codes made by `sequence` into row y from x. Already clipped, nothing is checked.
+        """
+        self.codes(content)[y, x : x + len(values)] = values
+
+    def contains(self, content, item) -> bool:
+        if not isinstance(item, str) or len(item) != 1:
+            return False
+        return bool((self.codes(content) == ord(item)).any())
+
+    def pattern(self, pattern: str, offset: int, count: int):
+        if len(pattern) == 1:
+            return ord(pattern)
+        codes = numpy.roll(self.text_codes(pattern), -(offset % len(pattern)))
+        return numpy.resize(codes, count)
+
+    def masked_write(self, target, values, mask: str) -> None:
+        if mask == "":
+            target[...] = values
+        else:
+            allowed = numpy.isin(target, self.text_codes(mask))
+            target[...] = numpy.where(allowed, values, target)
+
+    def draw_span(self, content, x1, y1, x2, y2, pattern: str, offset: int, mask: str):
+        """
+        Writes an axis aligned, already clipped span from (x1, y1) to (x2, y2) inclusive.
+        The pattern is laid out starting from (x1, y1), shifted by offset.
+        """
+        codes = self.codes(content)
+        if y1 == y2:
+            target = codes[y1, x1 : x2 + 1] if x1 <= x2 else codes[y1, x2 : x1 + 1][::-1]
+        else:
+            target = codes[y1 : y2 + 1, x1] if y1 <= y2 else codes[y2 : y1 + 1, x1][::-1]
+
+        self.masked_write(target, self.pattern(pattern, offset, len(target)), mask)
+
+    def fill_rect(self, content, x1, y1, x2, y2, pattern: str, offset: int, mask: str):
+        """
+        Fills an already clipped rectangle, repeating the pattern along every row.
+        """
+        target = self.codes(content)[y1 : y2 + 1, x1 : x2 + 1]
+        self.masked_write(target, self.pattern(pattern, offset, x2 - x1 + 1), mask)
+
+    def blit(self, content, source, x, y, skip: str, limit: str):
+        """
+        Copies an already clipped source grid (or list of lines) onto the content with its top left at (x, y).
+        Source cells in skip are not copied, and only content cells in limit are overwritten.
+        """
+        if isinstance(source, list):
+            source = self.text_codes("".join(source)).reshape(len(source), -1)
+        else:
+            source = self.codes(source)
+        target = self.codes(content)[y : y + source.shape[0], x : x + source.shape[1]]
+
+        if skip == "" and limit == "":
+            target[...] = source
+            return
+
+        allowed = numpy.ones(source.shape, dtype=bool)
+        if skip != "":
+            allowed &= ~numpy.isin(source, self.text_codes(skip))
+        if limit != "":
+            allowed &= numpy.isin(target, self.text_codes(limit))
+        target[allowed] = source[allowed]
+
+
+storages = {
+    "list": ListStorage(),
+    "array": ArrayStorage(),
+}
+
+if numpy is not None:
+    storages["numpy"] = NumpyStorage()
+
+
+def get_storage(name: str):
+    if name == "numpy" and numpy is None:
+        raise ValueError("The numpy storage needs numpy to be installed.")
+    if name not in storages:
+        raise ValueError(
+            f"Invalid storage value of {name!r}. Expected {', '.join(map(repr, storages))}."
+        )
+    return storages[name]
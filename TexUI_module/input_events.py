@@ -0,0 +1,87 @@
+"""
+Per-frame input: every pending key read at once, timestamped, and optionally coalesced.
+"""
+
+from time import monotonic
+from typing import Callable, Iterable, Literal, NamedTuple
+
+MOVEMENT_KEYS = frozenset(("UP", "DOWN", "LEFT", "RIGHT"))
+
+
+class KeyEvent(NamedTuple):
+    name: str
+    modifiers: tuple  # shift, control, alt
+    time: float  # clock time of the read that got the key
+    count: int = 1  # how many presses were coalesced into this event
+
+
+class InputQueue:
+    def __init__(
+        self,
+        read_keys: Callable[[float | None], list],
+        coalesce: Literal["none", "repeat", "movement"] = "none",
+        movement_keys: Iterable[str] = MOVEMENT_KEYS,
+        clock: Callable[[], float] = monotonic,
+    ) -> None:
+        """
+        Drains the pending keys of a keyboard backend once per frame.
+
+        ### Parametres
+        - `read_keys`: Backend read function, `lskd_posix.read_keys` or `lskd.read_keys`.
+        It takes a timeout, and returns every pending key as `(name, (shift, control, alt))`.
+        - `coalesce`: What gets merged in a frame.
+            - `"none"`: Nothing, every key press is an event.
+            - `"repeat"`: Presses of the same key in a row are one event, with their `count`.
+            - `"movement"`: Same as repeat, and of the movement keys only the last one pressed is kept.
+        - `movement_keys`: Key names treated as movement by `"movement"`. Default is the arrow keys.
+        - `clock`: Clock the events are timestamped with.
+        """
+        if coalesce not in ("none", "repeat", "movement"):
+            raise ValueError(
+                f"Invalid coalesce value of {coalesce!r}. Expected 'none', 'repeat' or 'movement'."
+            )
+
+        self.read_keys = read_keys
+        self.coalesce = coalesce
+        self.movement_keys = frozenset(movement_keys)
+        self.clock = clock
+
+    def __str__(self):
+        return f"InputQueue object: {self.coalesce} coalescing"
+
+    def poll(self, timeout: float | None = 0) -> list[KeyEvent]:
+        """
+        Returns the events of every key pressed since the last poll, decoded from a single read.
+        Waits up to timeout seconds for the first key (None waits forever, default doesn't wait).
+        """
+        keys = self.read_keys(timeout)
+        if not keys:
+            return []
+
+        time = self.clock()
+        events = [KeyEvent(name, modifiers, time) for name, modifiers in keys]
+
+        if self.coalesce == "none":
+            return events
+        return self.__coalesce(events)
+
+    def __coalesce(self, events: list[KeyEvent]) -> list[KeyEvent]:
+        if self.coalesce == "movement":
+            movements = [event for event in events if event.name in self.movement_keys]
+            if movements:
+                last = movements[-1]
+                events = [
+                    event
+                    for event in events
+                    if event.name not in self.movement_keys or event is last
+                ]
+
+        merged = [events[0]]
+        for event in events[1:]:
+            previous = merged[-1]
+            if event.name == previous.name and event.modifiers == previous.modifiers:
+                merged[-1] = previous._replace(count=previous.count + event.count)
+            else:
+                merged.append(event)
+
+        return merged
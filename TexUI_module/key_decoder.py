@@ -0,0 +1,250 @@
+"""
+Incremental decoder from terminal input bytes to named keys, shared by lskd_posix and async_io,
+and the msvcrt key codes shared by lskd and lskd_posix.
+"""
+
+from codecs import getincrementaldecoder
+
+ESCAPE_TIMEOUT = 0.025  # how long a lone ESC waits for the rest of a sequence, in seconds
+
+# CSI final character / SS3 character -> key name
+FINAL_KEYS = {
+    "A": "UP",
+    "B": "DOWN",
+    "C": "RIGHT",
+    "D": "LEFT",
+    "H": "HOME",
+    "F": "END",
+    "P": "F1",
+    "Q": "F2",
+    "R": "F3",
+    "S": "F4",
+}
+
+# CSI number ~ -> key name
+TILDE_KEYS = {
+    1: "HOME",
+    2: "INSERT",
+    3: "DELETE",
+    4: "END",
+    5: "PG_UP",
+    6: "PG_DOWN",
+    7: "HOME",
+    8: "END",
+    11: "F1",
+    12: "F2",
+    13: "F3",
+    14: "F4",
+    15: "F5",
+    17: "F6",
+    18: "F7",
+    19: "F8",
+    20: "F9",
+    21: "F10",
+    23: "F11",
+    24: "F12",
+}
+
+CONTROL_KEYS = {
+    "\r": "ENTER",
+    "\n": "ENTER",
+    "\t": "TAB",
+    "\x7f": "BACKSPACE",
+    "\x08": "BACKSPACE",
+    " ": "SPACE",
+}
+
+# msvcrt ---------------------------------------------------------------------------------------------------------------
+# msvcrt.getch gives a special key as a sequence code, then the key's code on the next call
+
+SEQUENCE_CODES = (b"\xe0", b"\x00")
+
+# code -> key name, for codes that aren't after a sequence code
+MSVCRT_KEYS = {
+    b"\x1b": "ESC",
+    b"\x08": "BACKSPACE",
+    b"\t": "TAB",
+    b"\r": "ENTER",
+    b" ": "SPACE",
+}
+
+# code after a sequence code -> key name
+MSVCRT_SPECIAL_KEYS = {
+    b"H": "UP",
+    b"P": "DOWN",
+    b"K": "LEFT",
+    b"M": "RIGHT",
+    b"R": "INSERT",
+    b"S": "DELETE",
+    b"G": "HOME",
+    b"O": "END",
+    b"I": "PG_UP",
+    b"Q": "PG_DOWN",
+    b";": "F1",
+    b"<": "F2",
+    b"=": "F3",
+    b">": "F4",
+    b"?": "F5",
+    b"@": "F6",
+    b"A": "F7",
+    b"B": "F8",
+    b"C": "F9",
+    b"D": "F10",
+    b"\x85": "F11",  # reserved. might not be recordable
+    b"\x86": "F12",
+}
+
+# key name -> the codes msvcrt.getch gives for it. F1 to F10 come after b"\x00", the other special keys after b"\xe0"
+MSVCRT_CODES = {name: (code,) for code, name in MSVCRT_KEYS.items()}
+MSVCRT_CODES.update(
+    (name, (b"\x00" if name[1:].isdigit() and int(name[1:]) <= 10 else b"\xe0", code))
+    for code, name in MSVCRT_SPECIAL_KEYS.items()
+)
+
+
+def translate_code(code: bytes | None, special: bool = False) -> str | None:
+    """
+    Returns the key name of an msvcrt code (`special` if it came after a sequence code),
+    or the code decoded if the key has no name.
+    """
+    if code is None:
+        return None
+
+    name = (MSVCRT_SPECIAL_KEYS if special else MSVCRT_KEYS).get(code)
+    return code.decode() if name is None else name
+
+
+def translate(key_content, last_key) -> str | None:
+    """
+    translate raw bytes Sequence into a more readable form
+    """
+    if last_key in SEQUENCE_CODES:
+        return translate_code(key_content, True)
+    if key_content not in SEQUENCE_CODES:
+        return translate_code(key_content)
+    return key_content
+
+
+# terminal sequences ---------------------------------------------------------------------------------------------------
+
+
+class KeyDecoder:
+    """
+    Incremental decoder from terminal input bytes to keys. Bytes can arrive in any split,
+    an unfinished escape sequence is held until the next `feed` (or `flush`).
+
+    Keys are `(name, (shift, control, alt))`. The names are the ones `translate` gives:
+    "UP", "F5", "ENTER", ... for special keys, and the character itself otherwise.
+    """
+
+    def __init__(self) -> None:
+        self.__text = getincrementaldecoder("utf-8")("replace")
+        self.buffer = ""
+
+    @property
+    def pending(self) -> bool:
+        return self.buffer != ""
+
+    def feed(self, data: bytes) -> list:
+        self.buffer += self.__text.decode(data)
+        return self.__decode(final=False)
+
+    def flush(self) -> list:
+        """
+        Decodes what is held as is: a lone ESC is the escape key, an unfinished sequence is alt + its characters.
+        """
+        return self.__decode(final=True)
+
+    def __decode(self, final: bool) -> list:
+        keys = []
+        buffer = self.buffer
+        index = 0
+
+        while index < len(buffer):
+            character = buffer[index]
+
+            if character != "\x1b":
+                keys.append(self.__plain_key(character, alt=False))
+                index += 1
+                continue
+
+            length = self.__sequence_length(buffer, index)
+            if length is None:  # unfinished
+                if not final:
+                    break
+                if index + 1 == len(buffer):
+                    keys.append(("ESC", (False, False, False)))
+                    index += 1
+                else:  # ESC [ or ESC O with nothing after: alt + [ / O
+                    keys.append(self.__plain_key(buffer[index + 1], alt=True))
+                    index += 2
+                continue
+
+            key = self.__sequence_key(buffer[index : index + length])
+            if key is not None:
+                keys.append(key)
+            index += length
+
+        self.buffer = buffer[index:]
+        return keys
+
+    def __plain_key(self, character: str, alt: bool) -> tuple:
+        if character in CONTROL_KEYS:
+            return CONTROL_KEYS[character], (False, False, alt)
+        if character == "\x1b":
+            return "ESC", (False, False, alt)
+        if character == "\x00":
+            return "SPACE", (False, True, alt)
+        if ord(character) < 0x20:  # control + letter
+            return chr(ord(character) + 0x40).lower(), (False, True, alt)
+        return character, (character.isupper(), False, alt)
+
+    def __sequence_length(self, buffer: str, index: int) -> int | None:
+        """
+        Length of the escape sequence at index, or None if it isn't complete yet.
+        """
+        if index + 1 == len(buffer):
+            return None
+
+        introducer = buffer[index + 1]
+        if introducer == "[":
+            # parametres and intermediates, until a final character in @ to ~
+            for end in range(index + 2, len(buffer)):
+                if "@" <= buffer[end] <= "~":
+                    return end - index + 1
+            return None
+        if introducer == "O":
+            return 3 if index + 2 < len(buffer) else None
+        if introducer == "\x1b":
+            return 1  # ESC then another sequence: the first one is the escape key
+        return 2  # ESC + character: alt + character
+
+    def __sequence_key(self, sequence: str) -> tuple | None:
+        if len(sequence) == 1:
+            return "ESC", (False, False, False)
+        if len(sequence) == 2:
+            return self.__plain_key(sequence[1], alt=True)
+
+        final = sequence[-1]
+        if sequence[1] == "O":
+            name = FINAL_KEYS.get(final)
+            return (name, (False, False, False)) if name else None
+
+        params = sequence[2:-1].split(";")
+        try:
+            numbers = [int(param) if param else 1 for param in params]
+        except ValueError:  # private sequences (mouse, focus...) aren't keys
+            return None
+
+        if final == "~":
+            name = TILDE_KEYS.get(numbers[0])
+        elif final == "Z":
+            return "TAB", (True, False, False)
+        else:
+            name = FINAL_KEYS.get(final)
+        if name is None:
+            return None
+
+        # xterm modifier parametre: 1 + (shift 1 | alt 2 | control 4)
+        bits = numbers[1] - 1 if len(numbers) > 1 else 0
+        return name, (bool(bits & 1), bool(bits & 4), bool(bits & 2))
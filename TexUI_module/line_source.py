@@ -0,0 +1,185 @@
+"""
+Line sources of a TextView: read lines by number without holding the whole document.
+
+Both sources number lines from 0 and return them without their line feed.
+An unterminated last line (a line still being written) is a line too.
+`get_lines` returns fewer lines than asked when the text ends first, so the end is found without counting the lines.
+"""
+
+import os
+from array import array
+from bisect import bisect_right
+
+CHUNK_SIZE = 1 << 16  # bytes read at once when indexing a file, one checkpoint per chunk
+
+
+class MemoryLines:
+    def __init__(self, max_lines: int = 0) -> None:
+        """
+        Lines appended in memory, like the output of a running process.
+
+        ### Parametres
+        - `max_lines`: Lines kept at most. The oldest are dropped first, but keep their numbers. 0 keeps everything.
+        """
+        if not isinstance(max_lines, int) or max_lines < 0:
+            raise ValueError(
+                f"Invalid max_lines value of {max_lines!r}. Expected non-negative integer."
+            )
+
+        self.max_lines = max_lines
+        self.lines = []  # complete lines
+        self.partial = ""  # the last line, until its line feed comes
+        self.dropped = 0  # lines dropped from the front by max_lines
+        self.changed = False  # appended to since the last refresh
+
+    def append(self, text: str) -> None:
+        """
+        Adds text at the end. The text before its first line feed continues the last line.
+        """
+        pieces = text.split("\n")
+        self.changed = self.changed or text != ""
+        if len(pieces) == 1:
+            self.partial += pieces[0]
+            return
+
+        self.lines.append(self.partial + pieces[0])
+        self.lines.extend(pieces[1:-1])
+        self.partial = pieces[-1]
+
+        # drop in batches, so the list isn't shifted on every append
+        excess = len(self.lines) - self.max_lines
+        if self.max_lines and excess > self.max_lines // 4:
+            del self.lines[:excess]
+            self.dropped += excess
+
+    def refresh(self) -> bool:
+        """
+        Returns whether text was appended since the last refresh. Appends are seen as they come.
+        """
+        changed, self.changed = self.changed, False
+        return changed
+
+    def first_line(self) -> int:
+        return self.dropped
+
+    def line_count(self) -> int:
+        return self.dropped + len(self.lines) + (1 if self.partial else 0)
+
+    def get_lines(self, start: int, count: int) -> list[str]:
+        start = max(start, self.dropped) - self.dropped
+        lines = self.lines[start : start + count]
+        if self.partial and start + count > len(self.lines):
+            lines.append(self.partial)
+        return lines
+
+
+class FileLines:
+    def __init__(self, path: str, encoding: str = "utf-8") -> None:
+        """
+        Lines of a file, read on demand. Only a checkpoint every `CHUNK_SIZE` bytes is kept in memory,
+        as (line number, byte offset), and the file is only indexed as far as the lines asked for.
+
+        ### Parametres
+        - `path`: Path of the file. It may grow while it is shown (see `refresh`).
+        - `encoding`: Encoding of the file. Undecodable bytes are replaced.
+        """
+        self.path = path
+        self.encoding = encoding
+        self.file = open(path, "rb")
+        self.reset_index()
+
+    def reset_index(self) -> None:
+        self.checkpoint_lines = array("q", [0])
+        self.checkpoint_offsets = array("q", [0])
+        self.indexed_lines = 0  # complete lines before indexed_offset
+        self.indexed_offset = 0  # where indexing continues, always the start of a line
+        self.size = os.fstat(self.file.fileno()).st_size
+
+    def close(self) -> None:
+        self.file.close()
+
+    def refresh(self) -> bool:
+        """
+        Picks up what was written to the file since. A file that got shorter (truncated or rotated in place) is indexed again.
+        Returns whether the size of the file changed. Only the size is checked, the file isn't read.
+        """
+        size = os.fstat(self.file.fileno()).st_size
+        if size == self.size:
+            return False
+        if size < self.indexed_offset:
+            self.reset_index()
+        self.size = size
+        return True
+
+    def first_line(self) -> int:
+        return 0
+
+    def __index_until(self, line: int | None) -> None:
+        """
+        Indexes the file until the given line starts (or to the end, with None).
+        """
+        file = self.file
+        while (line is None or self.indexed_lines <= line) and self.indexed_offset < self.size:
+            file.seek(self.indexed_offset)
+            chunk = file.read(CHUNK_SIZE)
+            last_feed = chunk.rfind(b"\n")
+            if last_feed == -1:
+                if len(chunk) < CHUNK_SIZE:
+                    return  # only the unterminated last line is left
+                # a line longer than a chunk: look further for its end
+                end = self.__find_feed(self.indexed_offset + len(chunk))
+                if end is None:
+                    return
+                self.indexed_lines += 1
+                self.indexed_offset = end + 1
+            else:
+                self.indexed_lines += chunk.count(b"\n", 0, last_feed + 1)
+                self.indexed_offset += last_feed + 1
+
+            self.checkpoint_lines.append(self.indexed_lines)
+            self.checkpoint_offsets.append(self.indexed_offset)
+
+    def __find_feed(self, offset: int) -> int | None:
+        file = self.file
+        while True:
+            file.seek(offset)
+            chunk = file.read(CHUNK_SIZE)
+            if not chunk:
+                return None
+            found = chunk.find(b"\n")
+            if found != -1:
+                return offset + found
+            offset += len(chunk)
+
+    def line_count(self) -> int:
+        """
+        Returns the number of lines. Indexes the rest of the file once, then only what was added,
+        so it reads the whole file the first time: only call it when the end is needed.
+        """
+        self.__index_until(None)
+        return self.indexed_lines + (1 if self.indexed_offset < self.size else 0)
+
+    def get_lines(self, start: int, count: int) -> list[str]:
+        self.__index_until(start)
+
+        # closest checkpoint at or before start, less than a chunk away
+        index = bisect_right(self.checkpoint_lines, start) - 1
+        skip, offset = start - self.checkpoint_lines[index], self.checkpoint_offsets[index]
+
+        # read until the lines wanted are complete, or the file ends
+        file = self.file
+        file.seek(offset)
+        data = b""
+        while True:
+            more = file.read(min(CHUNK_SIZE, self.size - offset - len(data)))
+            data += more
+            lines = data.split(b"\n")
+            if len(lines) > skip + count or not more:
+                break
+
+        if not more and lines[-1] == b"":
+            lines.pop()  # the text ends with a line feed, not with an empty line
+        return [
+            line.rstrip(b"\r").decode(self.encoding, "replace")
+            for line in lines[skip : skip + count]
+        ]
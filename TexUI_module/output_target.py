@@ -0,0 +1,319 @@
+"""
+Where the frames go: stdout by default, or any object with `write`, `write_async` and `size`.
+VirtualTerminal keeps the screen in memory instead, for tests and measures without a terminal.
+"""
+
+import re
+import sys
+from os import terminal_size
+from shutil import get_terminal_size
+
+from TexUI_module.char_width import WIDE_CONTINUATION, char_width
+from TexUI_module.style import DEFAULT_COLOR, DEFAULT_STYLE, TRUECOLOR
+
+# SGR parametre -> attribute bit of style.ATTRIBUTES
+SGR_ATTRIBUTE_ON = {1: 1, 2: 2, 3: 4, 4: 8, 5: 16, 7: 32, 8: 64, 9: 128}
+SGR_ATTRIBUTE_OFF = {22: 3, 23: 4, 24: 8, 25: 16, 27: 32, 28: 64, 29: 128}
+
+
+class StdoutTarget:
+    """
+    Writes to stdout, and reads the size of the terminal it is attached to.
+    """
+
+    def write(self, text: str) -> None:
+        sys.stdout.write(text)
+        sys.stdout.flush()
+
+    async def write_async(self, text: str) -> None:
+        from TexUI_module import async_io  # only needed by asyncio applications
+
+        await async_io.stdout_writer.write(text)
+
+    def size(self) -> terminal_size:
+        return get_terminal_size()
+
+
+# CSI (parametres, intermediates, final), other escape sequences, control characters, printable runs
+TOKEN = re.compile(
+    r"\x1b\[([0-9;:<=>?-]*)[ -/]*([@-~])|\x1b[ -/]*[0-~]|([\x00-\x1f\x7f])|([^\x00-\x1f\x1b\x7f]+)"
+)
+
+
+class VirtualTerminal:
+    def __init__(self, columns: int = 80, lines: int = 24) -> None:
+        """
+        An in-memory terminal of a fixed size. What is written is parsed into a grid of cells:
+        cursor movement (CUP, CUU, CUD, CUF, CUB), erase in display and in line,
+        carriage return, line feed (with scrolling), line wrapping, wide glyphs (their right half holds
+        `char_width.WIDE_CONTINUATION` in `grid`), and SGR styles (kept per cell in `styles`).
+        Other sequences are counted in `writes` and `bytes_written` only.
+
+        ### Parametres
+        - `columns`, `lines`: Size reported by `size`, in place of the real terminal's.
+        """
+        if not (isinstance(columns, int) and isinstance(lines, int)) or columns < 1 or lines < 1:
+            raise ValueError(
+                f"Invalid size value of {columns!r}x{lines!r}. Expected integer above zero."
+            )
+
+        self.columns = columns
+        self.lines = lines
+        self.grid = [[" "] * columns for _ in range(lines)]
+        self.style = DEFAULT_STYLE  # current SGR state, as (fg, bg, attr) like style.StylePlanes stores them
+        self.styles = [[DEFAULT_STYLE] * columns for _ in range(lines)]
+        self.cursor_x = 0
+        self.cursor_y = 0
+        self.pending_wrap = False  # the last column was written, the next character wraps
+        self.modes = {}  # private modes set with CSI ? n h / l, as {n: bool}
+        self.reset_counters()
+
+    def __str__(self):
+        return "\n".join(self.screen())
+
+    def reset_counters(self) -> None:
+        self.writes = 0
+        self.bytes_written = 0
+
+    def size(self) -> terminal_size:
+        return terminal_size((self.columns, self.lines))
+
+    def resize(self, columns: int, lines: int) -> None:
+        """
+        Changes the size, keeping the top left of the screen. Call `TexUI.poll_terminal_size` after, to deliver it.
+        """
+        self.grid = [
+            (row[:columns] + [" "] * (columns - len(row)))
+            for row in self.grid[:lines]
+        ] + [[" "] * columns for _ in range(lines - len(self.grid))]
+        self.styles = [
+            (row[:columns] + [DEFAULT_STYLE] * (columns - len(row)))
+            for row in self.styles[:lines]
+        ] + [[DEFAULT_STYLE] * columns for _ in range(lines - len(self.styles))]
+        self.columns, self.lines = columns, lines
+        self.cursor_x = min(self.cursor_x, columns - 1)
+        self.cursor_y = min(self.cursor_y, lines - 1)
+        self.pending_wrap = False
+
+    def screen(self) -> list[str]:
+        """
+        Returns the rows of the screen as strings. A wide glyph is one character, taking two columns.
+        """
+        return ["".join(row).replace(WIDE_CONTINUATION, "") for row in self.grid]
+
+    async def write_async(self, text: str) -> None:
+        self.write(text)
+
+    def write(self, text: str) -> None:
+        self.writes += 1
+        self.bytes_written += len(text.encode("utf-8", "replace"))
+
+        for match in TOKEN.finditer(text):
+            printable = match.group(4)
+            if printable is not None:
+                self.__print(printable)
+            elif match.group(3) is not None:
+                self.__control(match.group(3))
+            elif match.group(2) is not None:
+                self.__csi(match.group(1), match.group(2))
+            # other escape sequences don't change the grid
+
+    # parsing -------------------------------------------------------------------------------------------------------
+
+    def __print(self, text: str) -> None:
+        if not text.isascii():
+            for character in text:
+                self.__print_wide(character)
+            return
+
+        columns = self.columns
+        while text:
+            if self.pending_wrap:
+                self.pending_wrap = False
+                self.cursor_x = 0
+                self.__line_feed()
+
+            x = self.cursor_x
+            run = text[: columns - x]
+            text = text[len(run) :]
+            self.__break_wide(x, x + len(run))
+            self.grid[self.cursor_y][x : x + len(run)] = run
+            self.styles[self.cursor_y][x : x + len(run)] = [self.style] * len(run)
+
+            if x + len(run) == columns:
+                self.cursor_x = columns - 1
+                self.pending_wrap = True
+            else:
+                self.cursor_x = x + len(run)
+
+    def __print_wide(self, character: str) -> None:
+        width = char_width(character)
+        if width == 0:
+            return  # combining characters don't take a cell
+
+        if self.pending_wrap or (width == 2 and self.cursor_x == self.columns - 1):
+            # a wide glyph that doesn't fit the line wraps
+            self.pending_wrap = False
+            self.cursor_x = 0
+            self.__line_feed()
+
+        x, row = self.cursor_x, self.cursor_y
+        self.__break_wide(x, x + width)
+        self.grid[row][x] = character
+        self.styles[row][x] = self.style
+        if width == 2:
+            self.grid[row][x + 1] = WIDE_CONTINUATION
+            self.styles[row][x + 1] = self.style
+
+        if x + width == self.columns:
+            self.cursor_x = self.columns - 1
+            self.pending_wrap = True
+        else:
+            self.cursor_x = x + width
+
+    def __break_wide(self, start: int, end: int) -> None:
+        # writing over half of a wide glyph erases its other half
+        row = self.grid[self.cursor_y]
+        if row[start] == WIDE_CONTINUATION and start > 0:
+            row[start - 1] = " "
+        if end < self.columns and row[end] == WIDE_CONTINUATION:
+            row[end] = " "
+
+    def __line_feed(self) -> None:
+        if self.cursor_y == self.lines - 1:
+            self.grid.pop(0)
+            self.grid.append([" "] * self.columns)
+            self.styles.pop(0)
+            self.styles.append([DEFAULT_STYLE] * self.columns)
+        else:
+            self.cursor_y += 1
+
+    def __control(self, character: str) -> None:
+        if character == "\n":  # the tty turns a line feed into carriage return + line feed
+            self.cursor_x = 0
+            self.pending_wrap = False
+            self.__line_feed()
+        elif character == "\r":
+            self.cursor_x = 0
+            self.pending_wrap = False
+        elif character == "\b":
+            self.cursor_x = max(0, self.cursor_x - 1)
+            self.pending_wrap = False
+
+    def __csi(self, params: str, final: str) -> None:
+        if params.startswith("?"):
+            if final in "hl":
+                for mode in params[1:].split(";"):
+                    if mode.isdigit():
+                        self.modes[int(mode)] = final == "h"
+            return
+
+        try:
+            numbers = [int(param) if param else 0 for param in params.split(";")]
+        except ValueError:
+            return
+        first = numbers[0]
+
+        if final == "m":
+            self.__sgr(numbers)
+            return
+
+        if final in "Hf":
+            row = numbers[0] if numbers[0] > 0 else 1
+            column = numbers[1] if len(numbers) > 1 and numbers[1] > 0 else 1
+            self.cursor_y = min(row, self.lines) - 1
+            self.cursor_x = min(column, self.columns) - 1
+        elif final in "ABCD":
+            if first < 0:
+                return  # not a valid count: nothing moves
+            count = first or 1
+            if final == "A":
+                self.cursor_y = max(0, self.cursor_y - count)
+            elif final == "B":
+                self.cursor_y = min(self.lines - 1, self.cursor_y + count)
+            elif final == "C":
+                self.cursor_x = min(self.columns - 1, self.cursor_x + count)
+            else:
+                self.cursor_x = max(0, self.cursor_x - count)
+        elif final == "J":
+            row = self.cursor_y
+            if first == 0:
+                self.__erase(row, self.cursor_x, self.columns)
+                for index in range(row + 1, self.lines):
+                    self.__erase(index, 0, self.columns)
+            elif first == 1:
+                self.__erase(row, 0, self.cursor_x + 1)
+                for index in range(row):
+                    self.__erase(index, 0, self.columns)
+            elif first == 2:
+                for index in range(self.lines):
+                    self.__erase(index, 0, self.columns)
+            return  # 3 clears the scrollback, which isn't kept
+        elif final == "K":
+            if first == 0:
+                self.__erase(self.cursor_y, self.cursor_x, self.columns)
+            elif first == 1:
+                self.__erase(self.cursor_y, 0, self.cursor_x + 1)
+            elif first == 2:
+                self.__erase(self.cursor_y, 0, self.columns)
+        else:
+            return  # the rest don't move the cursor
+
+        self.pending_wrap = False
+
+    def __erase(self, row: int, start: int, end: int) -> None:
+        self.grid[row][start:end] = [" "] * (end - start)
+        self.styles[row][start:end] = [DEFAULT_STYLE] * (end - start)
+
+    def __sgr(self, numbers: list) -> None:
+        fg, bg, attr = self.style
+        index = 0
+        while index < len(numbers):
+            number = numbers[index]
+            if number == 0:
+                fg, bg, attr = DEFAULT_STYLE
+            elif number in SGR_ATTRIBUTE_ON:
+                attr |= SGR_ATTRIBUTE_ON[number]
+            elif number in SGR_ATTRIBUTE_OFF:
+                attr &= ~SGR_ATTRIBUTE_OFF[number]
+            elif 30 <= number <= 37 or 90 <= number <= 97:
+                fg = number - 30 if number < 90 else number - 82
+            elif 40 <= number <= 47 or 100 <= number <= 107:
+                bg = number - 40 if number < 100 else number - 92
+            elif number == 39:
+                fg = DEFAULT_COLOR
+            elif number == 49:
+                bg = DEFAULT_COLOR
+            elif number in (38, 48) and index + 1 < len(numbers):
+                if numbers[index + 1] == 5 and index + 2 < len(numbers):
+                    color = numbers[index + 2]
+                    index += 2
+                elif numbers[index + 1] == 2 and index + 4 < len(numbers):
+                    red, green, blue = numbers[index + 2 : index + 5]
+                    color = TRUECOLOR | red << 16 | green << 8 | blue
+                    index += 4
+                else:
+                    break
+                if number == 38:
+                    fg = color
+                else:
+                    bg = color
+            index += 1
+
+        self.style = (fg, bg, attr)
+
+
+target = StdoutTarget()
+
+
+def set_target(new_target) -> None:
+    global target
+    target = new_target
+
+
+def get_target():
+    return target
+
+
+def write(text: str) -> None:
+    target.write(text)
@@ -0,0 +1,148 @@
+"""
+Opt-in instrumentation of a Display: calls and time of the drawing methods, and what every flush wrote.
+"""
+
+import re
+from collections import deque
+from functools import wraps
+from time import perf_counter
+from typing import Callable
+
+from TexUI_module.scheduler import percentile
+
+ESCAPE_SEQUENCE = re.compile(r"\x1b\[[0-9;:<=>?-]*[ -/]*[@-~]|\x1b[ -/]*[0-~]")
+
+
+def visible_cells(frame: str) -> int:
+    """
+    Returns how many cells the frame writes: every character but escape sequences and line feeds.
+    """
+    hidden = sum(len(sequence) for sequence in ESCAPE_SEQUENCE.findall(frame))
+    return len(frame) - hidden - frame.count("\n")
+
+
+class DisplayStats:
+    def __init__(
+        self,
+        hook: Callable[[dict], object] | None = None,
+        history: int = 240,
+        clock: Callable[[], float] = perf_counter,
+    ) -> None:
+        """
+        Collects the stats of one Display. Made by `Display.enable_stats`.
+
+        ### Parametres
+        - `hook`: Called after every flush with the stats of that frame, see `record_flush`.
+        - `history`: How many frames are kept for the frame time percentiles.
+        - `clock`: Clock the durations are measured with, in seconds.
+        """
+        self.hook = hook
+        self.clock = clock
+        self.frame_times = deque(maxlen=history)
+        self.reset()
+
+    def __str__(self):
+        return f"DisplayStats object: {self.flushes} flushes, {self.bytes_written} bytes"
+
+    def reset(self) -> None:
+        self.methods = {}  # name: [calls, total seconds, max seconds]
+        self.flushes = 0
+        self.cells_written = 0
+        self.bytes_written = 0
+        self.writes = 0
+        self.build_time = 0.0
+        self.write_time = 0.0
+        self.last_frame = None
+        self.last_flush = None
+        self.frame_times.clear()
+
+    def wrap(self, name: str, method: Callable) -> Callable:
+        """
+        Returns the method, counted and timed under name.
+        """
+        clock = self.clock
+
+        @wraps(method)
+        def timed(*args, **kwargs):
+            start = clock()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                elapsed = clock() - start
+                entry = self.methods.get(name)
+                if entry is None:
+                    self.methods[name] = [1, elapsed, elapsed]
+                else:
+                    entry[0] += 1
+                    entry[1] += elapsed
+                    if elapsed > entry[2]:
+                        entry[2] = elapsed
+
+        return timed
+
+    def record_flush(self, frame: str, build_time: float, write_time: float) -> None:
+        """
+        Records a flush that built the frame in build_time seconds and wrote it in write_time seconds.
+        The hook gets `cells`, `bytes`, `writes`, `build`, `write` and `interval` (seconds since the previous flush, or None).
+        """
+        now = self.clock()
+        interval = None if self.last_flush is None else now - self.last_flush
+        self.last_flush = now
+        if interval is not None:
+            self.frame_times.append(interval)
+
+        self.last_frame = {
+            "cells": visible_cells(frame),
+            "bytes": len(frame.encode("utf-8", "replace")),
+            "writes": 1 if frame else 0,
+            "build": build_time,
+            "write": write_time,
+            "interval": interval,
+        }
+
+        self.flushes += 1
+        self.cells_written += self.last_frame["cells"]
+        self.bytes_written += self.last_frame["bytes"]
+        self.writes += self.last_frame["writes"]
+        self.build_time += build_time
+        self.write_time += write_time
+
+        if self.hook is not None:
+            self.hook(self.last_frame)
+
+    def snapshot(self) -> dict:
+        """
+        Returns a copy of the stats since the last reset. Times are in seconds.
+        """
+        flushes = self.flushes or 1
+        frame_times = list(self.frame_times)
+
+        return {
+            "methods": {
+                name: {
+                    "calls": calls,
+                    "total": total,
+                    "mean": total / calls,
+                    "max": longest,
+                }
+                for name, (calls, total, longest) in self.methods.items()
+            },
+            "flush": {
+                "count": self.flushes,
+                "cells": self.cells_written,
+                "bytes": self.bytes_written,
+                "writes": self.writes,
+                "cells_per_flush": self.cells_written / flushes,
+                "bytes_per_flush": self.bytes_written / flushes,
+                "writes_per_flush": self.writes / flushes,
+                "build": self.build_time,
+                "write": self.write_time,
+                "last": dict(self.last_frame) if self.last_frame else None,
+            },
+            "frames": {
+                "p50": percentile(frame_times, 50),
+                "p95": percentile(frame_times, 95),
+                "p99": percentile(frame_times, 99),
+                "max": max(frame_times, default=0.0),
+            },
+        }
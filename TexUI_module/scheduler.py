@@ -0,0 +1,209 @@
+"""
+Frame pacing: fixed timestep updates and rendering at a target rate.
+"""
+
+import asyncio
+from collections import deque
+from inspect import isawaitable
+from time import perf_counter, sleep as time_sleep
+from typing import Callable
+
+
+def percentile(values: list, percent: float) -> float:
+    """
+    Returns the nearest-rank percentile of the values (0 if there are none).
+    """
+    if not values:
+        return 0.0
+
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, round(percent / 100 * len(ordered) + 0.5) - 1))
+    return ordered[index]
+
+
+class FrameScheduler:
+    def __init__(
+        self,
+        update: Callable[[float], object],
+        render: Callable[[float], object],
+        rate: float = 60,
+        update_rate: float | None = None,
+        max_updates: int = 5,
+        max_frame_skip: int = 5,
+        history: int = 240,
+        clock: Callable[[], float] = perf_counter,
+        sleep: Callable[[float], object] = time_sleep,
+    ) -> None:
+        """
+        Runs `update` at a fixed timestep and `render` at a target frame rate, on a monotonic clock.
+        The time spent updating and rendering is taken out of the wait, so the rate doesn't drift with load.
+
+        ### Parametres
+        - `update`: Called with the timestep (seconds) for every fixed update. Return False to stop.
+        - `render`: Called once per frame with how far the clock is into the next update (0 to 1). Return False to stop.
+        - `rate`: Target frames per second.
+        - `update_rate`: Updates per second. Default is None (same as `rate`).
+        - `max_updates`: Most updates run to catch up in one frame. Time behind past that is dropped.
+        - `max_frame_skip`: Most frames in a row that skip `render` when behind. Updates still run.
+        - `history`: How many frame times are kept for `stats`.
+        - `clock`: Monotonic clock in seconds.
+        - `sleep`: Sleep function in seconds.
+        """
+        if not rate > 0 or not (update_rate is None or update_rate > 0):
+            raise ValueError(
+                f"Invalid rate value of {rate!r} and {update_rate!r}. Expected number above zero."
+            )
+
+        self.update = update
+        self.render = render
+        self.rate = rate
+        self.update_rate = update_rate
+        self.max_updates = max_updates
+        self.max_frame_skip = max_frame_skip
+        self.clock = clock
+        self.sleep = sleep
+
+        self.running = False
+        self.frame_times = deque(maxlen=history)
+        self.reset_stats()
+
+    def __str__(self):
+        return f"FrameScheduler object: {self.rate} fps, {self.update_rate or self.rate} updates per second"
+
+    def stop(self) -> None:
+        """
+        Stops `run` after the current frame.
+        """
+        self.running = False
+
+    def reset_stats(self) -> None:
+        self.frame_times.clear()
+        self.frames = 0
+        self.updates = 0
+        self.skipped_frames = 0
+        self.dropped_updates = 0
+        self.stats_start = self.clock()
+
+    def stats(self) -> dict:
+        """
+        Returns the achieved rates since the last `reset_stats`, and the percentiles of the recent frame times (seconds).
+        """
+        elapsed = self.clock() - self.stats_start
+        frame_times = list(self.frame_times)
+
+        return {
+            "fps": self.frames / elapsed if elapsed > 0 else 0.0,
+            "ups": self.updates / elapsed if elapsed > 0 else 0.0,
+            "frames": self.frames,
+            "updates": self.updates,
+            "skipped_frames": self.skipped_frames,
+            "dropped_updates": self.dropped_updates,
+            "frame_time": {
+                "p50": percentile(frame_times, 50),
+                "p95": percentile(frame_times, 95),
+                "p99": percentile(frame_times, 99),
+                "max": max(frame_times, default=0.0),
+            },
+        }
+
+    def run(self, frames: int | None = None) -> None:
+        """
+        Runs until `stop` is called, a callback returns False, or `frames` frames went by.
+        `rate` and `update_rate` can be changed while running, from the callbacks too.
+        """
+        for delay in self.__steps(frames):
+            if isawaitable(delay):
+                delay.close()
+                self.running = False
+                raise ValueError(
+                    "Invalid callback. Coroutine callbacks need run_async instead of run."
+                )
+            self.sleep(delay)
+
+    async def run_async(self, frames: int | None = None) -> None:
+        """
+        Same as `run`, but waits with `asyncio.sleep` so other tasks keep running,
+        and awaits the callbacks that are coroutine functions.
+        """
+        steps = self.__steps(frames)
+        result = None
+        while True:
+            try:
+                step = steps.send(result)
+            except StopIteration:
+                return
+
+            result = None
+            if isawaitable(step):
+                result = await step
+            else:
+                await asyncio.sleep(step)
+
+    def __steps(self, frames: int | None):
+        """
+        The frame loop. Yields how long to sleep, or an awaitable returned by a callback,
+        whose result is sent back in. `run` and `run_async` only differ in how they wait.
+        """
+        self.running = True
+
+        previous = self.clock()
+        next_frame = previous
+        accumulator = 0.0
+        skipped_in_a_row = 0
+        frame_count = 0
+
+        while self.running and (frames is None or frame_count < frames):
+            frame_period = 1 / self.rate
+            timestep = 1 / (self.update_rate or self.rate)
+
+            start = self.clock()
+            accumulator += start - previous
+            previous = start
+
+            # fixed timestep updates, with a limit so a slow frame can't snowball
+            update_count = 0
+            while accumulator >= timestep and self.running:
+                if update_count == self.max_updates:
+                    dropped = int(accumulator // timestep)
+                    self.dropped_updates += dropped
+                    accumulator -= dropped * timestep
+                    break
+
+                result = self.update(timestep)
+                if isawaitable(result):
+                    result = yield result
+                if result is False:
+                    self.running = False
+                accumulator -= timestep
+                update_count += 1
+                self.updates += 1
+
+            next_frame += frame_period
+
+            # behind by more than a frame: skip rendering this one, within limit
+            if (
+                self.clock() - next_frame > frame_period
+                and skipped_in_a_row < self.max_frame_skip
+            ):
+                skipped_in_a_row += 1
+                self.skipped_frames += 1
+            else:
+                skipped_in_a_row = 0
+                if self.running:
+                    result = self.render(accumulator / timestep)
+                    if isawaitable(result):
+                        result = yield result
+                    if result is False:
+                        self.running = False
+                self.frames += 1
+
+            frame_count += 1
+            end = self.clock()
+            self.frame_times.append(end - start)
+
+            if next_frame > end:
+                yield next_frame - end
+            elif end - next_frame > frame_period * self.max_frame_skip:
+                next_frame = end  # too far behind to catch up, start pacing again from now
+
+        self.running = False
@@ -0,0 +1,98 @@
+"""
+Sprites: shapes compiled once into the opaque runs of every row, so drawing one
+only copies those runs instead of checking every cell of its area against a mask.
+"""
+
+from TexUI_module import char_width
+
+
+def printable_cells(line: str) -> str:
+    """
+    Returns the cells of a line without its control characters, which would move the terminal's cursor.
+    """
+    if not line.isprintable():
+        line = "".join(character for character in line if character.isprintable())
+    return char_width.to_cells(line)
+
+
+class Sprite:
+    def __init__(self, source, transparent: str = " ") -> None:
+        """
+        A shape to draw many times with `Display.draw_sprite`.
+
+        ### Parametres
+        - `source`: What the sprite looks like. A Display (with its styles, if it has color), a list of strings,
+        or a multiline string. Lines may be shorter than the longest: the cells past their end are transparent.
+        - `transparent`: The character that is not drawn. Default is a space.
+
+        ### Behavior
+        The opaque spans of every row are computed here, once. Changing the source afterward doesn't change the sprite. \n
+        Control characters of a string source (tabs, escapes...) are removed, like in `draw_str`.
+        """
+        if not isinstance(transparent, str) or len(transparent) != 1:
+            raise ValueError(
+                f"Invalid transparent value of {transparent!r}. Expected string with length of one."
+            )
+        self.transparent = transparent
+
+        planes = None
+        if isinstance(source, str):
+            lines = [printable_cells(line) for line in source.split("\n")]
+        elif isinstance(source, list) and all(isinstance(line, str) for line in source):
+            lines = [printable_cells(line) for line in source]
+        elif hasattr(source, "storage") and hasattr(source, "content"):
+            lines = [source.storage.row_text(row) for row in source.content]
+            planes = source.planes
+        else:
+            raise ValueError(
+                f"Invalid source value of {source!r}. Expected Display, list of string, or string."
+            )
+
+        self.width = max(map(len, lines), default=0)
+        self.height = len(lines)
+
+        # rows of (start, text) opaque runs, and their (fg, bg, attr) slices when the source has styles
+        self.spans = []
+        self.styles = [] if planes is not None else None
+        self.opaque_cells = 0
+        for row_index, line in enumerate(lines):
+            spans = []
+            start = None
+            for column, character in enumerate(line + transparent):
+                if character != transparent:
+                    if start is None:
+                        start = column
+                elif start is not None:
+                    spans.append((start, line[start:column]))
+                    self.opaque_cells += column - start
+                    start = None
+            self.spans.append(spans)
+
+            if planes is not None:
+                self.styles.append(
+                    [
+                        (
+                            planes.fg[row_index][start : start + len(text)],
+                            planes.bg[row_index][start : start + len(text)],
+                            planes.attr[row_index][start : start + len(text)],
+                        )
+                        for start, text in spans
+                    ]
+                )
+
+        self.__prepared = {}  # storage name: spans with their text as the storage's sequence
+
+    def __str__(self):
+        return f"Sprite object: {self.width}x{self.height} | {self.opaque_cells} opaque cells"
+
+    def prepared(self, storage) -> list:
+        """
+        Returns the spans with their text already made into the sequence the storage writes, as (start, values).
+        """
+        spans = self.__prepared.get(storage.name)
+        if spans is None:
+            spans = self.__prepared[storage.name] = [
+                [(start, storage.sequence(text)) for start, text in row]
+                for row in self.spans
+            ]
+        return spans
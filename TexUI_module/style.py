@@ -0,0 +1,264 @@
+"""
+Cell styles: foreground, background and attributes, kept in planes parallel to the characters,
+and the SGR sequences that switch between them.
+
+A color is -1 (terminal default), 0 to 255 (palette), or TRUECOLOR | 0xRRGGBB.
+Attributes are a bit mask of ATTRIBUTES.
+"""
+
+from array import array
+from functools import lru_cache
+
+from TexUI_module.framebuffer import RowWindow
+
+DEFAULT_COLOR = -1
+TRUECOLOR = 1 << 24
+
+ATTRIBUTES = {
+    "bold": 1,
+    "dim": 2,
+    "italic": 4,
+    "underline": 8,
+    "blink": 16,
+    "reverse": 32,
+    "hidden": 64,
+    "strike": 128,
+}
+
+# SGR parametre turning each attribute on, and off. bold and dim share their off parametre
+ATTRIBUTE_ON = ((1, "1"), (2, "2"), (4, "3"), (8, "4"), (16, "5"), (32, "7"), (64, "8"), (128, "9"))
+ATTRIBUTE_OFF = ((4, "23"), (8, "24"), (16, "25"), (32, "27"), (64, "28"), (128, "29"))
+
+COLORS = {
+    name: index
+    for index, name in enumerate(
+        ("black", "red", "green", "yellow", "blue", "magenta", "cyan", "white")
+    )
+}
+COLORS.update({f"bright_{name}": index + 8 for name, index in list(COLORS.items())})
+
+DEFAULT_STYLE = (DEFAULT_COLOR, DEFAULT_COLOR, 0)
+
+
+def parse_color(value) -> int:
+    """
+    Returns the color as stored in a plane, from "default", a palette index, a name from COLORS,
+    "#rrggbb", or an (r, g, b) tuple.
+    """
+    if value == "default":
+        return DEFAULT_COLOR
+    if isinstance(value, int) and not isinstance(value, bool) and 0 <= value <= 255:
+        return value
+    if isinstance(value, str):
+        if value in COLORS:
+            return COLORS[value]
+        if len(value) == 7 and value[0] == "#":
+            try:
+                return TRUECOLOR | int(value[1:], 16)
+            except ValueError:
+                pass
+    if (
+        isinstance(value, tuple)
+        and len(value) == 3
+        and all(isinstance(part, int) and 0 <= part <= 255 for part in value)
+    ):
+        return TRUECOLOR | value[0] << 16 | value[1] << 8 | value[2]
+
+    raise ValueError(
+        f"Invalid color value of {value!r}. Expected 'default', integer from 0 to 255, color name, '#rrggbb' or (r, g, b)."
+    )
+
+
+def parse_attributes(value) -> int:
+    """
+    Returns the attribute mask, from a mask, an attribute name, or an iterable of names.
+    """
+    if isinstance(value, int) and not isinstance(value, bool) and 0 <= value <= 255:
+        return value
+
+    names = [value] if isinstance(value, str) else value
+    try:
+        mask = 0
+        for name in names:
+            mask |= ATTRIBUTES[name]
+        return mask
+    except (KeyError, TypeError):
+        raise ValueError(
+            f"Invalid attr value of {value!r}. Expected integer mask, or names from {', '.join(ATTRIBUTES)}."
+        )
+
+
+def color_parametre(color: int, background: bool) -> str:
+    if color == DEFAULT_COLOR:
+        return "49" if background else "39"
+    if color < 8:
+        return str((40 if background else 30) + color)
+    if color < 16:
+        return str((100 if background else 90) + color - 8)
+    if color < 256:
+        return f"{48 if background else 38};5;{color}"
+    return f"{48 if background else 38};2;{color >> 16 & 255};{color >> 8 & 255};{color & 255}"
+
+
+@lru_cache(maxsize=1024)
+def transition(current: tuple, new: tuple) -> str:
+    """
+    Returns the shortest SGR sequence that turns the current style into the new one. Only what differs is set.
+    """
+    if current == new:
+        return ""
+
+    params = []
+    current_attr, new_attr = current[2], new[2]
+
+    removed = current_attr & ~new_attr
+    if removed & 3:  # bold and dim only turn off together
+        params.append("22")
+        current_attr &= ~3
+    for bit, parametre in ATTRIBUTE_OFF:
+        if removed & bit:
+            params.append(parametre)
+
+    added = new_attr & ~current_attr
+    for bit, parametre in ATTRIBUTE_ON:
+        if added & bit:
+            params.append(parametre)
+
+    if new[0] != current[0]:
+        params.append(color_parametre(new[0], False))
+    if new[1] != current[1]:
+        params.append(color_parametre(new[1], True))
+
+    return f"\033[{';'.join(params)}m"
+
+
+def styled_text(text: str, fg, bg, attr, start: int, state: tuple) -> tuple:
+    """
+    Returns the text of the cells from start with SGR sequences where the style changes, and the style it ends in.
+    `fg`, `bg` and `attr` are the plane rows of the cells, state is the style the terminal is in before.
+    """
+    end = start + len(text)
+
+    # nothing styled on the run: the text as is
+    if state == DEFAULT_STYLE:
+        length = len(text)
+        if (
+            fg[start:end].count(DEFAULT_COLOR) == length
+            and bg[start:end].count(DEFAULT_COLOR) == length
+            and attr[start:end].count(0) == length
+        ):
+            return text, state
+
+    out = []
+    run_start = 0
+    for index, style in enumerate(zip(fg[start:end], bg[start:end], attr[start:end])):
+        if style != state:
+            if index > run_start:
+                out.append(text[run_start:index])
+            out.append(transition(state, style))
+            state = style
+            run_start = index
+    out.append(text[run_start:])
+
+    return "".join(out), state
+
+
+class StylePlanes:
+    """
+    The foreground, background and attribute planes of a Display, one array per row each.
+    """
+
+    def __init__(self, width: int = 0, height: int = 0) -> None:
+        self.fg = [array("i", [DEFAULT_COLOR]) * width for _ in range(height)]
+        self.bg = [array("i", [DEFAULT_COLOR]) * width for _ in range(height)]
+        self.attr = [array("B", [0]) * width for _ in range(height)]
+
+    def get(self, x: int, y: int) -> tuple:
+        return self.fg[y][x], self.bg[y][x], self.attr[y][x]
+
+    def set(self, x: int, y: int, style: tuple) -> None:
+        """
+        Sets the parts of the style (fg, bg, attr) that aren't None.
+        """
+        fg, bg, attr = style
+        if fg is not None:
+            self.fg[y][x] = fg
+        if bg is not None:
+            self.bg[y][x] = bg
+        if attr is not None:
+            self.attr[y][x] = attr
+
+    def paint(self, x1: int, y1: int, x2: int, y2: int, style: tuple) -> None:
+        """
+        Sets the parts of the style that aren't None on an already clipped rectangle.
+        """
+        count = x2 - x1 + 1
+        for plane, value, typecode in zip(
+            (self.fg, self.bg, self.attr), style, ("i", "i", "B")
+        ):
+            if value is None:
+                continue
+            values = array(typecode, [value]) * count
+            for row in plane[y1 : y2 + 1]:
+                row[x1 : x2 + 1] = values
+
+    def clear(self) -> None:
+        self.paint(0, 0, len(self.fg[0]) - 1 if self.fg else -1, len(self.fg) - 1, DEFAULT_STYLE)
+
+    def window(self, x1: int, y1: int, x2: int, y2: int) -> "StylePlanes":
+        """
+        Returns planes sharing the cells of an already clipped rectangle.
+        """
+        planes = StylePlanes()
+        length = x2 - x1 + 1
+        planes.fg = [RowWindow(row, x1, length) for row in self.fg[y1 : y2 + 1]]
+        planes.bg = [RowWindow(row, x1, length) for row in self.bg[y1 : y2 + 1]]
+        planes.attr = [RowWindow(row, x1, length) for row in self.attr[y1 : y2 + 1]]
+        return planes
+
+    def copy(self) -> "StylePlanes":
+        planes = StylePlanes()
+        planes.fg = [array("i", row[:]) for row in self.fg]
+        planes.bg = [array("i", row[:]) for row in self.bg]
+        planes.attr = [array("B", row[:]) for row in self.attr]
+        return planes
+
+    def resized(self, width: int, height: int) -> "StylePlanes":
+        """
+        Returns planes of the new size, keeping the styles that still fit.
+        """
+        planes = StylePlanes(width, height)
+        kept_width, kept_height = min(width, len(self.fg[0]) if self.fg else 0), min(height, len(self.fg))
+        for new, old in ((planes.fg, self.fg), (planes.bg, self.bg), (planes.attr, self.attr)):
+            for y in range(kept_height):
+                new[y][:kept_width] = old[y][:kept_width]
+        return planes
+
+    def blit(self, source: "StylePlanes", x: int, y: int, copied=None) -> None:
+        """
+        Copies already clipped source planes with their top left at (x, y).
+        `copied` is a list per row of the columns to copy (of the source), or None for every cell.
+        """
+        for target, origin in ((self.fg, source.fg), (self.bg, source.bg), (self.attr, source.attr)):
+            for row_index, line in enumerate(origin):
+                row = target[y + row_index]
+                if copied is None:
+                    row[x : x + len(line)] = line[:]
+                else:
+                    for column in copied[row_index]:
+                        row[x + column] = line[column]
+
+
+def styled_cells(cells: list, state: tuple) -> tuple:
+    """
+    Same as `styled_text`, for cells given as (character, fg, bg, attr) tuples.
+    """
+    out = []
+    for character, *style in cells:
+        style = tuple(style)
+        if style != state:
+            out.append(transition(state, style))
+            state = style
+        out.append(character)
+
+    return "".join(out), state
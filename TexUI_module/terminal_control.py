@@ -0,0 +1,113 @@
+"""
+Terminal control through escape sequences, written directly instead of spawning a process.
+"""
+
+from TexUI_module import output_target
+
+CURSOR_HOME = "\033[H"
+CLEAR_SCREEN = "\033[2J"
+CLEAR_SCROLLBACK = "\033[3J"
+RESET_ATTRIBUTES = "\033[0m"
+
+ALTERNATE_SCREEN_ENTER = "\033[?1049h"
+ALTERNATE_SCREEN_EXIT = "\033[?1049l"
+
+CURSOR_HIDE = "\033[?25l"
+CURSOR_SHOW = "\033[?25h"
+
+# DEC private mode 2026: the terminal holds the frame until the end bracket, then shows it at once
+SYNCHRONIZED_UPDATE_BEGIN = "\033[?2026h"
+SYNCHRONIZED_UPDATE_END = "\033[?2026l"
+
+
+def write(sequence: str) -> None:
+    output_target.write(sequence)
+
+
+def clear() -> None:
+    """
+    Clears the terminal and its scrollback, and moves the cursor to the top left corner.
+    """
+    write(CURSOR_HOME + CLEAR_SCREEN + CLEAR_SCROLLBACK)
+
+
+def enter_alternate_screen() -> None:
+    write(ALTERNATE_SCREEN_ENTER)
+
+
+def exit_alternate_screen() -> None:
+    write(ALTERNATE_SCREEN_EXIT)
+
+
+def hide_cursor() -> None:
+    write(CURSOR_HIDE)
+
+
+def show_cursor() -> None:
+    write(CURSOR_SHOW)
+
+
+def begin_synchronized_update() -> None:
+    write(SYNCHRONIZED_UPDATE_BEGIN)
+
+
+def end_synchronized_update() -> None:
+    write(SYNCHRONIZED_UPDATE_END)
+
+
+class synchronized_update:
+    """
+    Context manager that brackets everything written inside it into one synchronized update,
+    so the terminal shows the whole frame at once instead of tearing.
+    Terminals without mode 2026 ignore the brackets.
+    """
+
+    def __enter__(self):
+        begin_synchronized_update()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        end_synchronized_update()
+        return False
+
+
+class TerminalSession:
+    def __init__(
+        self,
+        alternate_screen: bool = True,
+        hide_cursor: bool = True,
+        clear: bool = True,
+    ) -> None:
+        """
+        Context manager that sets the terminal up for a full screen application,
+        and restores it on exit, exception included.
+
+        ### Parametres
+        - `alternate_screen`: Draw on the alternate screen, so the shell's content comes back on exit.
+        - `hide_cursor`: Hide the cursor while inside.
+        - `clear`: Clear the terminal on enter.
+        """
+        self.alternate_screen = alternate_screen
+        self.hide_cursor = hide_cursor
+        self.clear = clear
+
+    def __enter__(self):
+        sequence = ""
+        if self.alternate_screen:
+            sequence += ALTERNATE_SCREEN_ENTER
+        if self.hide_cursor:
+            sequence += CURSOR_HIDE
+        if self.clear:
+            sequence += CURSOR_HOME + CLEAR_SCREEN
+        write(sequence)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        # always restore, even if a synchronized update was left open
+        sequence = SYNCHRONIZED_UPDATE_END + RESET_ATTRIBUTES
+        if self.hide_cursor:
+            sequence += CURSOR_SHOW
+        if self.alternate_screen:
+            sequence += ALTERNATE_SCREEN_EXIT
+        write(sequence)
+        return False
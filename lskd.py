@@ -6,6 +6,7 @@ Sugar syntaxed version of Microsoft Visual C Runtime (msvcrt) Library with a bit
 import msvcrt
 import ctypes
 from ctypes import wintypes
+from TexUI_module.key_decoder import SEQUENCE_CODES, translate, translate_code
 
 user32 = ctypes.WinDLL("user32", use_last_error=True)
 user32.GetKeyState.restype = wintypes.SHORT
@@ -65,7 +66,7 @@ class __Char:
 
 char = __Char()
 modifier = __Modifier(__SHIFT, __CONTROL, __MENU, __APP_HANDLE)
-sequence_code = (b"\xe0", b"\x00")
+sequence_code = SEQUENCE_CODES
 special_key = (b"\x1b", b"\x08", b"\t", b"\r")
 
 
@@ -73,56 +74,21 @@ def on_press() -> None:
     return msvcrt.kbhit() or any(modifier.get())
 
 
-# clutterfuck of something that i've forgot
-def __internal_translate(char, special=False):
-    if char == None:
-        return None
-
-    try:
-        if not special:
-            return {
-                b"\x1b": "ESC",
-                b"\x08": "BACKSPACE",
-                b"\t": "TAB",
-                b"\r": "ENTER",
-                b" ": "SPACE",
-            }[char]
-        elif special:
-            return {
-                b"H": "UP",
-                b"P": "DOWN",
-                b"K": "LEFT",
-                b"M": "RIGHT",
-                b"R": "INSERT",
-                b"S": "DELETE",
-                b"G": "HOME",
-                b"O": "END",
-                b"I": "PG_UP",
-                b"Q": "PG_DOWN",
-                b";": "F1",
-                b"<": "F2",
-                b"=": "F3",
-                b">": "F4",
-                b"?": "F5",
-                b"@": "F6",
-                b"A": "F7",
-                b"B": "F8",
-                b"C": "F9",
-                b"D": "F10",
-                b"\x85": "F11", # reserved. might not be recordable
-                b"\x86": "F12",
-            }[char]
-
-    except KeyError:
-        return char.decode()
-
-
-def translate(key_content, last_key) -> str | None:
+def read_keys(timeout: float | None = 0) -> list:
     """
-    translate raw bytes Sequence into a more readable form
+    Returns every key pending as `(name, (shift, control, alt))`, names as `translate` gives them.
+    The console has no wait, so timeout is ignored and this never blocks.
     """
-    if last_key in sequence_code:
-        key_content = __internal_translate(key_content, last_key)
-    elif not key_content in sequence_code:
-        key_content = __internal_translate(key_content)
-    return key_content
+    keys = []
+    while msvcrt.kbhit():
+        key = msvcrt.getwch()
+        try:
+            if key.encode("latin-1", "replace") in sequence_code:
+                code = msvcrt.getwch().encode("latin-1", "replace")
+                name = translate_code(code, True)
+            else:
+                name = translate_code(key.encode())
+        except UnicodeDecodeError:  # special key missing from the table
+            continue
+        keys.append((name, modifier.get()))
+    return keys
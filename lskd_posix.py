@@ -0,0 +1,147 @@
+"""
+### Local Scope Keyboard Detector (POSIX)
+Same surface as lskd (`on_press`, `char.get`, `translate`, `modifier.get`) for POSIX terminals,
+through termios and select instead of msvcrt
+"""
+
+import atexit
+import os
+import select
+import sys
+import termios
+import tty
+from TexUI_module.key_decoder import (
+    ESCAPE_TIMEOUT,
+    MSVCRT_CODES,  # key name -> the bytes msvcrt.getch would give, so char.get/translate behave like lskd
+    SEQUENCE_CODES,
+    KeyDecoder,
+    translate,
+)
+
+sequence_code = SEQUENCE_CODES
+special_key = (b"\x1b", b"\x08", b"\t", b"\r")
+
+
+class __Terminal:
+    def __init__(self) -> None:
+        self.fd = None
+        self.old_attributes = None
+        self.decoder = KeyDecoder()
+
+    def enable(self, raw: bool = False) -> None:
+        """
+        Puts stdin into cbreak mode (or raw mode, where ctrl+c is a key instead of a signal).
+        Done on first use, and undone at exit.
+        """
+        if self.fd is None:
+            self.fd = sys.stdin.fileno()
+        if self.old_attributes is None and os.isatty(self.fd):
+            self.old_attributes = termios.tcgetattr(self.fd)
+            atexit.register(self.disable)
+        if self.old_attributes is not None:
+            when = termios.TCSANOW  # keep what was typed ahead
+            tty.setraw(self.fd, when) if raw else tty.setcbreak(self.fd, when)
+
+    def disable(self) -> None:
+        """
+        Restores stdin the way it was before `enable`.
+        """
+        if self.old_attributes is not None:
+            termios.tcsetattr(self.fd, termios.TCSADRAIN, self.old_attributes)
+            self.old_attributes = None
+            atexit.unregister(self.disable)
+
+    def readable(self, timeout: float | None) -> bool:
+        if self.fd is None:
+            self.enable()
+        return bool(select.select([self.fd], [], [], timeout)[0])
+
+    def read_keys(self, timeout: float | None = 0) -> list:
+        """
+        Reads everything pending in one read, after waiting for input up to timeout (None waits forever).
+        """
+        if not self.readable(timeout):
+            return self.decoder.flush()
+
+        data = os.read(self.fd, 4096)
+        if not data:
+            return []
+
+        keys = self.decoder.feed(data)
+        if self.decoder.pending and not self.readable(ESCAPE_TIMEOUT):
+            keys += self.decoder.flush()
+        return keys
+
+
+terminal = __Terminal()
+enable = terminal.enable
+disable = terminal.disable
+
+
+class __Modifier:
+    def __init__(self) -> None:
+        self.last = (False, False, False)
+
+    def get(self, type: str = "") -> tuple[bool, bool, bool]:
+        """
+        shift, control, alt of the last key read. \n
+        capture certain modifier key by calling the name in the parameter.
+        """
+        if type == "shift":
+            return self.last[0]
+        elif type == "control":
+            return self.last[1]
+        elif type == "alt":
+            return self.last[2]
+        else:
+            return self.last
+
+
+class __Char:
+    def __init__(self) -> None:
+        self.pending = []
+
+    def get(self, wide: bool = False) -> bytes | str:
+        """
+        Returns the next key the way msvcrt.getch does: special keys come as a sequence code,
+        then their code on the next call. Waits if no key is pending.
+        """
+        while not self.pending:
+            for name, modifiers in terminal.read_keys(None):
+                codes = MSVCRT_CODES.get(name)
+                if codes is None:
+                    if modifiers[1] and len(name) == 1 and "a" <= name <= "z":
+                        name = chr(ord(name) - 0x60)  # control + letter
+                    codes = (name.encode(),)
+                self.pending.extend((code, modifiers) for code in codes)
+
+        code, modifier.last = self.pending.pop(0)
+        return code.decode("utf-8", "replace") if wide else code
+
+    def push(self, char: str | bytes | bytearray, wide: bool = False) -> None:
+        if isinstance(char, str):
+            char = char.encode()
+        self.pending.insert(0, (bytes(char), (False, False, False)))
+
+
+char = __Char()
+modifier = __Modifier()
+
+
+def on_press() -> bool:
+    return bool(char.pending) or terminal.readable(0)
+
+
+def wait(timeout: float | None = None) -> bool:
+    """
+    Sleeps until a key is pressed, or timeout seconds went by. Returns whether a key is pending.
+    """
+    return bool(char.pending) or terminal.readable(timeout)
+
+
+def read_keys(timeout: float | None = 0) -> list:
+    """
+    Returns every key pending as `(name, (shift, control, alt))`, decoded from a single read.
+    Waits up to timeout seconds for the first one (None waits forever).
+    """
+    return terminal.read_keys(timeout)
@@ -1,4 +1,9 @@
-import lskd, time, TexUI, random
+import TexUI, random
+
+try:
+    import lskd
+except ImportError:  # no msvcrt, not on Windows
+    import lskd_posix as lskd
 
 last_key   = "d"
 body       = ["<"] * 5
@@ -29,10 +34,13 @@ screen.draw_str(0, 0, "Press enter to start")
 screen.flush()
 input()
 
-while 1:
-    if lskd.on_press():
-        key = lskd.translate(lskd.char.get(), last_key)
-        last_key = key if key != None else last_key
+def step(timestep):
+    global last_key, last_dir
+
+    for event in keys.poll():
+        last_key = event.name
+        if last_key == "ESC":
+            break
 
     draw_screen()
     screen.draw_str(0, 0, f"[Snake Length: {len(body)}]")
@@ -71,6 +79,9 @@ while 1:
         if current_cell == food:
             body.insert(0, body[0])
             create_food()
+
+            # update speed
+            scheduler.rate = 7 + len(body) / 3
         elif current_cell != screen.default_fill:
             input("end game")
             exit()
@@ -80,7 +91,8 @@ while 1:
         offset[0] += {"<": -1, ">": 1}.get(segment, 0)
         offset[1] += {"^": -1, "v": 1}.get(segment, 0)
 
-    screen.flush(0, 0)
 
-    # update speed
-    time.sleep(1 / (7 + len(body) / 3))
+last_dir  = last_key
+keys      = TexUI.InputQueue(lskd.read_keys, coalesce="movement", movement_keys="wasd")
+scheduler = TexUI.FrameScheduler(step, lambda alpha: screen.flush(0, 0), rate=7 + len(body) / 3)
+scheduler.run()
@@ -0,0 +1,21 @@
+import os
+import sys
+
+import pytest
+
+# TexUI.py sits at the root of the repository, next to this folder
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def terminal():
+    """
+    A VirtualTerminal that TexUI writes to for the test, instead of stdout.
+    """
+    import TexUI
+
+    previous = TexUI.get_output()
+    virtual = TexUI.VirtualTerminal(60, 20)
+    TexUI.set_output(virtual)
+    yield virtual
+    TexUI.set_output(previous)
@@ -0,0 +1,52 @@
+import asyncio
+import os
+import sys
+import types
+
+from TexUI_module import async_io
+
+
+def test_stdout_stays_blocking_while_writing(monkeypatch):
+    read_end, write_end = os.pipe()
+    stdout = os.fdopen(write_end, "w", encoding="utf-8")
+    monkeypatch.setattr(sys, "stdout", stdout)
+    writer = async_io.StdoutWriter()
+
+    async def main():
+        await writer.write("first ")
+        assert os.get_blocking(write_end)
+        print("printed", end=" ")  # synchronous writes still work
+        await asyncio.gather(*(writer.write(f"{number} ") for number in range(5)))
+
+    try:
+        asyncio.run(main())
+        writer.close()
+        stdout.flush()
+        assert os.get_blocking(write_end)
+        assert os.read(read_end, 1024) == b"first printed 0 1 2 3 4 "
+    finally:
+        stdout.close()
+        os.close(read_end)
+
+
+def test_windows_keys_have_the_posix_shape(monkeypatch):
+    typed = iter(["a", "\xe0", "H", "\x1b", "\r", "\x00", ";", "\x01"])
+    monkeypatch.setattr(async_io, "termios", None)
+    monkeypatch.setitem(sys.modules, "msvcrt", types.SimpleNamespace(getwch=lambda: next(typed)))
+
+    async def main():
+        keys = []
+        async for key in async_io.key_events():
+            keys.append(key)
+            if len(keys) == 6:
+                return keys
+
+    no_modifier = (False, False, False)
+    assert asyncio.run(main()) == [
+        ("a", no_modifier),
+        ("UP", no_modifier),
+        ("ESC", no_modifier),
+        ("ENTER", no_modifier),
+        ("F1", no_modifier),
+        ("a", (False, True, False)),
+    ]
@@ -0,0 +1,75 @@
+import pytest
+
+import TexUI
+from TexUI_module import char_width
+
+CONTINUATION = char_width.WIDE_CONTINUATION
+
+
+def rows_of(display):
+    return [display.storage.row_text(row) for row in display.content]
+
+
+def test_widths():
+    assert char_width.char_width("a") == 1
+    assert char_width.char_width("あ") == 2
+    assert char_width.char_width("😀") == 2
+    assert char_width.char_width("́") == 0  # combining acute accent
+    assert char_width.string_width("héllo") == 5
+    assert char_width.string_width("日本語abc") == 9
+
+
+def test_cells_compose_and_pair_wide_glyphs():
+    assert char_width.to_cells("é") == "é"
+    assert char_width.to_cells("a日b") == f"a日{CONTINUATION}b"
+    assert char_width.to_cells("a​b") == "ab"  # zero width space
+
+
+def test_fit_cells_turns_broken_halves_into_spaces():
+    assert char_width.fit_cells(f"日{CONTINUATION}x") == f"日{CONTINUATION}x"
+    assert char_width.fit_cells(f"{CONTINUATION}x日") == " x "
+    assert char_width.fit_cells(f"{CONTINUATION}日", reverse=True) == f"{CONTINUATION}日"
+
+
+def test_split_and_wrap_keep_pairs_together():
+    cells = char_width.to_cells("ab日本")
+    assert char_width.split_cells(cells, 3) == ["ab", f"日{CONTINUATION}", f"本{CONTINUATION}"]
+    assert all(len(line) <= 4 for line in char_width.wrap_cells(char_width.to_cells("日本語 の テキスト"), 4))
+
+
+def test_draw_str_writes_both_halves():
+    display = TexUI.Display(8, 2, ".", no_terminal_bound=True)
+    result = display.draw_str(1, 0, "日本x")
+    assert rows_of(display)[0] == f".日{CONTINUATION}本{CONTINUATION}x.."
+    assert result["edge"][2] == 6  # right edge counts columns
+
+    # the glyph doesn't fit the last column: its left half is kept, and shown as a space
+    display.draw_str(0, 1, "abcdefg日")
+    assert rows_of(display)[1] == "abcdefg日"
+    assert char_width.fit_cells(rows_of(display)[1]) == "abcdefg "
+
+
+@pytest.mark.parametrize("mode", ["plain", "double", "damage"])
+@pytest.mark.parametrize("storage", list(TexUI.framebuffer.storages))
+def test_flush_shows_whole_glyphs_only(terminal, mode, storage):
+    display = TexUI.Display(
+        12, 4, ".", storage=storage, double_buffer=mode == "double", track_damage=mode == "damage"
+    )
+    flush = lambda: display.flush(0, 0, damaged_only=mode == "damage")
+    display.flush(0, 0)
+
+    display.draw_str(0, 0, "日本語")
+    display.draw_str(10, 1, "漢字")  # cut by the right edge
+    display.draw_str(-1, 2, "界x")  # cut by the left edge
+    display.draw_char(4, 3, "漢")
+    flush()
+    display.draw_str(2, 0, "a")  # overwrites the left half of 本
+    flush()
+
+    # a wide glyph is one character of the screen's rows
+    assert [row.rstrip(" ") for row in terminal.screen()[:4]] == [
+        "日a 語......",
+        "..........漢",
+        " x..........",
+        "....漢......",
+    ]
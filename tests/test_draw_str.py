@@ -0,0 +1,33 @@
+import pytest
+
+import TexUI
+
+
+def rows_of(display):
+    return [display.storage.row_text(row) for row in display.content]
+
+
+@pytest.mark.parametrize("at", ["all", "screen edge", "max line"])
+@pytest.mark.parametrize("y", [5, 9, -4])
+@pytest.mark.parametrize("foward", [{}, {"action": False, "preserve": True}])
+def test_trusted_text_off_the_screen_is_clipped(at, y, foward):
+    display = TexUI.Display(20, 5, ".", no_terminal_bound=True, track_damage=True, validation="trusted")
+    result = display.draw_str(
+        2,
+        y,
+        "hello there\nline two\nthree",
+        max_line=2,
+        edge_of_screen="newline",
+        foward=foward,
+        ellipsis={"symbol": ".", "count": 2, "at": at},
+    )
+
+    assert result["edge"][1] == y - 1
+    assert rows_of(display) == ["." * 20] * 5
+    assert display.get_damage() == []
+
+
+def test_screen_edge_ellipsis_ends_on_the_last_row():
+    display = TexUI.Display(20, 5, ".", no_terminal_bound=True)
+    display.draw_str(2, 3, "hello there\nline two\nthree", ellipsis={"symbol": ".", "count": 2, "at": "screen edge"})
+    assert rows_of(display)[3:] == ["..hello there.......", "..line t............"]
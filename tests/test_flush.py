@@ -0,0 +1,138 @@
+import random
+
+import pytest
+
+import TexUI
+
+X, Y = 5, 3  # where the display is flushed on the terminal
+
+
+def rows_of(display):
+    return [display.storage.row_text(row) for row in display.content]
+
+
+def on_terminal(terminal, display):
+    return [row[X : X + display.width] for row in terminal.screen()[Y : Y + display.height]]
+
+
+def draw_step(display, rng):
+    x1, y1, x2, y2 = [rng.randrange(-3, 33) for _ in range(4)]
+    operation = rng.randrange(3)
+    if operation == 0:
+        display.draw_line(x1, y1 % 12, x2, y2 % 12, rng.choice("abc"))
+    elif operation == 1:
+        display.draw_str(abs(x1) % 30, abs(y1) % 10, "hey you")
+    else:
+        display.draw_rect(abs(x1) % 30, abs(y1) % 10, abs(x2) % 30, abs(y2) % 10, rng.choice("xyz"))
+
+
+@pytest.mark.parametrize("storage", list(TexUI.framebuffer.storages))
+def test_double_buffer_keeps_the_terminal_in_sync(terminal, storage):
+    rng = random.Random(1)
+    display = TexUI.Display(30, 10, ".", double_buffer=True, storage=storage)
+    display.flush(X, Y)
+
+    for _ in range(100):
+        draw_step(display, rng)
+        display.flush(X, Y)
+        assert on_terminal(terminal, display) == rows_of(display)
+
+
+def test_double_buffer_only_writes_what_changed(terminal):
+    display = TexUI.Display(30, 10, ".", double_buffer=True)
+    display.flush(X, Y)
+    full = terminal.bytes_written
+
+    terminal.reset_counters()
+    display.flush(X, Y)
+    assert terminal.bytes_written == 0
+
+    terminal.reset_counters()
+    display.draw_char(7, 4, "#")
+    display.flush(X, Y)
+    assert 0 < terminal.bytes_written < full // 10
+    assert on_terminal(terminal, display)[4][7] == "#"
+
+    terminal.reset_counters()
+    display.flush(X, Y, full_repaint=True)
+    assert terminal.bytes_written >= full
+
+
+@pytest.mark.parametrize("storage", list(TexUI.framebuffer.storages))
+def test_damaged_only_flush_keeps_the_terminal_in_sync(terminal, storage):
+    rng = random.Random(2)
+    display = TexUI.Display(30, 10, ".", track_damage=True, storage=storage)
+    display.flush(X, Y)
+
+    for _ in range(100):
+        draw_step(display, rng)
+        display.flush(X, Y, damaged_only=True)
+        assert on_terminal(terminal, display) == rows_of(display)
+        assert display.get_damage() == []
+
+
+def test_damaged_only_flush_writes_only_the_damage(terminal):
+    display = TexUI.Display(30, 10, ".", track_damage=True)
+    display.flush(X, Y)
+
+    terminal.reset_counters()
+    display.flush(X, Y, damaged_only=True)
+    assert terminal.bytes_written == 0
+
+    display.draw_str(2, 2, "hi")
+    assert display.get_damage() == [(2, 2, 3, 2)]
+    display.flush(X, Y, damaged_only=True)
+    assert 0 < terminal.bytes_written < 20
+    assert on_terminal(terminal, display)[2][:5] == "..hi."
+
+
+def test_damage_is_clipped_and_merged():
+    display = TexUI.Display(10, 5, ".", track_damage=True, no_terminal_bound=True)
+    display.draw_rect(-3, -3, 1, 1, "#")
+    display.draw_char(2, 1, "#")
+    display.draw_line(8, 4, 20, 4, "-")
+    assert display.get_damage() == [(0, 0, 1, 1), (2, 1, 2, 1), (8, 4, 9, 4)]
+    assert display.merge_damage() == [(0, 0, 2, 1), (8, 4, 9, 4)]
+
+    # a view reports its damage on the parent, in the parent's coordinate
+    display.reset_damage()
+    display.view(4, 1, 7, 3).draw_str(1, 1, "abcdef")
+    assert display.get_damage() == [(5, 2, 7, 2)]
+
+
+def repainted(display):
+    """
+    Returns the screen and styles a full repaint of the display shows, on a terminal of its own.
+    """
+    reference = TexUI.VirtualTerminal(60, 20)
+    previous = TexUI.get_output()
+    TexUI.set_output(reference)
+    display.flush(X, Y, full_repaint=display.double_buffer)
+    TexUI.set_output(previous)
+    return reference.screen(), reference.styles
+
+
+@pytest.mark.parametrize(
+    "options",
+    [{"double_buffer": True}, {"track_damage": True}, {"double_buffer": True, "track_damage": True}],
+)
+def test_restyled_wide_glyphs_are_repainted_whole(terminal, options):
+    damaged_only = options.get("track_damage", False)
+    display = TexUI.Display(40, 6, color=True, validation="trusted", **options)
+    display.draw_sprite(16, 3, TexUI.Sprite(["#  #", " 漢 "]))
+    display.draw_str(11, 1, "漢字")
+    display.paint(14, 1, 14, 1, attr="bold")
+    display.draw_char(1, 2, "漢")
+    display.flush(X, Y)
+
+    # only the right half of 漢 changes style. 字 takes the left half of the other 漢
+    display.paint(18, 0, 39, 5, fg="blue", attr="bold")
+    display.draw_str(-2, 2, "漢字")
+    display.flush(X, Y, damaged_only=damaged_only)
+    assert on_terminal(terminal, display)[4][16:19] == " 漢 "
+
+    # right halves left without their glyph: a bold one right of the damage, and the one the damage starts on
+    display.draw_str(10, 1, "a日b")
+    display.paint(2, 2, 9, 2, fg="green")
+    display.flush(X, Y, damaged_only=damaged_only)
+    assert (terminal.screen(), terminal.styles) == repainted(display)
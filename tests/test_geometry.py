@@ -0,0 +1,92 @@
+import random
+
+import pytest
+
+import TexUI
+from TexUI import Position, Rect
+
+STORAGES = list(TexUI.framebuffer.storages)
+
+
+def rows_of(display):
+    return [display.storage.row_text(row) for row in display.content]
+
+
+def bresenham(x1, y1, x2, y2, width, height):
+    """
+    The cells of a line, the plain way: every step of Bresenham's algorithm from x1, y1 to x2, y2,
+    until it ends or passes the right or bottom edge of a width x height screen.
+    """
+    dx, dy = abs(x2 - x1), abs(y2 - y1)
+    sx = 1 if x1 < x2 else -1
+    sy = 1 if y1 < y2 else -1
+    err = dx - dy
+    x, y = x1, y1
+    while True:
+        yield x, y
+        if (x == x2 and y == y2) or x >= width or y >= height:
+            return
+        e2 = 2 * err
+        if e2 > -dy:
+            err -= dy
+            x += sx
+        if e2 < dx:
+            err += dx
+            y += sy
+
+
+def test_position():
+    position = Position(3, 4)
+    assert (position.x, position.y) == (3, 4)
+    assert position + Position(1, 1) == Position(4, 5)
+    assert position * 2 == Position(6, 8)
+    assert {position: 1}[Position(3, 4)] == 1
+    with pytest.raises(AttributeError):
+        position.x = 1
+    with pytest.raises(TypeError):
+        Position(1.5, 2)
+
+
+def test_rect():
+    screen = Rect.from_size(10, 5)
+    assert screen == (0, 0, 9, 4)
+    assert (screen.width, screen.height) == (10, 5)
+    assert screen.contains(9, 4) and not screen.contains(10, 4)
+    assert Position(0, 0) in screen and Rect(2, 2, 3, 3) in screen
+
+    assert screen.clip(12, -3, 5, 2) == (5, 0, 9, 2)
+    assert screen.clip(10, 0, 12, 2) is None
+    assert Rect.from_size(0, 3).clip(0, 0, 1, 1) is None
+
+    assert Rect(0, 0, 2, 2).intersect(Rect(3, 0, 4, 2)) is None
+    assert Rect(0, 0, 2, 2).touches(Rect(3, 0, 4, 2))
+    assert not Rect(0, 0, 2, 2).touches(Rect(4, 0, 4, 2))
+    assert Rect(0, 0, 2, 2).union(Rect(3, 1, 4, 5)) == (0, 0, 4, 5)
+
+    with pytest.raises(ValueError):
+        Rect(2, 0, 1, 0)
+
+
+@pytest.mark.parametrize("storage", STORAGES)
+def test_diagonal_line_clips_like_bresenham(storage):
+    """
+    draw_line only walks the part of a diagonal line on the screen, so its cells and pattern have to match a full walk.
+    Horizontal and vertical lines are spans, drawn from their top left end.
+    """
+    width, height = 13, 7
+    rng = random.Random(25)
+    for _ in range(300):
+        x1, y1, x2, y2 = (rng.randint(-15, 27) for _ in range(4))
+        if x1 == x2 or y1 == y2:
+            continue
+        pattern = "abcde"[: rng.randint(1, 5)]
+
+        display = TexUI.Display(width, height, ".", storage=storage, no_terminal_bound=True)
+        display.draw_line(x1, y1, x2, y2, pattern)
+
+        expected = [["."] * width for _ in range(height)]
+        for step, (x, y) in enumerate(bresenham(x1, y1, x2, y2, width, height)):
+            if 0 <= x < width and 0 <= y < height:
+                expected[y][x] = pattern[step % len(pattern)]
+
+        assert rows_of(display) == ["".join(row) for row in expected], (x1, y1, x2, y2)
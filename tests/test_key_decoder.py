@@ -0,0 +1,43 @@
+from TexUI_module.key_decoder import MSVCRT_CODES, KeyDecoder, translate
+
+NO_MODIFIER = (False, False, False)
+
+
+def test_translate_gives_the_names_of_msvcrt_codes():
+    assert translate(b"H", b"\xe0") == "UP"
+    assert translate(b";", b"\x00") == "F1"
+    assert translate(b"\r", b"a") == "ENTER"
+    assert translate(b"a", b"a") == "a"
+    assert translate(b"\xe0", b"a") == b"\xe0"  # the sequence code itself waits for the next code
+
+
+def test_msvcrt_codes_translate_back_to_their_name():
+    for name, codes in MSVCRT_CODES.items():
+        last = codes[0] if len(codes) == 2 else b""
+        assert translate(codes[-1], last) == name
+
+
+def test_decoder_names_keys_and_modifiers():
+    decoder = KeyDecoder()
+    keys = decoder.feed(b"a\x1b[A\x1b[1;5C\x1b[15~\r\x01A")
+    assert keys == [
+        ("a", NO_MODIFIER),
+        ("UP", NO_MODIFIER),
+        ("RIGHT", (False, True, False)),
+        ("F5", NO_MODIFIER),
+        ("ENTER", NO_MODIFIER),
+        ("a", (False, True, False)),
+        ("A", (True, False, False)),
+    ]
+
+
+def test_decoder_holds_split_sequences_and_lone_escape():
+    decoder = KeyDecoder()
+    assert decoder.feed(b"\x1b[") == []
+    assert decoder.pending
+    assert decoder.feed(b"B") == [("DOWN", NO_MODIFIER)]
+
+    assert decoder.feed(b"\x1b") == []
+    assert decoder.flush() == [("ESC", NO_MODIFIER)]
+    assert decoder.feed("é".encode()[:1]) == []
+    assert decoder.feed("é".encode()[1:]) == [("é", NO_MODIFIER)]
@@ -0,0 +1,54 @@
+import pytest
+
+import TexUI
+
+STORAGES = list(TexUI.framebuffer.storages)
+
+SHAPE = [
+    " /\\ ",
+    "/##\\",
+    "|  |  x",
+    "",
+    "#",
+]
+
+
+def rows_of(display):
+    return [display.storage.row_text(row) for row in display.content]
+
+
+def test_spans_skip_the_transparent_cells():
+    sprite = TexUI.Sprite(SHAPE)
+    assert (sprite.width, sprite.height) == (7, 5)
+    assert sprite.spans[2] == [(0, "|"), (3, "|"), (6, "x")]
+    assert sprite.spans[3] == []
+    assert sprite.opaque_cells == 10
+
+
+def test_control_characters_are_removed():
+    sprite = TexUI.Sprite("a\tb\x1b[2Jc\rd")
+    assert sprite.spans == [[(0, "ab[2Jcd")]]
+
+
+@pytest.mark.parametrize("storage", STORAGES)
+@pytest.mark.parametrize("x, y", [(3, 2), (-2, -1), (17, 7), (-10, 0), (30, 2)])
+def test_draw_sprite_is_a_masked_merge(storage, x, y):
+    sprite = TexUI.Sprite(SHAPE)
+    source = TexUI.Display(7, 5, " ", no_terminal_bound=True)
+    for row, line in enumerate(SHAPE):
+        if line:
+            source.draw_str(0, row, line)
+
+    drawn = TexUI.Display(20, 9, ".", no_terminal_bound=True, storage=storage)
+    merged = TexUI.Display(20, 9, ".", no_terminal_bound=True, storage=storage, validation="trusted")
+    drawn.draw_sprite(x, y, sprite)
+    merged.merge_display(x, y, source, display_mask=" ")
+
+    assert rows_of(drawn) == rows_of(merged)
+
+
+def test_wide_glyphs_keep_both_halves():
+    sprite = TexUI.Sprite("日本")
+    display = TexUI.Display(6, 1, ".", no_terminal_bound=True)
+    display.draw_sprite(1, 0, sprite)
+    assert rows_of(display) == [f".日{TexUI.WIDE_CONTINUATION}本{TexUI.WIDE_CONTINUATION}."]
@@ -0,0 +1,101 @@
+import random
+
+import pytest
+
+import TexUI
+
+STORAGES = list(TexUI.framebuffer.storages)
+
+
+def rows_of(display):
+    return [display.storage.row_text(row) for row in display.content]
+
+
+def draw_random(display, seed):
+    """
+    Draws the same random frame on any display, with every drawing method.
+    """
+    rng = random.Random(seed)
+    width, height = display.width, display.height
+
+    def position():
+        return rng.randint(-5, width + 5), rng.randint(-5, height + 5)
+
+    sources = {
+        storage: TexUI.Display(9, 4, "s", storage=storage, no_terminal_bound=True)
+        for storage in STORAGES
+    }
+    for source in sources.values():
+        source.draw_box(0, 0, 8, 3, "+-|")
+        source.draw_str(2, 1, "src")
+
+    for _ in range(30):
+        operation = rng.randrange(10)
+        mask = rng.choice(["", ".", "ab."])
+        if operation == 0:
+            display.draw_char(*position(), rng.choice("xyz"), mask)
+        elif operation == 1:
+            display.draw_line(*position(), *position(), rng.choice(["-", "ab", "123"]), mask)
+        elif operation == 2:
+            display.draw_box(*position(), *position(), rng.choice(["#", "-|", "12345678"]), mask)
+        elif operation == 3:
+            display.draw_rect(*position(), *position(), rng.choice(["r", "pq"]), mask)
+        elif operation == 4:
+            display.draw_str(
+                *position(),
+                "hello wonderful world\nsecond line",
+                max_width=rng.choice([0, 6, "preserve-7"]),
+                edge_of_screen=rng.choice(["default", "newline"]),
+                foward=rng.choice([{"action": True}, {"action": False}]),
+                text_mask=rng.choice(["", " "]),
+                mask_limit_text=mask,
+            )
+        elif operation == 5:
+            display.fill(*position(), rng.choice("fg"), ignore=rng.choice(["", "."]), neighbour=rng.choice([4, 8]))
+        elif operation == 6:
+            source = sources[rng.choice(STORAGES)]
+            display.merge_display(*position(), source, display_mask=rng.choice(["", "s"]), mask_limit_display=mask)
+        elif operation == 7:
+            x, y = rng.randrange(width), rng.randrange(height)
+            chunk = display.export_display(x, y, rng.randrange(width), rng.randrange(height))
+            display.merge_display(*position(), chunk)
+        elif operation == 8:
+            x1, y1 = rng.randrange(width), rng.randrange(height)
+            view = display.view(x1, y1, rng.randrange(width), rng.randrange(height))
+            view.draw_str(rng.randint(-2, 4), rng.randint(-1, 2), "in view")
+            view.draw_line(*position(), *position(), "v")
+        elif rng.random() < 0.3:
+            display.clear()
+
+
+@pytest.mark.parametrize("seed", range(40))
+def test_storages_draw_the_same_grid(seed):
+    displays = [
+        TexUI.Display(30, 12, ".", storage=storage, no_terminal_bound=True, validation="trusted")
+        for storage in STORAGES
+    ]
+    for display in displays:
+        draw_random(display, seed)
+
+    expected = rows_of(displays[0])
+    for display in displays[1:]:
+        assert rows_of(display) == expected, display.storage.name
+
+
+@pytest.mark.parametrize("storage", STORAGES)
+def test_reads_and_resize_match_the_list_storage(storage):
+    display = TexUI.Display(12, 5, ".", storage=storage, no_terminal_bound=True)
+    reference = TexUI.Display(12, 5, ".", no_terminal_bound=True)
+    for target in (display, reference):
+        target.draw_str(1, 1, "storage")
+        target.resize(8, 7)
+
+    assert rows_of(display) == rows_of(reference)
+    assert display.get_char(3, 1) == "o"
+    assert "g" in display and "z" not in display
+    assert rows_of(display.export_display(1, 1, 4, 2)) == ["stor", "...."]
+
+
+def test_unknown_storage_is_rejected():
+    with pytest.raises(ValueError, match="Invalid storage value of 'tape'"):
+        TexUI.Display(4, 4, storage="tape", no_terminal_bound=True)
@@ -0,0 +1,153 @@
+import random
+
+import TexUI
+from TexUI_module import line_source
+
+
+class CountingFile:
+    """
+    Wraps a binary file and counts the reads that went to it.
+    """
+
+    def __init__(self, file):
+        self.file = file
+        self.reads = 0
+
+    def read(self, size=-1):
+        self.reads += 1
+        return self.file.read(size)
+
+    def __getattr__(self, name):
+        return getattr(self.file, name)
+
+
+def rows_of(display):
+    return [display.storage.row_text(row) for row in display.content]
+
+
+def write_log(path, count):
+    with open(path, "w") as file:
+        for number in range(count):
+            file.write(f"{number:08d} some log message {'y' * (number % 40)}\n")
+
+
+def test_top_of_file_draw_reads_only_the_viewport(tmp_path):
+    path = tmp_path / "big.log"
+    write_log(path, 200_000)  # about 13 MiB, 200 chunks
+
+    view = TexUI.TextView(path=str(path))
+    view.source.file = CountingFile(view.source.file)
+    display = TexUI.Display(80, 24, no_terminal_bound=True)
+
+    view.draw(display, 0, 0, 79, 23)
+    assert rows_of(display)[0].startswith("00000000 some log message")
+    assert view.source.file.reads <= 2
+
+    for _ in range(10):
+        view.scroll(1)
+        view.draw(display, 0, 0, 79, 23)
+    assert rows_of(display)[0].startswith("00000010")
+    assert view.source.file.reads <= 4
+
+    view.close()
+
+
+def test_follow_shows_the_end_of_a_growing_file(tmp_path):
+    path = tmp_path / "grow.log"
+    write_log(path, 1000)
+    view = TexUI.TextView(path=str(path), follow=True)
+    display = TexUI.Display(80, 5, no_terminal_bound=True)
+
+    view.draw(display, 0, 0, 79, 4)
+    assert rows_of(display)[-1].startswith("00000999")
+
+    with open(path, "a") as file:
+        file.write("appended\npart")
+    view.draw(display, 0, 0, 79, 4)
+    assert rows_of(display)[-2:] == ["appended".ljust(80), "part".ljust(80)]
+
+    # the unterminated last line grows in place
+    with open(path, "a") as file:
+        file.write("ial")
+    view.draw(display, 0, 0, 79, 4)
+    assert rows_of(display)[-1] == "partial".ljust(80)
+
+    view.close()
+
+
+def test_memory_view_scrolls_and_follows():
+    view = TexUI.TextView(edge_of_screen="default", follow=True, max_lines=100)
+    for number in range(1000):
+        view.append(f"entry {number}\n")
+    display = TexUI.Display(20, 4, no_terminal_bound=True)
+
+    view.draw(display, 0, 0, 19, 3)
+    assert rows_of(display)[-1] == "entry 999".ljust(20)
+
+    view.scroll(-3)
+    assert not view.follow
+    view.append("new\n")
+    view.draw(display, 0, 0, 19, 3)
+    assert rows_of(display)[-1] == "entry 996".ljust(20)
+
+    view.scroll(100)
+    assert view.follow
+    view.draw(display, 0, 0, 19, 3)
+    assert rows_of(display)[-1] == "new".ljust(20)
+
+
+def test_wrapped_rows_scroll_one_row_at_a_time():
+    view = TexUI.TextView("a b c d e f g h\nshort", edge_of_screen="preserve")
+    assert view.visible_rows(4, 3) == ["a b", "c d", "e f"]
+    view.scroll(2)
+    assert view.visible_rows(4, 3) == ["e f", "g h", "shor"]
+    view.scroll(5)  # stops with the end at the bottom
+    assert view.visible_rows(4, 3) == ["g h", "shor", "t"]
+
+
+def test_file_lines_match_splitting_the_text(tmp_path, monkeypatch):
+    monkeypatch.setattr(line_source, "CHUNK_SIZE", 64)  # lines longer than a chunk, many checkpoints
+    path = tmp_path / "lines.txt"
+
+    for trial in range(200):
+        rng = random.Random(trial)
+        lines = [
+            "".join(rng.choice("ab c") for _ in range(rng.choice([0, 1, 5, 30, 200])))
+            for _ in range(rng.randint(0, 40))
+        ]
+        text = "\n".join(lines) + rng.choice(["", "\n"])
+        if rng.random() < 0.2:
+            text = text.replace("\n", "\r\n")
+        path.write_bytes(text.encode())
+
+        expected = text.replace("\r\n", "\n").split("\n")
+        if expected[-1] == "":
+            expected.pop()
+
+        source = line_source.FileLines(str(path))
+        for _ in range(10):
+            start, count = rng.randint(0, len(expected) + 2), rng.randint(1, 15)
+            assert source.get_lines(start, count) == expected[start : start + count]
+        assert source.line_count() == len(expected)
+
+        with open(path, "a") as file:
+            file.write("tail\nmore")
+        assert source.refresh()
+        grown = (text + "tail\nmore").replace("\r\n", "\n").split("\n")
+        assert source.line_count() == len(grown)
+        assert source.get_lines(0, 1000) == grown
+        assert not source.refresh()
+        source.close()
+
+
+def test_memory_lines_drop_the_oldest_and_keep_numbers():
+    source = line_source.MemoryLines(10)
+    for number in range(100):
+        source.append(f"{number}\n")
+    source.append("part")
+
+    assert source.refresh()
+    assert not source.refresh()
+    assert source.line_count() == 101
+    assert source.get_lines(source.line_count() - 2, 5) == ["99", "part"]
+    assert source.get_lines(source.first_line(), 1) == [str(source.first_line())]